@@ -0,0 +1,117 @@
+"""Compares how fast each json backend decodes Robinhood responses.
+
+Run from the root of the repository with:
+
+    python benchmarks/bench_json.py [recorded_response.json ...]
+
+Without arguments, the benchmark decodes payloads shaped like a page of option instruments with market data
+and a 5 year historicals response. Pass files saved from real responses to decode those instead.
+"""
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from robin_stocks.decoding import BACKENDS, load_backend  # noqa: E402
+
+
+def option_page(count=1000):
+    """Returns a page of option instruments merged with market data, like find_options_for_stock_by_expiration."""
+    results = []
+    for i in range(count):
+        results.append({
+            'chain_id': 'cee01a93-626e-4ee6-9b04-60e2fd1392d1',
+            'chain_symbol': 'AAPL',
+            'created_at': '2020-01-08T02:16:28.406386Z',
+            'expiration_date': '2020-06-19',
+            'id': '{0:08d}-0000-4000-8000-000000000000'.format(i),
+            'issue_date': '2019-12-09',
+            'min_ticks': {'above_tick': '0.05', 'below_tick': '0.01', 'cutoff_price': '3.00'},
+            'rhs_tradability': 'untradable',
+            'state': 'active',
+            'strike_price': '{0:.4f}'.format(100 + i * 2.5),
+            'tradability': 'tradable',
+            'type': 'call' if i % 2 else 'put',
+            'updated_at': '2020-01-08T02:16:28.406390Z',
+            'url': 'https://api.robinhood.com/options/instruments/{0:08d}/'.format(i),
+            'adjusted_mark_price': '12.350000',
+            'ask_price': '12.500000',
+            'ask_size': 14,
+            'bid_price': '12.200000',
+            'bid_size': 31,
+            'break_even_price': '{0:.6f}'.format(112.35 + i * 2.5),
+            'high_price': '13.100000',
+            'last_trade_price': '12.400000',
+            'last_trade_size': 1,
+            'low_price': '11.900000',
+            'mark_price': '12.350000',
+            'open_interest': 1520,
+            'previous_close_date': '2020-01-07',
+            'previous_close_price': '12.050000',
+            'volume': 233,
+            'chance_of_profit_long': '0.383526',
+            'chance_of_profit_short': '0.616474',
+            'delta': '0.538472',
+            'gamma': '0.014826',
+            'implied_volatility': '0.263341',
+            'rho': '0.224478',
+            'theta': '-0.045581',
+            'vega': '0.437224'
+        })
+    return({'next': None, 'previous': None, 'results': results})
+
+
+def historicals(symbols=5, points=260):
+    """Returns a 5 year historicals response for several symbols, like get_historicals(span='5year')."""
+    results = []
+    for s in range(symbols):
+        results.append({
+            'quote': 'https://api.robinhood.com/quotes/{0}/'.format(s),
+            'symbol': 'SYM{0}'.format(s),
+            'interval': 'week',
+            'span': '5year',
+            'bounds': 'regular',
+            'previous_close_price': None,
+            'open_price': None,
+            'open_time': None,
+            'instrument': 'https://api.robinhood.com/instruments/{0}/'.format(s),
+            'historicals': [{
+                'begins_at': '2015-01-{0:02d}T00:00:00Z'.format(p % 28 + 1),
+                'open_price': '{0:.6f}'.format(100 + p * 0.1),
+                'close_price': '{0:.6f}'.format(101 + p * 0.1),
+                'high_price': '{0:.6f}'.format(102 + p * 0.1),
+                'low_price': '{0:.6f}'.format(99 + p * 0.1),
+                'volume': 1000000 + p,
+                'session': 'reg',
+                'interpolated': False} for p in range(points)]
+        })
+    return({'results': results})
+
+
+def main(paths):
+    if paths:
+        payloads = []
+        for path in paths:
+            with open(path, 'rb') as f:
+                payloads.append((os.path.basename(path), f.read()))
+    else:
+        payloads = [('option page', json.dumps(option_page()).encode()),
+                    ('5 year historicals', json.dumps(historicals()).encode())]
+
+    for name, content in payloads:
+        print('{0} ({1:,} bytes)'.format(name, len(content)))
+        for backend in BACKENDS:
+            try:
+                loads = load_backend(backend)
+            except ImportError:
+                print('    {0:<8} not installed'.format(backend))
+                continue
+            number = 20
+            best = min(timeit.repeat(lambda: loads(content), number=number, repeat=5)) / number
+            print('    {0:<8} {1:8.3f} ms'.format(backend, best * 1000))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,39 @@
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+
+import robin_stocks.helper as helper  # noqa: E402
+import robin_stocks.options as options  # noqa: E402
+from mock_server import MockRobinhood  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def mock_api():
+    with MockRobinhood() as server:
+        yield server
+
+
+@pytest.fixture
+def client(mock_api):
+    yield mock_api.client()
+    mock_api.latency = 0.0
+    mock_api.error_rate = 0.0
+
+
+def clear_caches():
+    """Makes every round send its requests again instead of reading the caches."""
+    helper.clear_instrument_cache()
+    helper.clear_response_cache()
+    helper.VALIDATOR_CACHE.clear()
+    options.clear_option_chain_snapshots()
+
+
+@pytest.fixture
+def measure(benchmark, client):
+    """Benchmarks a robin_stocks function called through the mock client, starting each round with empty caches."""
+    def run(func, *args, **kwargs):
+        def setup():
+            clear_caches()
+            return((func,) + args, kwargs)
+        return(benchmark.pedantic(client.call, setup=setup, rounds=10, warmup_rounds=1))
+    return(run)
@@ -0,0 +1,153 @@
+"""Builds the fixture data served by the mock Robinhood API.
+
+The data has the same shape as real responses, with urls that point at api.robinhood.com and nummus.robinhood.com.
+Fixtures can be saved to and loaded from a json file, so that responses recorded from the real API can be replayed
+instead of the generated ones.
+"""
+import json
+import random
+
+API = 'https://api.robinhood.com'
+
+
+def make_id(kind, number):
+    """Returns a stable uuid shaped id."""
+    return('{0:08x}-{1:04x}-4000-8000-{2:012x}'.format(number, kind, number * 7919))
+
+
+class Fixtures:
+    """The data the mock server serves, keyed the way the server looks it up.
+
+    :param stocks: The number of stocks.
+    :type stocks: int
+    :param orders: The number of stock orders.
+    :type orders: int
+    :param option_orders: The number of option orders.
+    :type option_orders: int
+    :param positions: The number of stock positions. At most stocks.
+    :type positions: int
+    :param strikes: The number of strikes for each expiration date of an option chain.
+    :type strikes: int
+    :param expirations: The number of expiration dates of an option chain.
+    :type expirations: int
+    :param historical_points: The number of data points in each historicals response.
+    :type historical_points: int
+    :param seed: Seeds the random prices so that runs are repeatable.
+    :type seed: int
+
+    """
+
+    def __init__(self, stocks=50, orders=2000, option_orders=200, positions=30, strikes=40, expirations=6,
+                 historical_points=260, seed=0):
+        rand = random.Random(seed)
+        self.instruments = {}
+        self.quotes = {}
+        self.fundamentals = {}
+        self.option_instruments = {}
+        self.option_market_data = {}
+        self.historical_points = historical_points
+        for i in range(stocks):
+            symbol = 'S{0:03d}'.format(i)
+            id = make_id(1, i)
+            url = '{0}/instruments/{1}/'.format(API, id)
+            self.instruments[id] = {
+                'id': id, 'url': url, 'symbol': symbol, 'name': 'Stock {0} Inc.'.format(i),
+                'simple_name': 'Stock {0}'.format(i), 'type': 'stock', 'tradeable': True,
+                'tradable_chain_id': make_id(2, i), 'state': 'active', 'country': 'US',
+                'quote': '{0}/quotes/{1}/'.format(API, symbol), 'market': '{0}/markets/XNAS/'.format(API),
+                'fundamentals': '{0}/fundamentals/{1}/'.format(API, symbol), 'list_date': '2000-01-03'}
+            price = rand.uniform(5, 500)
+            self.quotes[symbol] = {
+                'symbol': symbol, 'instrument': url, 'ask_price': '{0:.6f}'.format(price + 0.02),
+                'bid_price': '{0:.6f}'.format(price - 0.02), 'last_trade_price': '{0:.6f}'.format(price),
+                'last_extended_hours_trade_price': None, 'previous_close': '{0:.6f}'.format(price * 0.99),
+                'trading_halted': False, 'has_traded': True, 'updated_at': '2020-01-08T21:00:00Z'}
+            self.fundamentals[symbol] = {
+                'instrument': url, 'pe_ratio': '{0:.6f}'.format(rand.uniform(5, 60)),
+                'market_cap': '{0:.6f}'.format(price * 1e8), 'sector': 'Technology',
+                'description': 'Stock {0} makes things.'.format(i), 'volume': '1000000.000000'}
+        symbols = sorted(self.quotes)
+        instrumentUrls = [self.instruments[make_id(1, i)]['url'] for i in range(stocks)]
+
+        # Every stock shares the same expirations and strikes around its price.
+        for s, symbol in enumerate(symbols[:5]):
+            chainId = make_id(2, s)
+            for e in range(expirations):
+                expiration = '2020-{0:02d}-17'.format(e + 2)
+                for k in range(strikes):
+                    for optionType in ('call', 'put'):
+                        number = ((s * expirations + e) * strikes + k) * 2 + (optionType == 'put')
+                        id = make_id(3, number)
+                        url = '{0}/options/instruments/{1}/'.format(API, id)
+                        self.option_instruments[id] = {
+                            'id': id, 'url': url, 'chain_id': chainId, 'chain_symbol': symbol,
+                            'expiration_date': expiration, 'strike_price': '{0:.4f}'.format(50 + k * 2.5),
+                            'type': optionType, 'state': 'active', 'tradability': 'tradable',
+                            'min_ticks': {'above_tick': '0.05', 'below_tick': '0.01', 'cutoff_price': '3.00'}}
+                        mark = rand.uniform(0.1, 20)
+                        self.option_market_data[id] = {
+                            'instrument': url, 'adjusted_mark_price': '{0:.6f}'.format(mark),
+                            'ask_price': '{0:.6f}'.format(mark + 0.05), 'bid_price': '{0:.6f}'.format(mark - 0.05),
+                            'mark_price': '{0:.6f}'.format(mark), 'open_interest': rand.randint(0, 5000),
+                            'volume': rand.randint(0, 900), 'delta': '{0:.6f}'.format(rand.uniform(-1, 1)),
+                            'gamma': '0.014826', 'implied_volatility': '0.263341', 'rho': '0.224478',
+                            'theta': '-0.045581', 'vega': '0.437224'}
+
+        self.orders = []
+        for i in range(orders):
+            price = rand.uniform(5, 500)
+            self.orders.append({
+                'id': make_id(4, i), 'url': '{0}/orders/{1}/'.format(API, make_id(4, i)),
+                'instrument': instrumentUrls[i % stocks], 'state': 'filled' if i % 10 else 'cancelled',
+                'cancel': None, 'type': 'market', 'side': 'buy' if i % 2 else 'sell', 'fees': '0.00',
+                'quantity': '1.00000', 'average_price': '{0:.8f}'.format(price), 'price': '{0:.8f}'.format(price),
+                'last_transaction_at': '2020-01-08T15:00:00Z', 'created_at': '2020-01-08T14:59:00Z',
+                'executions': [{'price': '{0:.8f}'.format(price), 'quantity': '1.00000'}]})
+        optionIds = list(self.option_instruments)
+        self.option_orders = []
+        for i in range(option_orders):
+            legs = [{'option': self.option_instruments[optionIds[(i * 7 + j) % len(optionIds)]]['url'],
+                     'side': 'buy', 'position_effect': 'open', 'ratio_quantity': 1} for j in range(2)]
+            self.option_orders.append({
+                'id': make_id(5, i), 'chain_symbol': symbols[i % 5], 'state': 'filled', 'legs': legs,
+                'created_at': '2020-01-08T14:59:00Z', 'direction': 'debit', 'quantity': '1.00000',
+                'type': 'limit', 'opening_strategy': 'long_call_spread', 'closing_strategy': None,
+                'price': '1.50000000', 'processed_quantity': '1.00000'})
+        self.positions = [{
+            'instrument': instrumentUrls[i], 'quantity': '{0:.5f}'.format(rand.randint(1, 100)),
+            'average_buy_price': self.quotes[symbols[i]]['previous_close'], 'url': '{0}/positions/{1}/'.format(API, i)}
+            for i in range(min(positions, stocks))]
+        self.portfolio = {'equity': '100000.0000', 'extended_hours_equity': None, 'market_value': '90000.0000'}
+        self.account = {'cash': '10000.0000', 'uncleared_deposits': '0.0000', 'account_number': '5RY82436',
+                        'url': '{0}/accounts/5RY82436/'.format(API)}
+        self.dividends = [{'instrument': instrumentUrls[i % stocks], 'amount': '1.25', 'state': 'paid'}
+                          for i in range(stocks * 4)]
+        self.currency_pairs = [{'id': make_id(6, i), 'symbol': '{0}-USD'.format(code), 'tradability': 'tradable',
+                                'asset_currency': {'code': code}, 'quote_currency': {'code': 'USD'}}
+                               for i, code in enumerate(('BTC', 'ETH', 'LTC', 'DOGE', 'BCH', 'ETC', 'BSV'))]
+
+    def historicals(self, symbol, span, interval, bounds):
+        """Returns the historicals response entry for one symbol, or one with no data points if it doesn't exist."""
+        quote = self.quotes.get(symbol)
+        points = []
+        if quote:
+            price = float(quote['previous_close'])
+            for p in range(self.historical_points):
+                points.append({'begins_at': '2015-01-{0:02d}T00:00:00Z'.format(p % 28 + 1),
+                               'open_price': '{0:.6f}'.format(price), 'close_price': '{0:.6f}'.format(price * 1.01),
+                               'high_price': '{0:.6f}'.format(price * 1.02), 'low_price': '{0:.6f}'.format(price * 0.98),
+                               'volume': 1000000 + p, 'session': 'reg', 'interpolated': False})
+        return({'symbol': symbol, 'span': span, 'interval': interval, 'bounds': bounds, 'historicals': points})
+
+    def save(self, path):
+        """Writes the fixtures to a json file."""
+        with open(path, 'w') as f:
+            json.dump(self.__dict__, f)
+
+    @classmethod
+    def load(cls, path):
+        """Reads fixtures written by save, or recorded from the real API in the same layout."""
+        fixtures = cls.__new__(cls)
+        with open(path) as f:
+            fixtures.__dict__.update(json.load(f))
+        return(fixtures)
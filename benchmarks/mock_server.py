@@ -0,0 +1,244 @@
+"""A local stand-in for the Robinhood API that serves fixture data over http.
+
+The server listens on 127.0.0.1. Sessions are pointed at it by mounting a MockAdapter, which rewrites requests
+for api.robinhood.com and nummus.robinhood.com to the server, so urls.py and the urls inside responses are used
+unchanged. Latency, page size, and error rate can be changed while the server runs.
+
+>>> with MockRobinhood(latency=0.005) as server:
+>>>     client = server.client()
+>>>     client.get_all_stock_orders()
+"""
+import json
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import robin_stocks  # noqa: E402
+from robin_stocks.transport import TransportAdapter  # noqa: E402
+
+try:
+    from benchmarks.fixtures import API, Fixtures
+except ImportError:
+    from fixtures import API, Fixtures
+
+# Maps each real host to the path prefix it is served under.
+HOSTS = {'https://api.robinhood.com': '', 'https://nummus.robinhood.com': '/nummus'}
+
+
+class MockAdapter(TransportAdapter):
+    """Sends requests for the Robinhood hosts to the mock server instead.
+
+    :param base_url: The url of the mock server, such as http://127.0.0.1:8000.
+    :type base_url: str
+
+    """
+
+    def __init__(self, base_url, **kwargs):
+        self.base_url = base_url
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        for host, prefix in HOSTS.items():
+            if request.url.startswith(host):
+                request.url = self.base_url + prefix + request.url[len(host):]
+                break
+        return(super().send(request, **kwargs))
+
+
+class MockRobinhood:
+    """Serves fixture data the way the Robinhood API does.
+
+    :param fixtures: The data to serve. Defaults to Fixtures().
+    :type fixtures: Optional[Fixtures]
+    :param latency: Seconds added to every response.
+    :type latency: Optional[float]
+    :param page_size: The number of results on each page of a paginated response.
+    :type page_size: Optional[int]
+    :param error_rate: The share of requests answered with 503 Service Unavailable.
+    :type error_rate: Optional[float]
+    :param seed: Seeds which requests fail.
+    :type seed: Optional[int]
+
+    """
+
+    def __init__(self, fixtures=None, latency=0.0, page_size=100, error_rate=0.0, seed=0):
+        self.fixtures = fixtures or Fixtures()
+        self.latency = latency
+        self.page_size = page_size
+        self.error_rate = error_rate
+        self.requests = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return('http://{0}:{1}'.format(host, port))
+
+    def start(self):
+        """Starts serving on a free port in a background thread."""
+        server = self
+
+        class Handler(RequestHandler):
+            mock = server
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return(self)
+
+    def stop(self):
+        """Stops the server."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return(self.start())
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def client(self, pool_size=None):
+        """Returns a logged in RobinhoodClient whose requests go to this server.
+
+        :param pool_size: The number of connections to keep open to the server.
+        :type pool_size: Optional[int]
+
+        """
+        client = robin_stocks.RobinhoodClient()
+        adapter = MockAdapter(self.base_url, pool_maxsize=pool_size)
+        client.session.mount('http://', adapter)
+        client.session.mount('https://', adapter)
+        client.logged_in = True
+        return(client)
+
+    def should_fail(self):
+        with self._lock:
+            self.requests += 1
+            return(self.error_rate > 0 and self._random.random() < self.error_rate)
+
+    def respond(self, method, path, query):
+        """Returns the status code and data for a request.
+
+        :param method: GET, POST, or DELETE.
+        :type method: str
+        :param path: The path of the request, including the host prefix.
+        :type path: str
+        :param query: The parsed query string.
+        :type query: dict
+        :returns: A tuple of the status code and the data to send as json.
+
+        """
+        f = self.fixtures
+        first = {key: values[0] for key, values in query.items()}
+        parts = [part for part in path.split('/') if part]
+        if method != 'GET':
+            return(201, {'id': 'mock', 'state': 'queued'})
+        if parts == ['nummus', 'currency_pairs']:
+            return(200, {'results': f.currency_pairs})
+        if parts == ['quotes']:
+            return(200, {'results': [f.quotes.get(symbol) for symbol in first['symbols'].split(',')]})
+        if parts == ['fundamentals']:
+            return(200, {'results': [f.fundamentals.get(symbol) for symbol in first['symbols'].split(',')]})
+        if parts == ['quotes', 'historicals']:
+            return(200, {'results': [f.historicals(symbol, first.get('span'), first.get('interval'), first.get('bounds'))
+                                     for symbol in first['symbols'].split(',')]})
+        if parts == ['instruments']:
+            if 'symbol' in first:
+                return(200, {'results': [item for item in f.instruments.values() if item['symbol'] == first['symbol']]})
+            if 'ids' in first:
+                return(200, {'results': [f.instruments.get(id) for id in first['ids'].split(',')]})
+            return(200, self.page(path, query, list(f.instruments.values())))
+        if len(parts) == 2 and parts[0] == 'instruments':
+            return(200, f.instruments[parts[1]]) if parts[1] in f.instruments else (404, {'detail': 'Not found.'})
+        if parts == ['orders']:
+            return(200, self.page(path, query, f.orders))
+        if parts == ['options', 'orders']:
+            return(200, self.page(path, query, f.option_orders))
+        if parts == ['positions']:
+            return(200, self.page(path, query, f.positions))
+        if parts == ['dividends']:
+            return(200, self.page(path, query, f.dividends))
+        if parts == ['portfolios']:
+            return(200, {'results': [f.portfolio]})
+        if parts == ['accounts']:
+            return(200, {'results': [f.account]})
+        if parts == ['options', 'instruments']:
+            options = [item for item in f.option_instruments.values()
+                       if all(item.get(key) == first[key] for key in ('chain_id', 'type', 'expiration_date',
+                                                                      'strike_price', 'state') if key in first)]
+            return(200, self.page(path, query, options))
+        if len(parts) == 3 and parts[:2] == ['options', 'instruments']:
+            return(200, f.option_instruments[parts[2]]) if parts[2] in f.option_instruments else (404, {'detail': 'Not found.'})
+        if parts == ['marketdata', 'options']:
+            ids = [url.rstrip('/').split('/')[-1] for url in first['instruments'].split(',')]
+            return(200, {'results': [f.option_market_data.get(id) for id in ids]})
+        if len(parts) == 3 and parts[:2] == ['marketdata', 'options']:
+            return(200, f.option_market_data[parts[2]]) if parts[2] in f.option_market_data else (404, {'detail': 'Not found.'})
+        return(404, {'detail': 'Not found.'})
+
+    def page(self, path, query, items):
+        """Returns one page of items, with a 'next' url that pages by cursor like the real API."""
+        cursor = int(query.get('cursor', ['0'])[0])
+        results = items[cursor:cursor + self.page_size]
+        next_url = None
+        if cursor + self.page_size < len(items):
+            nextQuery = dict(query, cursor=[str(cursor + self.page_size)])
+            next_url = '{0}{1}?{2}'.format(API, path, urlencode(nextQuery, doseq=True))
+        return({'previous': None, 'next': next_url, 'count': len(items), 'results': results})
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    """Answers requests with MockRobinhood.respond."""
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are written separately, so without this every response waits for a delayed ack.
+    disable_nagle_algorithm = True
+    mock = None
+
+    def handle_method(self, method):
+        parsed = urlparse(self.path)
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            self.rfile.read(length)
+        if self.mock.latency:
+            time.sleep(self.mock.latency)
+        if self.mock.should_fail():
+            status, data = 503, {'detail': 'Service unavailable.'}
+        else:
+            status, data = self.mock.respond(method, parsed.path, parse_qs(parsed.query))
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self.handle_method('GET')
+
+    def do_POST(self):
+        self.handle_method('POST')
+
+    def do_DELETE(self):
+        self.handle_method('DELETE')
+
+    def log_message(self, format, *args):
+        pass
+
+
+if __name__ == '__main__':
+    with MockRobinhood() as server:
+        print('Serving the mock Robinhood API at {0}. Press Ctrl+C to stop.'.format(server.base_url))
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
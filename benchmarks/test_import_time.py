@@ -0,0 +1,23 @@
+"""Measures how long a cold start takes to import robin_stocks.
+
+Each round starts a new interpreter, so the time includes starting python. Compare it with the python_startup
+benchmark to see the time spent importing robin_stocks itself.
+"""
+import subprocess
+import sys
+
+
+def run_python(code):
+    subprocess.run([sys.executable, '-c', code], check=True)
+
+
+def test_python_startup(benchmark):
+    benchmark.pedantic(run_python, args=('pass',), rounds=10, warmup_rounds=1)
+
+
+def test_import_robin_stocks(benchmark):
+    benchmark.pedantic(run_python, args=('import robin_stocks',), rounds=10, warmup_rounds=1)
+
+
+def test_import_and_call_one_function(benchmark):
+    benchmark.pedantic(run_python, args=('import robin_stocks; robin_stocks.get_quotes',), rounds=10, warmup_rounds=1)
@@ -0,0 +1,63 @@
+"""Measures the request layer against the mock Robinhood API.
+
+Run with:
+
+    python -m pytest benchmarks --benchmark-only
+
+Compare runs with --benchmark-autosave and --benchmark-compare to catch regressions before a release.
+"""
+import robin_stocks as r
+import robin_stocks.helper as helper
+import robin_stocks.transport as transport
+
+
+def test_get_all_stock_orders(measure, mock_api):
+    orders = measure(r.get_all_stock_orders)
+    assert len(orders) == len(mock_api.fixtures.orders)
+
+
+def test_get_all_stock_orders_with_latency(measure, mock_api):
+    mock_api.latency = 0.002
+    orders = measure(r.get_all_stock_orders)
+    assert len(orders) == len(mock_api.fixtures.orders)
+
+
+def test_build_holdings(measure, mock_api):
+    holdings = measure(r.build_holdings, with_dividends=True)
+    assert len(holdings) == len(mock_api.fixtures.positions)
+
+
+def test_find_options_for_stock_by_expiration(measure):
+    found = measure(r.find_options_for_stock_by_expiration, 'S001', '2020-03-17')
+    assert found and all('mark_price' in item for item in found)
+
+
+def test_get_historicals(measure, mock_api):
+    symbols = sorted(mock_api.fixtures.quotes)
+    data = measure(r.get_historicals, symbols, span='5year')
+    assert len(data) == len(symbols) * mock_api.fixtures.historical_points
+
+
+def test_get_quotes_for_many_symbols_concurrently(measure, mock_api):
+    mock_api.latency = 0.002
+    symbols = sorted(mock_api.fixtures.quotes)
+    quotes = measure(helper.map_concurrently, lambda symbol: r.get_quotes(symbol), symbols)
+    assert len(quotes) == len(symbols)
+
+
+def test_get_quotes_with_errors(measure, mock_api, monkeypatch):
+    mock_api.error_rate = 0.1
+    monkeypatch.setattr(transport, 'RETRY_BACKOFF', 0.001)
+    monkeypatch.setattr(transport, 'RETRY_ATTEMPTS', 8)
+    quotes = measure(r.get_quotes, sorted(mock_api.fixtures.quotes))
+    assert len(quotes) == len(mock_api.fixtures.quotes)
+
+
+def test_export_completed_stock_orders(measure, tmp_path):
+    measure(r.export_completed_stock_orders, str(tmp_path) + '/')
+    assert list(tmp_path.glob('stock_orders_*.csv'))
+
+
+def test_export_completed_option_orders(measure, tmp_path):
+    measure(r.export_completed_option_orders, str(tmp_path) + '/')
+    assert list(tmp_path.glob('option_orders_*.csv'))
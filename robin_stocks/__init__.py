@@ -1,141 +1,236 @@
-from .account import get_all_positions,             \
-                     get_bank_account_info,         \
-                     get_bank_transfers,            \
-                     unlink_bank_account,           \
-                     get_current_positions,         \
-                     get_dividends,                 \
-                     get_total_dividends,           \
-                     get_dividends_by_instrument,   \
-                     get_notifications,             \
-                     get_latest_notification,       \
-                     get_linked_bank_accounts,      \
-                     get_stock_loan_payments,       \
-                     get_subscription_fees,         \
-                     get_referrals,                 \
-                     get_day_trades,                \
-                     get_wire_transfers,            \
-                     get_margin_calls,              \
-                     get_margin_interest,           \
-                     get_documents,                 \
-                     download_document,             \
-                     download_all_documents,        \
-                     get_all_watchlists,            \
-                     get_watchlist_by_name,         \
-                     post_symbols_to_watchlist,     \
-                     delete_symbols_from_watchlist, \
-                     build_holdings,                \
-                     build_user_profile
-
-from .authentication import login, \
-                            logout
-
-from .crypto import load_crypto_profile,        \
-                    get_crypto_currency_pairs,  \
-                    get_crypto_info,            \
-                    get_crypto_quote,           \
-                    get_crypto_quote_from_id,   \
-                    get_crypto_positions,       \
-                    get_crypto_historical,      \
-                    get_crypto_historical_from_id
-
-from .export import export_completed_stock_orders, \
-                    export_completed_option_orders
-
-from .helper import request_get,      \
-                    request_post,     \
-                    request_delete,   \
-                    request_document, \
-                    update_session
-
-from .markets import get_currency_pairs,        \
-                     get_markets,               \
-                     get_top_movers
-
-from .options import get_aggregate_positions,                           \
-                     get_market_options,                                \
-                     get_all_option_positions,                          \
-                     get_open_option_positions,                         \
-                     get_chains,                                        \
-                     find_tradable_options_for_stock,                   \
-                     find_options_for_stock_by_expiration,              \
-                     find_options_for_stock_by_strike,                  \
-                     find_options_for_stock_by_expiration_and_strike,   \
-                     find_options_for_list_of_stocks_by_expiration_date,\
-                     get_list_market_data,                              \
-                     get_list_options_of_specific_profitability,        \
-                     get_option_market_data_by_id,                      \
-                     get_option_market_data,                            \
-                     get_option_instrument_data_by_id,                  \
-                     get_option_instrument_data,                        \
-                     get_option_historicals
-
-from .orders import get_all_stock_orders,           \
-                    get_all_option_orders,          \
-                    get_all_crypto_orders,          \
-                    get_all_open_stock_orders,      \
-                    get_all_open_option_orders,     \
-                    get_all_open_crypto_orders,     \
-                    get_stock_order_info,           \
-                    get_option_order_info,          \
-                    get_crypto_order_info,          \
-                    find_stock_orders,              \
-                    cancel_all_stock_orders,        \
-                    cancel_all_option_orders,       \
-                    cancel_all_crypto_orders,       \
-                    cancel_stock_order,             \
-                    cancel_option_order,            \
-                    cancel_crypto_order,            \
-                    order,                          \
-                    order_buy_market,               \
-                    order_buy_fractional_by_quantity,\
-                    order_buy_fractional_by_price,  \
-                    order_buy_limit,                \
-                    order_buy_stop_loss,            \
-                    order_buy_stop_limit,           \
-                    order_sell_market,              \
-                    order_sell_fractional_by_quantity,\
-                    order_sell_fractional_by_price, \
-                    order_sell_limit,               \
-                    order_sell_stop_loss,           \
-                    order_sell_stop_limit,          \
-                    order_buy_option_stop_limit,    \
-                    order_sell_option_stop_limit,   \
-                    order_buy_option_limit,         \
-                    order_sell_option_limit,        \
-                    order_option_spread,            \
-                    order_option_credit_spread,     \
-                    order_option_debit_spread,      \
-                    order_buy_crypto_by_price,      \
-                    order_buy_crypto_by_quantity,   \
-                    order_buy_crypto_limit,         \
-                    order_sell_crypto_by_price,     \
-                    order_sell_crypto_by_quantity,  \
-                    order_sell_crypto_limit
-
-from .profiles import load_account_profile,     \
-                      load_basic_profile,       \
-                      load_investment_profile,  \
-                      load_portfolio_profile,   \
-                      load_security_profile,    \
-                      load_user_profile
-
-from .stocks import get_quotes,                 \
-                    get_fundamentals,           \
-                    get_instruments_by_symbols, \
-                    get_instrument_by_url,      \
-                    get_latest_price,           \
-                    get_name_by_symbol,         \
-                    get_name_by_url,            \
-                    get_symbol_by_url,          \
-                    get_ratings,                \
-                    get_popularity,             \
-                    get_events,                 \
-                    get_earnings,               \
-                    get_news,                   \
-                    get_splits,                 \
-                    find_instrument_data,       \
-                    get_historicals,            \
-                    get_pricebook_by_id,        \
-                    get_pricebook_by_symbol,    \
-                    get_stock_quote_by_id,      \
-                    get_stock_quote_by_symbol
+"""A Python wrapper around the Robinhood API whose submodules are imported the first time they are used."""
+import importlib
+import logging
+
+# The public functions and classes of each submodule.
+EXPORTS = {
+    'account': ('get_all_positions',
+                'get_bank_account_info',
+                'get_bank_transfers',
+                'unlink_bank_account',
+                'get_current_positions',
+                'get_dividends',
+                'iter_dividends',
+                'get_total_dividends',
+                'get_dividends_by_instrument',
+                'load_dividend_index',
+                'DividendIndex',
+                'get_notifications',
+                'iter_notifications',
+                'get_latest_notification',
+                'get_linked_bank_accounts',
+                'get_stock_loan_payments',
+                'get_subscription_fees',
+                'get_referrals',
+                'get_day_trades',
+                'get_wire_transfers',
+                'get_margin_calls',
+                'get_margin_interest',
+                'get_documents',
+                'download_document',
+                'download_all_documents',
+                'get_all_watchlists',
+                'get_watchlist_by_name',
+                'post_symbols_to_watchlist',
+                'delete_symbols_from_watchlist',
+                'build_holdings',
+                'build_user_profile'),
+
+    'authentication': ('login',
+                       'logout'),
+
+    'client': ('RobinhoodClient',
+               'SessionPool',
+               'get_client'),
+
+    'crypto': ('load_crypto_profile',
+               'get_crypto_currency_pairs',
+               'get_crypto_info',
+               'get_crypto_quote',
+               'get_crypto_quote_from_id',
+               'get_crypto_positions',
+               'get_crypto_historical',
+               'get_crypto_historical_from_id'),
+
+    'decoding': ('set_json_backend',),
+
+    'exceptions': ('RobinhoodError',
+                   'InvalidArgumentError',
+                   'InvalidTickerError',
+                   'APIError',
+                   'PaginationError'),
+
+    'export': ('export_completed_stock_orders',
+               'export_completed_option_orders'),
+
+    'helper': ('request_get',
+               'request_post',
+               'request_delete',
+               'request_document',
+               'update_session',
+               'set_pagination_options',
+               'set_request_coalescing',
+               'set_response_cache',
+               'clear_response_cache',
+               'get_response_cache_stats',
+               'set_conditional_requests',
+               'get_conditional_request_stats',
+               'set_raise_errors',
+               'clear_instrument_cache',
+               'get_instrument_cache_stats'),
+
+    'instruments': ('open_instrument_index',
+                    'close_instrument_index'),
+
+    'markets': ('get_currency_pairs',
+                'get_markets',
+                'get_top_movers'),
+
+    'metrics': ('set_metrics',
+                'get_metrics',
+                'get_prometheus_metrics',
+                'reset_metrics',
+                'add_request_hook',
+                'remove_request_hook'),
+
+    'options': ('get_aggregate_positions',
+                'get_market_options',
+                'get_all_option_positions',
+                'get_open_option_positions',
+                'get_chains',
+                'find_tradable_options_for_stock',
+                'iter_tradable_options_for_stock',
+                'get_option_chain_snapshot',
+                'clear_option_chain_snapshots',
+                'OptionChainSnapshot',
+                'find_options_for_stock_by_expiration',
+                'find_options_for_stock_by_strike',
+                'find_options_for_stock_by_expiration_and_strike',
+                'find_options_for_list_of_stocks_by_expiration_date',
+                'get_list_market_data',
+                'get_list_options_of_specific_profitability',
+                'get_option_market_data_by_id',
+                'get_option_market_data_by_ids',
+                'get_option_market_data',
+                'get_option_instrument_data_by_id',
+                'get_option_instrument_data',
+                'get_option_historicals'),
+
+    'orders': ('get_all_stock_orders',
+               'get_all_option_orders',
+               'get_all_crypto_orders',
+               'iter_all_stock_orders',
+               'iter_all_option_orders',
+               'iter_all_crypto_orders',
+               'get_all_open_stock_orders',
+               'get_all_open_option_orders',
+               'get_all_open_crypto_orders',
+               'get_stock_order_info',
+               'get_option_order_info',
+               'get_crypto_order_info',
+               'find_stock_orders',
+               'cancel_all_stock_orders',
+               'cancel_all_option_orders',
+               'cancel_all_crypto_orders',
+               'cancel_stock_order',
+               'cancel_option_order',
+               'cancel_crypto_order',
+               'order',
+               'order_buy_market',
+               'order_buy_fractional_by_quantity',
+               'order_buy_fractional_by_price',
+               'order_buy_limit',
+               'order_buy_stop_loss',
+               'order_buy_stop_limit',
+               'order_sell_market',
+               'order_sell_fractional_by_quantity',
+               'order_sell_fractional_by_price',
+               'order_sell_limit',
+               'order_sell_stop_loss',
+               'order_sell_stop_limit',
+               'order_buy_option_stop_limit',
+               'order_sell_option_stop_limit',
+               'order_buy_option_limit',
+               'order_sell_option_limit',
+               'order_option_spread',
+               'order_option_credit_spread',
+               'order_option_debit_spread',
+               'order_buy_crypto_by_price',
+               'order_buy_crypto_by_quantity',
+               'order_buy_crypto_limit',
+               'order_sell_crypto_by_price',
+               'order_sell_crypto_by_quantity',
+               'order_sell_crypto_limit'),
+
+    'profiles': ('load_account_profile',
+                 'load_basic_profile',
+                 'load_investment_profile',
+                 'load_portfolio_profile',
+                 'load_security_profile',
+                 'load_user_profile'),
+
+    'replay': ('start_recording',
+               'stop_recording',
+               'start_replay',
+               'stop_replay'),
+
+    'stocks': ('get_quotes',
+               'set_quote_batching',
+               'get_fundamentals',
+               'get_instruments_by_symbols',
+               'get_instrument_by_url',
+               'warm_instrument_index',
+               'get_latest_price',
+               'get_name_by_symbol',
+               'get_name_by_url',
+               'get_symbol_by_url',
+               'get_ratings',
+               'get_popularity',
+               'get_events',
+               'get_earnings',
+               'get_news',
+               'get_splits',
+               'find_instrument_data',
+               'get_historicals',
+               'get_pricebook_by_id',
+               'get_pricebook_by_symbol',
+               'get_stock_quote_by_id',
+               'get_stock_quote_by_symbol'),
+
+    'transport': ('set_transport_options',
+                  'set_rate_limit',
+                  'set_retry_options',
+                  'get_transport_stats')
+}
+
+# The submodule each public name is found in.
+_LOCATIONS = {name: module for module, names in EXPORTS.items() for name in names}
+
+__all__ = sorted(_LOCATIONS)
+
+# Kept because importing robin_stocks.globals replaces the name globals in this namespace with that module.
+_NAMESPACE = globals()
+
+
+def __getattr__(name):
+    """Imports the submodule that defines name the first time name is used, and keeps the result so that later \
+    lookups are plain attribute reads. Submodules, such as robin_stocks.helper, can be reached the same way."""
+    module = _LOCATIONS.get(name)
+    if module is None:
+        try:
+            return(importlib.import_module('.' + name, __name__))
+        except ModuleNotFoundError as error:
+            if error.name != __name__ + '.' + name:
+                raise
+            raise AttributeError('module {0!r} has no attribute {1!r}'.format(__name__, name)) from None
+    value = getattr(importlib.import_module('.' + module, __name__), name)
+    _NAMESPACE[name] = value
+    return(value)
+
+
+def __dir__():
+    return(sorted(set(_NAMESPACE) | set(_LOCATIONS)))
+
+
+# Diagnostics go to the robin_stocks loggers and are dropped unless the application configures logging.
+logging.getLogger('robin_stocks').addHandler(logging.NullHandler())
@@ -1,10 +1,14 @@
 """Contains functions for getting information related to the user account."""
+import logging
 import os
 
 import robin_stocks.helper as helper
 import robin_stocks.profiles as profiles
 import robin_stocks.stocks as stocks
 import robin_stocks.urls as urls
+from robin_stocks.exceptions import InvalidArgumentError
+
+logger = logging.getLogger(__name__)
 
 
 @helper.login_required
@@ -57,6 +61,104 @@ def get_dividends(info=None):
     return(helper.filter(data, info))
 
 
+@helper.login_required
+def iter_dividends(info=None):
+    """Same as get_dividends, but yields the dividend transactions one at a time as each page is loaded.
+    No more pages are loaded once you stop iterating.
+
+    :param info: Will filter the results to get a specific value.
+    :type info: Optional[str]
+    :returns: Returns a generator of dictionaries of key/value pairs for each divident payment. If info parameter is provided, \
+    a generator of strings is returned where the strings are the value of the key that matches info.
+
+    """
+    url = urls.dividends()
+    data = helper.request_get(url, 'pagination', stream=True)
+    return(helper.filter_iter(data, info))
+
+
+class DividendIndex:
+    """Dividend transactions grouped by instrument url, with the rate, amount, and amount paid to date of each instrument \
+    kept up to date as transactions are added. Built once from get_dividends() and reused for every lookup.
+
+    :param dividends: The information returned by get_dividends(), or any iterable of dividend transactions.
+    :type dividends: Optional[list]
+
+    """
+
+    def __init__(self, dividends=None):
+        self.by_instrument = {}
+        self.total = 0.0
+        self._summaries = {}
+        if dividends:
+            self.add(dividends)
+
+    def add(self, dividends):
+        """Adds dividend transactions to the index, such as the items of a newly loaded page.
+
+        :param dividends: An iterable of dividend transactions.
+        :type dividends: iterable
+        :returns: None
+
+        """
+        for item in dividends:
+            if not item:
+                continue
+            instrument = item['instrument']
+            self.by_instrument.setdefault(instrument, []).append(item)
+            self.total += float(item['amount'])
+            summary = self._summaries.get(instrument)
+            try:
+                if summary is None:
+                    self._summaries[instrument] = {
+                        'dividend_rate': float(item['rate']),
+                        'total_dividend': float(item['amount']),
+                        'amount_paid_to_date': float(item['amount'])}
+                elif summary is not False:
+                    summary['amount_paid_to_date'] += float(item['amount'])
+            except (KeyError, TypeError, ValueError):
+                # Same as get_dividends_by_instrument, an instrument with bad data has no summary.
+                self._summaries[instrument] = False
+
+    def get(self, instrument):
+        """Returns the dividend summary of one instrument.
+
+        :param instrument: The instrument url.
+        :type instrument: str
+        :returns: A dictionary with the keys dividend_rate, total_dividend, and amount_paid_to_date, \
+        or None if the instrument has no dividends.
+
+        """
+        summary = self._summaries.get(instrument)
+        if not summary:
+            return(None)
+        return({key: "{0:.2f}".format(value) for key, value in summary.items()})
+
+    def instruments(self):
+        """Returns the url of every instrument that has paid a dividend.
+
+        :returns: A list of strings.
+
+        """
+        return(list(self.by_instrument))
+
+    def __len__(self):
+        return(sum(len(items) for items in self.by_instrument.values()))
+
+
+@helper.login_required
+def load_dividend_index():
+    """Loads every dividend transaction into a DividendIndex. Each page is added to the index as soon as it arrives.
+
+    :returns: A DividendIndex.
+
+    """
+    url = urls.dividends()
+    index = DividendIndex()
+    index.add(helper.request_get(url, 'pagination', stream=True))
+    return(index)
+
+
 @helper.login_required
 def get_total_dividends():
     """Returns a float number representing the total amount of dividends paid to the account.
@@ -64,13 +166,7 @@ def get_total_dividends():
     :returns: Total dollar amount of dividends paid to the account as a 2 precision float.
 
     """
-    url = urls.dividends()
-    data = helper.request_get(url, 'pagination')
-
-    dividend_total = 0
-    for item in data:
-        dividend_total += float(item['amount'])
-    return(dividend_total)
+    return(load_dividend_index().total)
 
 
 @helper.login_required
@@ -79,26 +175,18 @@ def get_dividends_by_instrument(instrument, dividend_data):
 
     :param instrument: The instrument to get the dividend data.
     :type instrument: str
-    :param dividend_data: The information returned by get_dividends().
-    :type dividend_data: list
+    :param dividend_data: The information returned by get_dividends(), or a DividendIndex. \
+    Pass a DividendIndex when looking up many instruments so the dividends are only grouped once.
+    :type dividend_data: list or DividendIndex
     :returns: dividend_rate       -- the rate paid for a single share of a specified stock \
               total_dividend      -- the total dividend paid based on total shares for a specified stock \
               amount_paid_to_date -- total amount earned by account for this particular stock
     """
-    #global dividend_data
     try:
-        data = list(
-            filter(lambda x: x['instrument'] == instrument, dividend_data))
-
-        dividend = float(data[0]['rate'])
-        total_dividends = float(data[0]['amount'])
-        total_amount_paid = float(sum([float(d['amount']) for d in data]))
-
-        return {
-            'dividend_rate': "{0:.2f}".format(dividend),
-            'total_dividend': "{0:.2f}".format(total_dividends),
-            'amount_paid_to_date': "{0:.2f}".format(total_amount_paid)
-        }
+        if not isinstance(dividend_data, DividendIndex):
+            dividend_data = DividendIndex(
+                item for item in dividend_data if item['instrument'] == instrument)
+        return(dividend_data.get(instrument))
     except:
         pass
 
@@ -119,6 +207,22 @@ def get_notifications(info=None):
     return(helper.filter(data, info))
 
 
+@helper.login_required
+def iter_notifications(info=None):
+    """Same as get_notifications, but yields the notifications one at a time as each page is loaded.
+    No more pages are loaded once you stop iterating.
+
+    :param info: Will filter the results to get a specific value.
+    :type info: Optional[str]
+    :returns: Returns a generator of dictionaries of key/value pairs for each notification. If info parameter is provided, \
+    a generator of strings is returned where the strings are the value of the key that matches info.
+
+    """
+    url = urls.notifications()
+    data = helper.request_get(url, 'pagination', stream=True)
+    return(helper.filter_iter(data, info))
+
+
 @helper.login_required
 def get_latest_notification():
     """Returns the time of the latest notification.
@@ -160,7 +264,7 @@ def get_margin_calls(symbol=None):
         try:
             symbol = symbol.upper().strip()
         except AttributeError as message:
-            print(message)
+            helper.report_error(InvalidArgumentError(str(message), 'symbol', symbol), message, logger)
             return None
         payload = {'equity_instrument_id', helper.id_for_stock(symbol)}
         data = helper.request_get(url, 'results', payload)
@@ -338,7 +442,7 @@ def download_document(url, name=None, dirpath=None):
     """
     data = helper.request_document(url)
 
-    print('Writing PDF...')
+    logger.debug('Writing PDF...')
     if not name:
         name = url[36:].split('/', 1)[0]
 
@@ -351,7 +455,7 @@ def download_document(url, name=None, dirpath=None):
     os.makedirs(os.path.dirname(filename), exist_ok=True)
 
     open(filename, 'wb').write(data.content)
-    print('Done - Wrote file {}.pdf to {}'.format(name, os.path.abspath(filename)))
+    logger.info('Done - Wrote file %s.pdf to %s', name, os.path.abspath(filename))
 
     return(data)
 
@@ -389,7 +493,7 @@ def download_all_documents(doctype=None, dirpath=None):
                 open(filename, 'wb').write(data.content)
                 downloaded_files = True
                 counter += 1
-                print('Writing PDF {}...'.format(counter))
+                logger.debug('Writing PDF %d...', counter)
         else:
             if item['type'] == doctype:
                 data = helper.request_document(item['download_url'])
@@ -401,17 +505,12 @@ def download_all_documents(doctype=None, dirpath=None):
                     open(filename, 'wb').write(data.content)
                     downloaded_files = True
                     counter += 1
-                    print('Writing PDF {}...'.format(counter))
+                    logger.debug('Writing PDF %d...', counter)
 
     if downloaded_files == False:
-        print('WARNING: Could not find files of that doctype to download')
+        logger.warning('Could not find files of that doctype to download')
     else:
-        if counter == 1:
-            print('Done - wrote {} file to {}'.format(counter,
-                                                      os.path.abspath(directory)))
-        else:
-            print('Done - wrote {} files to {}'.format(counter,
-                                                       os.path.abspath(directory)))
+        logger.info('Done - wrote %d file(s) to %s', counter, os.path.abspath(directory))
 
     return(documents)
 
@@ -515,7 +614,7 @@ def build_holdings(with_dividends=False):
 
     # user wants dividend information in their holdings
     if with_dividends is True:
-        dividend_data = get_dividends()
+        dividend_data = load_dividend_index()
 
     if not positions_data or not portfolios_data or not accounts_data:
         return({})
@@ -529,18 +628,32 @@ def build_holdings(with_dividends=False):
     cash = "{0:.2f}".format(
         float(accounts_data['cash']) + float(accounts_data['uncleared_deposits']))
 
-    holdings = {}
-    for item in positions_data:
-        # It is possible for positions_data to be [None]
-        if not item:
-            continue
+    positions_data = [item for item in positions_data if item]
+    # Load everything for all positions at once instead of several requests per position.
+    instruments_data = helper.instruments_for_urls(
+        [item['instrument'] for item in positions_data])
+    symbols = [item['symbol'] for item in instruments_data if item]
+    quotes_data = {}
+    fundamentals_data = {}
+    if symbols:
+        for quote in stocks.get_quotes(symbols) or []:
+            if quote:
+                quotes_data[quote['symbol']] = quote
+        for fundamental in stocks.get_fundamentals(symbols) or []:
+            if fundamental:
+                fundamentals_data[fundamental['symbol']] = fundamental
 
+    holdings = {}
+    for item, instrument_data in zip(positions_data, instruments_data):
         try:
-            instrument_data = stocks.get_instrument_by_url(item['instrument'])
             symbol = instrument_data['symbol']
-            fundamental_data = stocks.get_fundamentals(symbol)[0]
+            fundamental_data = fundamentals_data[symbol]
 
-            price = stocks.get_latest_price(instrument_data['symbol'])[0]
+            quote = quotes_data[symbol]
+            if quote['last_extended_hours_trade_price'] is None:
+                price = quote['last_trade_price']
+            else:
+                price = quote['last_extended_hours_trade_price']
             quantity = item['quantity']
             equity = float(item['quantity']) * float(price)
             equity_change = (float(quantity) * float(price)) - \
@@ -552,6 +665,8 @@ def build_holdings(with_dividends=False):
             else:
                 percent_change = (float(
                     price) - float(item['average_buy_price'])) * 100 / float(item['average_buy_price'])
+            # Same as stocks.get_name_by_symbol, using the instrument data that was already loaded.
+            name = instrument_data.get('simple_name') or instrument_data.get('name') or ""
 
             holdings[symbol] = ({'price': price})
             holdings[symbol].update({'quantity': quantity})
@@ -563,8 +678,7 @@ def build_holdings(with_dividends=False):
             holdings[symbol].update(
                 {'equity_change': "{0:2f}".format(equity_change)})
             holdings[symbol].update({'type': instrument_data['type']})
-            holdings[symbol].update(
-                {'name': stocks.get_name_by_symbol(symbol)})
+            holdings[symbol].update({'name': name})
             holdings[symbol].update({'id': instrument_data['id']})
             holdings[symbol].update({'pe_ratio': fundamental_data['pe_ratio']})
             holdings[symbol].update(
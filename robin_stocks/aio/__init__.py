@@ -0,0 +1,11 @@
+"""Asyncio versions of the robin_stocks functions, which run on the event loop when the aio extra is installed."""
+from robin_stocks.aio import (account, authentication, crypto, markets,
+                              options, orders, profiles, stocks)
+from robin_stocks.aio.base import close, run, set_concurrency
+
+__all__ = ['close', 'run', 'set_concurrency']
+for _module in (account, authentication, crypto, markets, options, orders, profiles, stocks):
+    for _name in _module.__all__:
+        globals()[_name] = getattr(_module, _name)
+        __all__.append(_name)
+del _module, _name
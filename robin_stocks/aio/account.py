@@ -0,0 +1,5 @@
+"""Asyncio versions of the functions in robin_stocks.account."""
+import robin_stocks.account as account
+from robin_stocks.aio.base import wrap_module
+
+wrap_module(account, globals())
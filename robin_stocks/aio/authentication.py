@@ -0,0 +1,5 @@
+"""Asyncio versions of the functions in robin_stocks.authentication."""
+import robin_stocks.authentication as authentication
+from robin_stocks.aio.base import wrap_module
+
+wrap_module(authentication, globals())
@@ -0,0 +1,169 @@
+"""Contains the functions that turn the blocking robin_stocks functions into coroutines."""
+import asyncio
+import contextvars
+import inspect
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial, wraps
+
+from robin_stocks.client import get_client
+
+try:
+    import robin_stocks.aio.transport as transport
+    from robin_stocks.aio.bridge import greenlet_spawn
+except ImportError:
+    # Without the aio extra (aiohttp and greenlet) calls run on worker threads instead.
+    transport = None
+
+# The number of calls that can run at the same time.
+CONCURRENCY = 10
+
+_EXECUTOR = None
+_LOCK = threading.Lock()
+# The semaphore that limits the calls running on each event loop.
+_SEMAPHORES = {}
+# Returned by next() when a generator is exhausted.
+_DONE = object()
+
+
+def set_concurrency(limit):
+    """Sets the most calls that can run at the same time. Calls beyond the limit wait for one to finish.
+
+    :param limit: The number of calls.
+    :type limit: int
+    :returns: None
+
+    """
+    global CONCURRENCY, _EXECUTOR
+    with _LOCK:
+        CONCURRENCY = max(1, int(limit))
+        _SEMAPHORES.clear()
+        if _EXECUTOR is not None:
+            _EXECUTOR.shutdown(wait=False)
+            _EXECUTOR = None
+
+
+def get_semaphore():
+    """Returns the semaphore that limits the calls running on the current event loop, creating it on first use.
+
+    :returns: An asyncio.Semaphore.
+
+    """
+    loop = asyncio.get_running_loop()
+    with _LOCK:
+        for closed in [each for each in _SEMAPHORES if each.is_closed()]:
+            del _SEMAPHORES[closed]
+        if loop not in _SEMAPHORES:
+            _SEMAPHORES[loop] = asyncio.Semaphore(CONCURRENCY)
+        return(_SEMAPHORES[loop])
+
+
+def get_executor():
+    """Returns the pool of worker threads used when the aio extra is not installed, creating it on first use.
+
+    :returns: A ThreadPoolExecutor.
+
+    """
+    global _EXECUTOR
+    with _LOCK:
+        if _EXECUTOR is None:
+            _EXECUTOR = ThreadPoolExecutor(max_workers=CONCURRENCY,
+                                           thread_name_prefix='robin_stocks_aio')
+        return(_EXECUTOR)
+
+
+async def run(func, *args, **kwargs):
+    """Runs a blocking robin_stocks function on the event loop and waits for its result. Its requests are sent \
+    with aiohttp, and its waits and concurrent calls are run on the loop, so no thread is used. Without the aio \
+    extra, the function runs on a pool of worker threads instead.
+
+    :param func: The function to call.
+    :type func: function
+    :returns: The return value of func.
+
+    """
+    if transport is None:
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        return(await loop.run_in_executor(get_executor(), partial(context.run, func, *args, **kwargs)))
+    client = transport.get_aio_client(get_client())
+    async with get_semaphore():
+        return(await greenlet_spawn(client.call, func, *args, **kwargs))
+
+
+async def close():
+    """Closes the connections opened by the calls on the running event loop. Call it when those calls are done, \
+    before the loop is closed. Does nothing if the aio extra is not installed.
+
+    :returns: None
+
+    """
+    if transport is not None:
+        await transport.close()
+
+
+def wrap(func):
+    """Returns a coroutine function that calls func with run.
+
+    :param func: A blocking robin_stocks function.
+    :type func: function
+    :returns: A coroutine function with the same name, signature, and docstring.
+
+    """
+    @wraps(func)
+    async def coroutine_wrapper(*args, **kwargs):
+        return(await run(func, *args, **kwargs))
+    return(coroutine_wrapper)
+
+
+def wrap_iterator(func):
+    """Returns an async generator function for a function that returns an iterator, such as the iter_ functions.
+    Each item is loaded with run, so pages are only requested as the items are consumed.
+
+    :param func: A blocking robin_stocks function that returns an iterator.
+    :type func: function
+    :returns: An async generator function with the same name, signature, and docstring.
+
+    """
+    @wraps(func)
+    async def iterator_wrapper(*args, **kwargs):
+        iterator = await run(func, *args, **kwargs)
+        try:
+            while True:
+                item = await run(next, iterator, _DONE)
+                if item is _DONE:
+                    return
+                yield item
+        finally:
+            close = getattr(iterator, 'close', None)
+            if close is not None:
+                await run(close)
+    return(iterator_wrapper)
+
+
+def wrap_module(module, namespace):
+    """Adds an async version of every public function defined in module to namespace. Classes are added unchanged.
+
+    :param module: A robin_stocks module such as robin_stocks.stocks.
+    :type module: module
+    :param namespace: The globals() of the aio module being filled in.
+    :type namespace: dict
+    :returns: A list of the names that were added.
+
+    """
+    names = []
+    for name, value in vars(module).items():
+        if name.startswith('_') or getattr(value, '__module__', None) != module.__name__:
+            continue
+        if inspect.isclass(value):
+            namespace[name] = value
+        elif inspect.isfunction(value):
+            if name.startswith('iter_'):
+                namespace[name] = wrap_iterator(value)
+            else:
+                namespace[name] = wrap(value)
+        else:
+            continue
+        names.append(name)
+    namespace['__all__'] = names
+    return(names)
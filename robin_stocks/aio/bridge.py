@@ -0,0 +1,60 @@
+"""Contains the functions that run the blocking robin_stocks functions as coroutines on the event loop."""
+import contextvars
+import sys
+
+from greenlet import getcurrent, greenlet
+
+
+class _BridgeGreenlet(greenlet):
+    """A greenlet running a blocking function for greenlet_spawn. Switching to its driver hands an awaitable back \
+    to the coroutine that started it."""
+
+    def __init__(self, func, driver):
+        super().__init__(func, driver)
+        self.driver = driver
+
+
+def in_greenlet():
+    """Returns whether the caller is running inside a function started by greenlet_spawn.
+
+    :returns: A boolean.
+
+    """
+    return(isinstance(getcurrent(), _BridgeGreenlet))
+
+
+def await_only(awaitable):
+    """Waits for an awaitable from a blocking function started by greenlet_spawn. The event loop keeps running \
+    other coroutines until the awaitable is done.
+
+    :param awaitable: A coroutine, task, or future.
+    :type awaitable: awaitable
+    :returns: The result of the awaitable. Exceptions it raises are raised here.
+
+    """
+    current = getcurrent()
+    if not isinstance(current, _BridgeGreenlet):
+        raise RuntimeError('await_only can only be called from a function started by greenlet_spawn')
+    return(current.driver.switch(awaitable))
+
+
+async def greenlet_spawn(func, *args, **kwargs):
+    """Calls a blocking function in a greenlet and awaits every awaitable it passes to await_only, so that the \
+    function runs on the event loop without a thread.
+
+    :param func: The function to call.
+    :type func: function
+    :returns: The return value of func.
+
+    """
+    child = _BridgeGreenlet(func, getcurrent())
+    child.gr_context = contextvars.copy_context()
+    result = child.switch(*args, **kwargs)
+    while not child.dead:
+        try:
+            value = await result
+        except BaseException:
+            result = child.throw(*sys.exc_info())
+        else:
+            result = child.switch(value)
+    return(result)
@@ -0,0 +1,5 @@
+"""Asyncio versions of the functions in robin_stocks.crypto."""
+import robin_stocks.crypto as crypto
+from robin_stocks.aio.base import wrap_module
+
+wrap_module(crypto, globals())
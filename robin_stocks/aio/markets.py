@@ -0,0 +1,5 @@
+"""Asyncio versions of the functions in robin_stocks.markets."""
+import robin_stocks.markets as markets
+from robin_stocks.aio.base import wrap_module
+
+wrap_module(markets, globals())
@@ -0,0 +1,5 @@
+"""Asyncio versions of the functions in robin_stocks.options."""
+import robin_stocks.options as options
+from robin_stocks.aio.base import wrap_module
+
+wrap_module(options, globals())
@@ -0,0 +1,5 @@
+"""Asyncio versions of the functions in robin_stocks.orders."""
+import robin_stocks.orders as orders
+from robin_stocks.aio.base import wrap_module
+
+wrap_module(orders, globals())
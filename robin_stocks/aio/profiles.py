@@ -0,0 +1,5 @@
+"""Asyncio versions of the functions in robin_stocks.profiles."""
+import robin_stocks.profiles as profiles
+from robin_stocks.aio.base import wrap_module
+
+wrap_module(profiles, globals())
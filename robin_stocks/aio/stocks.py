@@ -0,0 +1,5 @@
+"""Asyncio versions of the functions in robin_stocks.stocks."""
+import robin_stocks.stocks as stocks
+from robin_stocks.aio.base import wrap_module
+
+wrap_module(stocks, globals())
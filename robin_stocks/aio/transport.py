@@ -0,0 +1,285 @@
+"""Contains the aiohttp transport that robin_stocks.aio sends requests with."""
+import asyncio
+import time
+
+import aiohttp
+import requests
+import robin_stocks.transport as transport
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from robin_stocks.aio.bridge import await_only, greenlet_spawn, in_greenlet
+from robin_stocks.client import RobinhoodClient
+
+# The aiohttp session of each event loop. Every call on a loop shares its connection pool.
+SESSIONS = {}
+# The longest time in seconds that AioClient.wait sleeps between checks of an event.
+WAIT_INTERVAL = 0.01
+
+
+def get_session():
+    """Returns the aiohttp session of the running event loop, creating it on first use. Its connection pool \
+    keeps up to transport.POOL_MAXSIZE connections open to each host.
+
+    :returns: An aiohttp.ClientSession.
+
+    """
+    loop = asyncio.get_running_loop()
+    for closed in [each for each in SESSIONS if each.is_closed()]:
+        del SESSIONS[closed]
+    session = SESSIONS.get(loop)
+    if session is None or session.closed:
+        connector = aiohttp.TCPConnector(limit=0, limit_per_host=transport.POOL_MAXSIZE,
+                                         ttl_dns_cache=transport.DNS_CACHE_TTL or 10)
+        # Cookies are not kept, so that clients of different accounts can share the session.
+        session = SESSIONS[loop] = aiohttp.ClientSession(connector=connector, cookie_jar=aiohttp.DummyCookieJar())
+    return(session)
+
+
+async def close():
+    """Closes the aiohttp session of the running event loop. Call it before the loop is closed.
+
+    :returns: None
+
+    """
+    session = SESSIONS.pop(asyncio.get_running_loop(), None)
+    if session is not None:
+        await session.close()
+
+
+def encode_params(values):
+    """Turns the params or form data of a request into the pairs aiohttp expects, the same way requests does: \
+    None values are left out, lists become repeated keys, and everything else is turned into a string.
+
+    :param values: The params or data of a request.
+    :type values: Optional[dict]
+    :returns: A list of (key, value) tuples, or values unchanged if it is not a dictionary.
+
+    """
+    if not isinstance(values, dict):
+        return(values)
+    pairs = []
+    for key, value in values.items():
+        for item in (value if isinstance(value, (list, tuple)) else [value]):
+            if item is not None:
+                pairs.append((key, item if isinstance(item, str) else str(item)))
+    return(pairs)
+
+
+def client_timeout(timeout):
+    """Turns a requests timeout, either a number or a (connect, read) tuple, into an aiohttp.ClientTimeout."""
+    if timeout is None:
+        return(aiohttp.ClientTimeout(total=None))
+    if isinstance(timeout, tuple):
+        connect, read = timeout
+    else:
+        connect = read = timeout
+    return(aiohttp.ClientTimeout(total=None, sock_connect=connect, sock_read=read))
+
+
+async def send(method, url, params=None, data=None, json=None, headers=None, timeout=None, allow_redirects=True):
+    """Sends a request with the aiohttp session of the running event loop.
+
+    :param method: The http method, such as 'GET'.
+    :type method: str
+    :param url: The url to request.
+    :type url: str
+    :returns: A requests.Response, so the response is handled the same way as one sent by requests. Connection \
+    errors and timeouts are raised as the requests exceptions for them.
+
+    """
+    try:
+        async with get_session().request(method, url, params=encode_params(params), data=encode_params(data),
+                                         json=json, headers=headers, timeout=client_timeout(timeout),
+                                         allow_redirects=allow_redirects) as res:
+            content = await res.read()
+    except asyncio.TimeoutError as error:
+        raise requests.exceptions.Timeout('{0} timed out'.format(url)) from error
+    except aiohttp.ClientConnectionError as error:
+        raise requests.exceptions.ConnectionError(str(error)) from error
+    except aiohttp.ClientError as error:
+        raise requests.exceptions.RequestException(str(error)) from error
+    response = requests.Response()
+    response.status_code = res.status
+    response.reason = res.reason
+    response.headers = CaseInsensitiveDict(res.headers)
+    response.url = str(res.url)
+    response.encoding = res.charset
+    response._content = content
+    return(response)
+
+
+class AioSession:
+    """Sends the requests of a RobinhoodClient session with aiohttp while a function runs through robin_stocks.aio. \
+    The headers of the wrapped session are used, so logging in with either one logs in both.
+
+    :param session: The session of the client.
+    :type session: requests.Session
+
+    """
+
+    def __init__(self, session):
+        self.session = session
+
+    @property
+    def headers(self):
+        return(self.session.headers)
+
+    @headers.setter
+    def headers(self, value):
+        self.session.headers = value
+
+    def request(self, method, url, params=None, data=None, json=None, headers=None, timeout=None,
+                allow_redirects=True):
+        """Sends a request and waits for the response without blocking the event loop. Sessions with a custom \
+        adapter mounted, such as a recording or replay, keep sending through that adapter.
+
+        :returns: A requests.Response.
+
+        """
+        if type(self.session.get_adapter(url)) not in (transport.TransportAdapter, HTTPAdapter):
+            return(self.session.request(method, url, params=params, data=data, json=json, headers=headers,
+                                        timeout=timeout, allow_redirects=allow_redirects))
+        merged = dict(self.session.headers)
+        merged.update(headers or {})
+        return(await_only(send(method, url, params=params, data=data, json=json, headers=merged, timeout=timeout,
+                               allow_redirects=allow_redirects)))
+
+    def get(self, url, **kwargs):
+        return(self.request('GET', url, **kwargs))
+
+    def post(self, url, **kwargs):
+        return(self.request('POST', url, **kwargs))
+
+    def delete(self, url, **kwargs):
+        return(self.request('DELETE', url, **kwargs))
+
+    def sleep(self, seconds):
+        """Waits a number of seconds, such as before retrying a request, while the event loop keeps running."""
+        await_only(asyncio.sleep(seconds))
+
+    def __getattr__(self, name):
+        return(getattr(self.session, name))
+
+
+class AioFuture:
+    """The result of a call started by AioExecutor.submit.
+
+    :param task: The task running the call.
+    :type task: asyncio.Task
+
+    """
+
+    def __init__(self, task):
+        self.task = task
+
+    def result(self):
+        """Waits for the call to finish without blocking the event loop and returns its result."""
+        return(await_only(self.task))
+
+    def cancel(self):
+        return(self.task.cancel())
+
+    def done(self):
+        return(self.task.done())
+
+
+class AioExecutor:
+    """Runs calls as tasks on the event loop instead of on threads. Used in place of a ThreadPoolExecutor by AioClient.
+
+    :param max_workers: The most calls that can run at the same time.
+    :type max_workers: int
+
+    """
+
+    def __init__(self, max_workers):
+        self._semaphore = asyncio.Semaphore(max(1, max_workers))
+        self._tasks = []
+
+    async def _run(self, func, args):
+        async with self._semaphore:
+            return(await greenlet_spawn(func, *args))
+
+    def submit(self, func, *args):
+        """Starts a call.
+
+        :param func: The function to call.
+        :type func: function
+        :returns: An AioFuture.
+
+        """
+        task = asyncio.ensure_future(self._run(func, args))
+        self._tasks.append(task)
+        return(AioFuture(task))
+
+    def __enter__(self):
+        return(self)
+
+    def __exit__(self, *args):
+        # Like a ThreadPoolExecutor, wait for the calls that were started, including ones that were cancelled.
+        pending = [task for task in self._tasks if not task.done()]
+        if pending:
+            if in_greenlet():
+                await_only(asyncio.gather(*pending, return_exceptions=True))
+            else:
+                for task in pending:
+                    task.cancel()
+        for task in self._tasks:
+            if task.done() and not task.cancelled():
+                # Mark the error as seen, since the caller may have stopped before asking for this result.
+                task.exception()
+
+
+class AioClient(RobinhoodClient):
+    """The client that functions called through robin_stocks.aio run with. It shares the session headers and \
+    login state of a RobinhoodClient, and sends requests, waits, and concurrent calls on the running event loop.
+
+    :param client: The client to share the login of.
+    :type client: RobinhoodClient
+
+    """
+
+    def __init__(self, client):
+        self.client = client
+        self.session = AioSession(client.session)
+
+    @property
+    def logged_in(self):
+        return(self.client.logged_in)
+
+    @logged_in.setter
+    def logged_in(self, value):
+        self.client.logged_in = value
+
+    def executor(self, max_workers):
+        """Returns an AioExecutor, so that the pages of a paginated request are loaded as tasks on the event loop."""
+        return(AioExecutor(max_workers))
+
+    def wait(self, event, timeout=None):
+        """Waits for a threading.Event without blocking the event loop, checking it at growing intervals of up \
+        to WAIT_INTERVAL seconds. The event may be set by a coroutine on the same loop or by another thread."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        interval = 0.0005
+        while not event.is_set():
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return(False)
+                interval = min(interval, remaining)
+            await_only(asyncio.sleep(interval))
+            interval = min(interval * 2, WAIT_INTERVAL)
+        return(True)
+
+
+def get_aio_client(client):
+    """Returns the AioClient for a client, creating it on first use.
+
+    :param client: The client to share the login of.
+    :type client: RobinhoodClient
+    :returns: An AioClient.
+
+    """
+    # Kept on the client, so that requests made through it share the response cache and in-flight requests.
+    aioClient = vars(client).get('_aio_client')
+    if aioClient is None:
+        aioClient = client._aio_client = AioClient(client)
+    return(aioClient)
@@ -1,5 +1,6 @@
 """Contains all functions for the purpose of logging in and out to Robinhood."""
 import getpass
+import logging
 import os
 import pickle
 import random
@@ -7,6 +8,8 @@ import random
 import robin_stocks.helper as helper
 import robin_stocks.urls as urls
 
+logger = logging.getLogger(__name__)
+
 
 def generate_device_token():
     """This function will generate a token used when loggin on.
@@ -51,7 +54,7 @@ def respond_to_challenge(challenge_id, sms_code):
     return(helper.request_post(url, payload))
 
 
-def login(username=None, password=None, expiresIn=86400, scope='internal', by_sms=True, mfa_token=None, store_session=True):
+def login(username=None, password=None, expiresIn=86400, scope='internal', by_sms=True, mfa_token=None, store_session=True, pickle_name=""):
     """This function will effectivly log the user into robinhood by getting an
     authentication token and saving it to the session header. By default, it
     will store the authentication token in a pickle file and load that value
@@ -74,6 +77,9 @@ def login(username=None, password=None, expiresIn=86400, scope='internal', by_sm
     :param store_session: Specifies whether to save the log in authorization
         for future log ins.
     :type store_session: Optional[boolean]
+    :param pickle_name: Allows users to name Pickle token file in order to switch
+        between different accounts without having to re-login every time.
+    :type pickle_name: Optional[str]
     :returns:  A dictionary with log in information. The 'access_token' keyword contains the access token, and the 'detail' keyword \
     contains information on whether the access token was generated or loaded from pickle file.
 
@@ -83,7 +89,7 @@ def login(username=None, password=None, expiresIn=86400, scope='internal', by_sm
     data_dir = os.path.join(home_dir, ".tokens")
     if not os.path.exists(data_dir):
         os.makedirs(data_dir)
-    creds_file = "robinhood.pickle"
+    creds_file = "robinhood" + pickle_name + ".pickle"
     pickle_path = os.path.join(data_dir, creds_file)
     # Challenge type is used if not logging in with two-factor authentication.
     if by_sms:
@@ -132,8 +138,8 @@ def login(username=None, password=None, expiresIn=86400, scope='internal', by_sm
                             'expires_in': expiresIn, 'scope': scope, 'detail': 'logged in using authentication in {0}'.format(creds_file),
                             'backup_code': None, 'refresh_token': refresh_token})
             except:
-                print(
-                    "ERROR: There was an issue loading pickle file. Authentication may be expired - logging in normally.")
+                logger.warning('There was an issue loading pickle file. Authentication may be expired - '
+                               'logging in normally.')
                 helper.set_login_state(False)
                 helper.update_session('Authorization', None)
         else:
@@ -0,0 +1,345 @@
+"""Contains the in-memory caches and the helpers that let concurrent calls share one request."""
+import threading
+import time
+from collections import OrderedDict
+from copy import deepcopy
+
+# Returned by TTLCache.get when a key is not cached, so that None can be cached as a value.
+MISSING = object()
+
+
+class TTLCache:
+    """A thread safe mapping where every entry expires after a time to live. When the cache is full,
+    the least recently used entry is evicted to make room.
+
+    :param maxsize: The most entries the cache will hold.
+    :type maxsize: int
+    :param ttl: The default number of seconds an entry stays valid.
+    :type ttl: float
+
+    """
+
+    def __init__(self, maxsize=1024, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=MISSING):
+        """Returns the value cached for key, or default if the key is missing or has expired.
+
+        :param key: The key to look up.
+        :type key: hashable
+        :param default: The value to return on a miss.
+        :type default: Optional[any]
+        :returns: The cached value or default.
+
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._data.move_to_end(key)
+                self.hits += 1
+                return(entry[1])
+            if entry is not None:
+                del self._data[key]
+            self.misses += 1
+            return(default)
+
+    def set(self, key, value, ttl=None):
+        """Caches value under key.
+
+        :param key: The key to store the value under.
+        :type key: hashable
+        :param value: The value to cache. May be None.
+        :type value: any
+        :param ttl: The number of seconds the value stays valid. Defaults to the ttl of the cache.
+        :type ttl: Optional[float]
+        :returns: None
+
+        """
+        if ttl is None:
+            ttl = self.ttl
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key):
+        """Removes key from the cache if it is present.
+
+        :param key: The key to remove.
+        :type key: hashable
+        :returns: None
+
+        """
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self, reset_stats=True):
+        """Removes every entry and resets the hit and miss counters.
+
+        :param reset_stats: Set to False to keep the hit and miss counters.
+        :type reset_stats: Optional[bool]
+        :returns: None
+
+        """
+        with self._lock:
+            self._data.clear()
+            if reset_stats:
+                self.hits = 0
+                self.misses = 0
+
+    def stats(self):
+        """Returns the hit and miss counters and the size of the cache.
+
+        :returns: A dictionary with the keys hits, misses, size, and maxsize.
+
+        """
+        with self._lock:
+            return({'hits': self.hits, 'misses': self.misses,
+                    'size': len(self._data), 'maxsize': self.maxsize})
+
+    def __len__(self):
+        return(len(self._data))
+
+
+class ValidatorCache(TTLCache):
+    """A TTLCache of decoded responses kept with their ETag and Last-Modified headers, so that they can be
+    requested again with a conditional get. Counts how often the server answers 304 Not Modified and how many
+    bytes of response bodies that saved.
+
+    :param maxsize: The most responses the cache will hold.
+    :type maxsize: int
+    :param ttl: The number of seconds a response and its validators are kept.
+    :type ttl: float
+
+    """
+
+    def __init__(self, maxsize=2048, ttl=24 * 60 * 60):
+        super().__init__(maxsize, ttl)
+        self.conditional_requests = 0
+        self.not_modified = 0
+        self.bytes_saved = 0
+
+    def validators(self, key):
+        """Returns the conditional headers to send for key.
+
+        :param key: The key of the request.
+        :type key: hashable
+        :returns: A dictionary of If-None-Match and If-Modified-Since headers, which is empty if nothing is stored.
+
+        """
+        entry = self.get(key)
+        if entry is MISSING:
+            return({})
+        headers = {}
+        if entry['etag']:
+            headers['If-None-Match'] = entry['etag']
+        if entry['last_modified']:
+            headers['If-Modified-Since'] = entry['last_modified']
+        with self._lock:
+            self.conditional_requests += 1
+        return(headers)
+
+    def store(self, key, response, data):
+        """Keeps the decoded data of a response if the response has a validator.
+
+        :param key: The key of the request.
+        :type key: hashable
+        :param response: The response with a 200 code.
+        :type response: requests.Response
+        :param data: The decoded json of the response.
+        :type data: any
+        :returns: None
+
+        """
+        etag = response.headers.get('ETag')
+        lastModified = response.headers.get('Last-Modified')
+        if etag or lastModified:
+            self.set(key, {'etag': etag, 'last_modified': lastModified,
+                           'size': len(response.content), 'data': deepcopy(data)})
+
+    def revalidated(self, key):
+        """Returns a copy of the stored data after the server answered 304 Not Modified.
+
+        :param key: The key of the request.
+        :type key: hashable
+        :returns: The decoded data, or MISSING if it has been evicted since the request was sent.
+
+        """
+        entry = self.get(key)
+        if entry is MISSING:
+            return(MISSING)
+        with self._lock:
+            self.not_modified += 1
+            self.bytes_saved += entry['size']
+        return(deepcopy(entry['data']))
+
+    def clear(self, reset_stats=True):
+        super().clear(reset_stats)
+        if reset_stats:
+            with self._lock:
+                self.conditional_requests = 0
+                self.not_modified = 0
+                self.bytes_saved = 0
+
+    def stats(self):
+        """Returns the counters of the cache.
+
+        :returns: A dictionary with the keys of TTLCache.stats, as well as conditional_requests, not_modified, \
+        bytes_saved, and hit_rate, which is the share of conditional requests answered with 304.
+
+        """
+        stats = super().stats()
+        with self._lock:
+            stats.update({'conditional_requests': self.conditional_requests, 'not_modified': self.not_modified,
+                          'bytes_saved': self.bytes_saved,
+                          'hit_rate': self.not_modified / self.conditional_requests if self.conditional_requests else 0.0})
+        return(stats)
+
+
+class SingleFlight:
+    """Runs at most one call per key at a time. Callers that ask for a key while its call is running wait for
+    that call and share its result instead of starting their own.
+
+    """
+
+    def __init__(self):
+        self.shared = 0
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, func, copy=deepcopy, wait=None):
+        """Returns the result of func, or of the call already running for key.
+
+        :param key: Identifies calls that are interchangeable.
+        :type key: hashable
+        :param func: The function to call if no call is running for key. Takes no arguments.
+        :type func: function
+        :param copy: Makes the copy of the result handed to each caller when the result is shared, so callers \
+        can change what they get without affecting each other.
+        :type copy: Optional[function]
+        :param wait: Called with the threading.Event of the running call to wait for it. Defaults to Event.wait.
+        :type wait: Optional[function]
+        :returns: The result of the call. If the call raised an exception, every waiting caller raises it.
+
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                leader = True
+            else:
+                call.waiters += 1
+                self.shared += 1
+                leader = False
+        if not leader:
+            (wait or threading.Event.wait)(call.done)
+            if call.error is not None:
+                raise call.error
+            return(copy(call.value))
+        try:
+            call.value = func()
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        # The stored value stays untouched for the waiters to copy, so the caller that ran func gets a copy too.
+        if call.waiters:
+            return(copy(call.value))
+        return(call.value)
+
+    def __len__(self):
+        return(len(self._calls))
+
+
+class _Call:
+    """The state of one call run by SingleFlight."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.waiters = 0
+        self.value = None
+        self.error = None
+
+
+class MicroBatcher:
+    """Collects keys asked for by different threads within a short window and looks them all up with one call.
+    The first caller waits for the window to pass, or for the batch to fill, and then makes the call for everyone.
+
+    :param fetch: Takes a list of keys and returns the result shared by every caller in the batch.
+    :type fetch: function
+    :param window: The number of seconds to wait for more keys.
+    :type window: float
+    :param maxsize: The most keys in one batch. A full batch is sent right away.
+    :type maxsize: int
+
+    """
+
+    def __init__(self, fetch, window, maxsize):
+        self.fetch = fetch
+        self.window = window
+        self.maxsize = maxsize
+        self.batches = 0
+        self._open = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, group=None, wait=None):
+        """Adds key to the open batch of its group and waits for the batch to be fetched.
+
+        :param key: The key to look up.
+        :type key: hashable
+        :param group: Keys are only batched with keys of the same group.
+        :type group: Optional[hashable]
+        :param wait: Called with a threading.Event and a timeout to wait for it. Defaults to Event.wait.
+        :type wait: Optional[function]
+        :returns: The result of fetch for the batch the key was added to. If fetch raised an exception, \
+        every caller in the batch raises it.
+
+        """
+        with self._lock:
+            batch = self._open.get(group)
+            leader = batch is None
+            if leader:
+                batch = self._open[group] = _Batch()
+            batch.keys[key] = None
+            if len(batch.keys) >= self.maxsize:
+                # Close the batch so that later keys start a new one.
+                del self._open[group]
+                batch.full.set()
+        if wait is None:
+            wait = threading.Event.wait
+        if not leader:
+            wait(batch.done)
+        else:
+            wait(batch.full, self.window)
+            with self._lock:
+                if self._open.get(group) is batch:
+                    del self._open[group]
+                self.batches += 1
+            try:
+                batch.value = self.fetch(list(batch.keys))
+            except BaseException as error:
+                batch.error = error
+            finally:
+                batch.done.set()
+        if batch.error is not None:
+            raise batch.error
+        return(batch.value)
+
+
+class _Batch(_Call):
+    """The keys collected by MicroBatcher for one call."""
+
+    def __init__(self):
+        super().__init__()
+        # A dict rather than a set so that keys are fetched in the order they were asked for.
+        self.keys = {}
+        self.full = threading.Event()
@@ -0,0 +1,283 @@
+"""Contains the RobinhoodClient class and the functions for choosing which client sends a request."""
+import contextvars
+import importlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import wraps
+
+import robin_stocks.transport as transport
+from requests import Session
+from robin_stocks.globals import ACCOUNT_POOL_SIZE, HEADERS, SESSION
+
+logger = logging.getLogger(__name__)
+
+# The modules whose functions can be called through a client.
+MODULES = ('account', 'authentication', 'crypto', 'export', 'helper', 'markets',
+           'options', 'orders', 'profiles', 'stocks')
+
+_CURRENT_CLIENT = contextvars.ContextVar('robin_stocks_client', default=None)
+
+
+class RobinhoodClient:
+    """A session and login state for one Robinhood account. The functions of every robin_stocks module can be
+    called through the client, for example ``client.stocks.get_quotes('AAPL')`` or ``client.get_quotes('AAPL')``.
+
+    :param session: The session to send requests with. A new session with the default headers is made if not provided.
+    :type session: Optional[requests.Session]
+    :param pool_size: The number of connections the new session keeps open to each host. Defaults to the \
+    value set by set_transport_options. Ignored if session is provided.
+    :type pool_size: Optional[int]
+
+    """
+
+    def __init__(self, session=None, pool_size=None):
+        if session is None:
+            session = Session()
+            session.headers = dict(HEADERS)
+            transport.configure_session(session, pool_maxsize=pool_size)
+        self.session = session
+        self.logged_in = False
+
+    @contextmanager
+    def activate(self):
+        """A context manager that makes this client handle every request made inside of it, including requests \
+        made on threads started by robin_stocks for that call.
+
+        :returns: The client.
+
+        """
+        token = _CURRENT_CLIENT.set(self)
+        try:
+            yield self
+        finally:
+            _CURRENT_CLIENT.reset(token)
+
+    def call(self, func, *args, **kwargs):
+        """Calls a robin_stocks function with this client handling its requests.
+
+        :param func: Any robin_stocks function.
+        :type func: function
+        :returns: The return value of func.
+
+        """
+        with self.activate():
+            return(func(*args, **kwargs))
+
+    def login(self, *args, **kwargs):
+        """Logs this client in. Takes the same parameters as robin_stocks.authentication.login.
+
+        :returns: The dictionary returned by robin_stocks.authentication.login.
+
+        """
+        authentication = importlib.import_module('robin_stocks.authentication')
+        return(self.call(authentication.login, *args, **kwargs))
+
+    def logout(self):
+        """Logs this client out.
+
+        :returns: None
+
+        """
+        authentication = importlib.import_module('robin_stocks.authentication')
+        return(self.call(authentication.logout))
+
+    def executor(self, max_workers):
+        """Returns the pool that calls made for this client run on when they are sent at the same time, such as \
+        the pages of a paginated request. Used as a context manager, and its calls are started with submit.
+
+        :param max_workers: The most calls that can run at the same time.
+        :type max_workers: int
+        :returns: A ThreadPoolExecutor.
+
+        """
+        return(ThreadPoolExecutor(max_workers=max_workers))
+
+    def wait(self, event, timeout=None):
+        """Waits for a call made by another caller to finish, such as a request that is being shared.
+
+        :param event: Set when the call finishes.
+        :type event: threading.Event
+        :param timeout: The most seconds to wait. Waits forever if None.
+        :type timeout: Optional[float]
+        :returns: True if the event was set, False if the timeout passed first.
+
+        """
+        return(event.wait(timeout))
+
+    def __getattr__(self, name):
+        if name in MODULES:
+            return(BoundModule(self, importlib.import_module('robin_stocks.' + name)))
+        func = getattr(importlib.import_module('robin_stocks'), name, None)
+        if not callable(func):
+            raise AttributeError("'RobinhoodClient' object has no attribute '{0}'".format(name))
+        return(self._bind(func))
+
+    def _bind(self, func):
+        @wraps(func)
+        def client_wrapper(*args, **kwargs):
+            return(self.call(func, *args, **kwargs))
+        return(client_wrapper)
+
+
+class BoundModule:
+    """A robin_stocks module whose functions are called with a specific client handling their requests.
+
+    :param client: The client to use.
+    :type client: RobinhoodClient
+    :param module: The module to wrap.
+    :type module: module
+
+    """
+
+    def __init__(self, client, module):
+        self._client = client
+        self._module = module
+
+    def __getattr__(self, name):
+        value = getattr(self._module, name)
+        if callable(value):
+            return(self._client._bind(value))
+        return(value)
+
+
+class SessionPool:
+    """A set of clients keyed by account name. Each account gets its own session with a dedicated connection pool,
+    and its own token file, so logging in to one account never replaces the authorization of another.
+
+    :param pool_size: The number of connections each account keeps open.
+    :type pool_size: Optional[int]
+    :param max_workers: The most accounts that map will call at the same time. Defaults to one thread per account.
+    :type max_workers: Optional[int]
+
+    """
+
+    def __init__(self, pool_size=ACCOUNT_POOL_SIZE, max_workers=None):
+        self.pool_size = pool_size
+        self.max_workers = max_workers
+        self._clients = {}
+        self._lock = threading.Lock()
+
+    def client(self, account):
+        """Returns the client for an account, creating it if the account is new.
+
+        :param account: The name of the account.
+        :type account: str
+        :returns: A RobinhoodClient.
+
+        """
+        with self._lock:
+            if account not in self._clients:
+                self._clients[account] = RobinhoodClient(pool_size=self.pool_size)
+            return(self._clients[account])
+
+    def login(self, account, *args, **kwargs):
+        """Logs an account in. Takes the same parameters as robin_stocks.authentication.login, except that the \
+        token is stored in ~/.tokens/robinhood<account>.pickle unless pickle_name is given.
+
+        :param account: The name of the account.
+        :type account: str
+        :returns: The dictionary returned by robin_stocks.authentication.login.
+
+        """
+        kwargs.setdefault('pickle_name', account)
+        return(self.client(account).login(*args, **kwargs))
+
+    def remove(self, account):
+        """Logs an account out and removes it from the pool.
+
+        :param account: The name of the account.
+        :type account: str
+        :returns: None
+
+        """
+        with self._lock:
+            client = self._clients.pop(account, None)
+        if client is not None:
+            if client.logged_in:
+                client.logout()
+            client.session.close()
+
+    def accounts(self):
+        """Returns the names of the accounts in the pool.
+
+        :returns: A list of strings.
+
+        """
+        with self._lock:
+            return(list(self._clients))
+
+    def map(self, func, *args, accounts=None, **kwargs):
+        """Calls the same robin_stocks function for every account at the same time.
+
+        :param func: Any robin_stocks function, or the name of one such as 'build_user_profile'.
+        :type func: function or str
+        :param accounts: The accounts to call the function for. Defaults to every account in the pool.
+        :type accounts: Optional[list]
+        :returns: A dictionary that maps each account to the return value of func. If func raised an exception \
+        for an account, the exception is logged with its traceback to the robin_stocks.client logger and the \
+        value for that account is None. Errors that robin_stocks reports without raising leave the value that \
+        func returned, such as None or [None].
+
+        """
+        if accounts is None:
+            accounts = self.accounts()
+        if not accounts:
+            return({})
+        if isinstance(func, str):
+            func = getattr(importlib.import_module('robin_stocks'), func)
+
+        def call(account):
+            try:
+                return(self.client(account).call(func, *args, **kwargs))
+            except Exception as message:
+                logger.error('%s failed for account %s: %s', func.__name__, account, message, exc_info=True)
+                return(None)
+
+        workers = self.max_workers or len(accounts)
+        with ThreadPoolExecutor(max_workers=min(workers, len(accounts))) as executor:
+            results = executor.map(call, accounts)
+            return(dict(zip(accounts, results)))
+
+    def __getitem__(self, account):
+        with self._lock:
+            return(self._clients[account])
+
+    def __contains__(self, account):
+        with self._lock:
+            return(account in self._clients)
+
+    def __len__(self):
+        return(len(self._clients))
+
+
+# The client used when no other client has been activated.
+transport.configure_session(SESSION)
+DEFAULT_CLIENT = RobinhoodClient(SESSION)
+
+
+def get_client():
+    """Returns the client that handles requests made right now.
+
+    :returns: The activated RobinhoodClient, or the default client.
+
+    """
+    client = _CURRENT_CLIENT.get()
+    if client is None:
+        return(DEFAULT_CLIENT)
+    return(client)
+
+
+def submit(executor, func, *args):
+    """Submits func to a pool, such as the one returned by RobinhoodClient.executor, so that it runs with the \
+    same client as the caller.
+
+    :param executor: The pool.
+    :type executor: concurrent.futures.Executor
+    :param func: The function to run.
+    :type func: function
+    :returns: A Future.
+
+    """
+    return(executor.submit(contextvars.copy_context().run, func, *args))
@@ -1,6 +1,11 @@
 """Contains functions to get information about crypto-currencies."""
+import logging
+
 import robin_stocks.helper as helper
 import robin_stocks.urls as urls
+from robin_stocks.exceptions import InvalidArgumentError
+
+logger = logging.getLogger(__name__)
 
 
 @helper.login_required
@@ -127,17 +132,20 @@ def get_crypto_historical(symbol, interval, span, bound, info=None):
     bounds_check = ['24_7', 'extended', 'regular', 'trading']
 
     if interval not in interval_check:
-        print(
-            'ERROR: Interval must be "15second","5minute","10minute","hour","day",or "week"')
+        helper.report_error(InvalidArgumentError('Interval must be "15second","5minute","10minute","hour","day",'
+                                                 'or "week"', 'interval', interval), log=logger)
         return([None])
     if span not in span_check:
-        print('ERROR: Span must be "hour","day","week","month","3month","year",or "5year"')
+        helper.report_error(InvalidArgumentError('Span must be "hour","day","week","month","3month","year",or "5year"',
+                                                 'span', span), log=logger)
         return([None])
     if bound not in bounds_check:
-        print('ERROR: Bounds must be "24_7","extended","regular",or "trading"')
+        helper.report_error(InvalidArgumentError('Bounds must be "24_7","extended","regular",or "trading"',
+                                                 'bound', bound), log=logger)
         return([None])
     if (bound == 'extended' or bound == 'trading') and span != 'day':
-        print('ERROR: extended and trading bounds can only be used with a span of "day"')
+        helper.report_error(InvalidArgumentError('extended and trading bounds can only be used with a span of "day"',
+                                                 'bound', bound), log=logger)
         return([None])
 
     id = get_crypto_info(symbol, info='id')
@@ -169,17 +177,20 @@ def get_crypto_historical_from_id(id, interval, span, bound, info=None):
     bounds_check = ['24_7', 'extended', 'regular', 'trading']
 
     if interval not in interval_check:
-        print(
-            'ERROR: Interval must be "15second","5minute","10minute","hour","day",or "week"')
+        helper.report_error(InvalidArgumentError('Interval must be "15second","5minute","10minute","hour","day",'
+                                                 'or "week"', 'interval', interval), log=logger)
         return([None])
     if span not in span_check:
-        print('ERROR: Span must be "hour","day","week","month","3month","year",or "5year"')
+        helper.report_error(InvalidArgumentError('Span must be "hour","day","week","month","3month","year",or "5year"',
+                                                 'span', span), log=logger)
         return([None])
     if bound not in bounds_check:
-        print('ERROR: Bounds must be "24_7","extended","regular",or "trading"')
+        helper.report_error(InvalidArgumentError('Bounds must be "24_7","extended","regular",or "trading"',
+                                                 'bound', bound), log=logger)
         return([None])
     if (bound == 'extended' or bound == 'trading') and span != 'day':
-        print('ERROR: extended and trading bounds can only be used with a span of "day"')
+        helper.report_error(InvalidArgumentError('extended and trading bounds can only be used with a span of "day"',
+                                                 'bound', bound), log=logger)
         return([None])
 
     url = urls.crypto_historical(id, interval, span, bound)
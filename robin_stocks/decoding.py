@@ -0,0 +1,80 @@
+"""Contains the functions that decode json responses with the fastest json library installed."""
+import importlib
+import json
+import time
+
+import robin_stocks.metrics as metrics
+from robin_stocks.globals import JSON_BACKEND
+
+# The order backends are tried in when the backend is 'auto'.
+BACKENDS = ('orjson', 'ujson', 'json')
+
+
+def load_backend(name):
+    """Imports a json library and returns its loads function.
+
+    :param name: One of 'orjson', 'ujson', or 'json'.
+    :type name: str
+    :returns: A function that takes bytes or a string and returns the decoded data. Raises an ImportError if \
+    the library is not installed.
+
+    """
+    if name not in BACKENDS:
+        raise ValueError("json backend must be 'auto', 'orjson', 'ujson', or 'json', not '{0}'".format(name))
+    if name == 'json':
+        return(json.loads)
+    return(importlib.import_module(name).loads)
+
+
+def find_backend(name='auto'):
+    """Returns the name and loads function of a backend, picking the first one that is installed for 'auto'.
+
+    :param name: 'auto' or the name of a backend.
+    :type name: Optional[str]
+    :returns: A tuple of the backend name and its loads function.
+
+    """
+    if name != 'auto':
+        return(name, load_backend(name))
+    for backend in BACKENDS:
+        try:
+            return(backend, load_backend(backend))
+        except ImportError:
+            continue
+
+
+BACKEND, loads = find_backend(JSON_BACKEND)
+
+
+def set_json_backend(name):
+    """Chooses the json library used to decode responses.
+
+    :param name: 'auto' to use the fastest one installed, or one of 'orjson', 'ujson', or 'json'.
+    :type name: str
+    :returns: The name of the backend now in use. Raises an ImportError if the library is not installed.
+
+    """
+    global JSON_BACKEND, BACKEND, loads
+    BACKEND, loads = find_backend(name)
+    JSON_BACKEND = name
+    return(BACKEND)
+
+
+def decode(response, url=None, method='GET'):
+    """Decodes the json body of a response from its raw bytes, skipping the text decode done by response.json().
+
+    :param response: The response to decode.
+    :type response: requests.Response
+    :param url: The url that was requested. Used to record the decode time when metrics are on. Defaults to response.url.
+    :type url: Optional[str]
+    :param method: The http method of the request.
+    :type method: Optional[str]
+    :returns: The decoded data. Raises a ValueError if the body is not valid json.
+
+    """
+    if not metrics.METRICS_ENABLED:
+        return(loads(response.content))
+    start = time.perf_counter()
+    data = loads(response.content)
+    metrics.REGISTRY.observe(method, url or response.url, 'decode_seconds', time.perf_counter() - start)
+    return(data)
@@ -0,0 +1,88 @@
+"""Contains the exceptions for errors reported by robin_stocks."""
+
+
+class RobinhoodError(Exception):
+    """The base class of every error reported by robin_stocks.
+
+    :param message: A description of the error.
+    :type message: str
+
+    """
+
+    def __init__(self, message):
+        super().__init__(message)
+        self.message = message
+
+
+class InvalidArgumentError(RobinhoodError, ValueError):
+    """Raised when a function is called with a value it can't use, such as an unknown span or a symbol that is \
+    not a string.
+
+    :param message: A description of the error.
+    :type message: str
+    :param argument: The name of the argument, if known.
+    :type argument: Optional[str]
+    :param value: The value that was passed.
+    :type value: Optional[any]
+
+    """
+
+    def __init__(self, message, argument=None, value=None):
+        super().__init__(message)
+        self.argument = argument
+        self.value = value
+
+
+class InvalidTickerError(InvalidArgumentError):
+    """Raised when a symbol is not a valid stock ticker.
+
+    :param symbol: The symbol that was not found.
+    :type symbol: str
+
+    """
+
+    def __init__(self, symbol):
+        super().__init__('"{0}" is not a valid stock ticker'.format(symbol), 'symbol', symbol)
+        self.symbol = symbol
+
+
+class APIError(RobinhoodError):
+    """Raised when a request fails or its response is not what was expected.
+
+    :param message: A description of the error.
+    :type message: str
+    :param url: The url that was requested.
+    :type url: Optional[str]
+    :param status_code: The status code of the response, if one arrived.
+    :type status_code: Optional[int]
+    :param response: The response, if one arrived.
+    :type response: Optional[requests.Response]
+
+    """
+
+    def __init__(self, message, url=None, status_code=None, response=None):
+        super().__init__(message)
+        self.url = url
+        self.status_code = status_code
+        self.response = response
+
+    @classmethod
+    def from_exception(cls, error, url=None):
+        """Builds an APIError from an exception raised by requests, keeping its response and status code."""
+        response = getattr(error, 'response', None)
+        return(cls(str(error), url, getattr(response, 'status_code', None), response))
+
+
+class PaginationError(APIError):
+    """Raised when a page after the first one can't be loaded, even after retrying.
+
+    :param message: A description of the error.
+    :type message: str
+    :param url: The url of the page that failed. Pass it to request_get to load the rest of the pages.
+    :type url: str
+
+    """
+
+    @property
+    def resume_url(self):
+        return(self.url)
@@ -1,11 +1,84 @@
 """Holds the session header and other global variables."""
-from requests import Session
+import threading
 
 # Keeps track on if the user is logged in or not.
 LOGGED_IN = False
-# The session object for making get and post requests.
-SESSION = Session()
-SESSION.headers = {
+# The number of pages that can be loaded at the same time when paginating.
+PAGINATION_CONCURRENCY = 4
+# The most pages that a single paginated request will load. None means no limit.
+PAGINATION_MAX_PAGES = None
+# The number of requests that can be sent at the same time when fanning out independent requests.
+FANOUT_CONCURRENCY = 8
+# The most option instruments that can be sent in one market data request.
+OPTION_MARKET_DATA_BATCH_SIZE = 50
+# The number of seconds a loaded option chain snapshot is reused before the chain is requested again.
+OPTION_CHAIN_SNAPSHOT_TTL = 60
+# Whether identical get requests made at the same time share one request.
+COALESCE_REQUESTS = True
+# Whether get requests for slowly changing data are sent with the validators of the last response.
+CONDITIONAL_REQUESTS = True
+# The starts of the url paths that are requested conditionally.
+CONDITIONAL_PATHS = ('/instruments/', '/fundamentals/', '/options/chains/', '/markets/', '/documents/')
+# The most responses kept for conditional requests.
+CONDITIONAL_CACHE_SIZE = 2048
+# Whether decoded get responses are cached. Turn on with helper.set_response_cache.
+RESPONSE_CACHE_ENABLED = False
+# The most responses kept in the response cache.
+RESPONSE_CACHE_SIZE = 1024
+# The seconds a response is cached, keyed by the start of the url path. Urls that don't match are never cached.
+RESPONSE_CACHE_TTLS = {
+    '/accounts/': 24 * 60 * 60,
+    '/user/': 24 * 60 * 60,
+    '/portfolios/': 1,
+    '/quotes/': 1,
+    '/marketdata/quotes/': 1,
+    '/fundamentals/': 60 * 60
+}
+# The most symbols sent in one quotes, fundamentals, or historicals request. Longer lists are split up.
+SYMBOLS_PER_REQUEST = 50
+# The seconds get_quotes waits to batch single symbol requests made by other threads. 0 turns off batching.
+QUOTE_BATCH_WINDOW = 0
+# The most symbols in one batched quotes request.
+QUOTE_BATCH_SIZE = 50
+# The number of connections each account in a SessionPool keeps open.
+ACCOUNT_POOL_SIZE = 10
+# The number of hosts each session keeps a connection pool for.
+POOL_CONNECTIONS = 10
+# The number of connections kept open to each host. Should be at least the number of requests sent at once.
+POOL_MAXSIZE = 32
+# Whether open connections send TCP keep-alive probes, so that a dead socket fails instead of hanging.
+TCP_KEEPALIVE = True
+# The (connect, read) timeouts in seconds for each class of request.
+TIMEOUTS = {
+    'quotes': (3.05, 10),
+    'orders': (3.05, 16),
+    'documents': (3.05, 60),
+    'default': (3.05, 30)
+}
+# The number of seconds resolved host names are reused. None turns off the dns cache.
+DNS_CACHE_TTL = None
+# The (requests per second, burst) allowed for each class of request. Classes without an entry are not limited.
+RATE_LIMITS = {}
+# The number of times a get request is retried after a throttled, failed, or dropped request.
+RETRY_ATTEMPTS = 3
+# The seconds waited before the first retry. Each retry waits up to twice as long as the one before.
+RETRY_BACKOFF = 0.5
+# The most seconds waited before a retry, including waits asked for by a Retry-After header.
+RETRY_MAX_BACKOFF = 30
+# The response codes that are retried.
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# Whether errors are raised as exceptions instead of being logged. Turn on with helper.set_raise_errors.
+RAISE_ERRORS = False
+# The json library used to decode responses. 'auto' uses orjson or ujson when installed, and json otherwise.
+JSON_BACKEND = 'auto'
+# Whether the time, size, and outcome of every request is recorded in the metrics registry.
+METRICS_ENABLED = False
+# The upper bounds in seconds of the histogram buckets that request and decode times are counted in.
+METRICS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+# The number of recent times kept for each endpoint to find the p50 and p99 from.
+METRICS_SAMPLES = 1024
+# The headers every session starts with.
+HEADERS = {
     "Accept": "*/*",
     "Accept-Encoding": "gzip,deflate,br",
     "Accept-Language": "en-US,en;q=1",
@@ -14,3 +87,18 @@ SESSION.headers = {
     "Connection": "keep-alive",
     "User-Agent": "Robinhood/823 (iphone; iOS 7.1.2, Scale/2.00)"
 }
+_session_lock = threading.Lock()
+
+
+def __getattr__(name):
+    """Creates SESSION, the session object for making get and post requests used by the default client, the first \
+    time it is used, so that reading a setting doesn't import requests."""
+    if name != 'SESSION':
+        raise AttributeError('module {0!r} has no attribute {1!r}'.format(__name__, name))
+    with _session_lock:
+        if 'SESSION' not in globals():
+            from requests import Session
+            session = Session()
+            session.headers = dict(HEADERS)
+            globals()['SESSION'] = session
+    return(globals()['SESSION'])
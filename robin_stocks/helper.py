@@ -7,16 +7,74 @@ Functions
     - request_post
     - update_session
 """
+import json
+import logging
+from collections import deque
+from copy import deepcopy
 from functools import wraps
+from itertools import islice
+from urllib.parse import parse_qs, urlencode, urlparse
 
 import requests
-from robin_stocks.globals import LOGGED_IN, SESSION
+import robin_stocks.decoding as decoding
+import robin_stocks.instruments as instruments
+import robin_stocks.metrics as metrics
+import robin_stocks.transport as transport
+from robin_stocks.cache import MISSING, SingleFlight, TTLCache, ValidatorCache
+from robin_stocks.client import get_client, submit
+from robin_stocks.exceptions import (APIError, InvalidArgumentError,
+                                     PaginationError)
+from robin_stocks.globals import (COALESCE_REQUESTS, CONDITIONAL_CACHE_SIZE,
+                                  CONDITIONAL_PATHS, CONDITIONAL_REQUESTS,
+                                  FANOUT_CONCURRENCY, RESPONSE_CACHE_ENABLED,
+                                  RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTLS,
+                                  SYMBOLS_PER_REQUEST,
+                                  PAGINATION_CONCURRENCY, PAGINATION_MAX_PAGES,
+                                  RAISE_ERRORS, SESSION)
+
+logger = logging.getLogger('robin_stocks.http')
+# Whether the default client is logged in. Updated by set_login_state.
+LOGGED_IN = False
 
 
 def set_login_state(logged_in):
-    """Sets the login state"""
+    """Sets the login state of the current client"""
     global LOGGED_IN
-    LOGGED_IN = logged_in
+    client = get_client()
+    client.logged_in = logged_in
+    if client.session is SESSION:
+        LOGGED_IN = logged_in
+
+
+# Instrument data looked up by symbol. Instruments rarely change, so they are kept for a day.
+INSTRUMENT_CACHE = TTLCache(maxsize=4096, ttl=24 * 60 * 60)
+# Symbols that are not valid tickers are remembered for a shorter time.
+INSTRUMENT_NEGATIVE_TTL = 5 * 60
+# The get requests that are being sent right now, so that identical requests can wait for them.
+IN_FLIGHT = SingleFlight()
+# Responses of slowly changing urls kept with their ETag and Last-Modified headers for conditional requests.
+VALIDATOR_CACHE = ValidatorCache(maxsize=CONDITIONAL_CACHE_SIZE)
+# Decoded get responses, used when the response cache is turned on.
+RESPONSE_CACHE = TTLCache(maxsize=RESPONSE_CACHE_SIZE)
+# Option ids keyed by symbol, expiration date, strike, and type.
+OPTION_ID_CACHE = TTLCache(maxsize=16384, ttl=24 * 60 * 60)
+
+
+def set_pagination_options(concurrency=None, max_pages=None):
+    """Sets the default number of pages loaded at once and the page cap used by paginated requests.
+
+    :param concurrency: The number of pages that can be loaded at the same time.
+    :type concurrency: Optional[int]
+    :param max_pages: The most pages a paginated request will load. Use 0 to remove the cap.
+    :type max_pages: Optional[int]
+    :returns: None. Updates the pagination defaults.
+
+    """
+    global PAGINATION_CONCURRENCY, PAGINATION_MAX_PAGES
+    if concurrency is not None:
+        PAGINATION_CONCURRENCY = max(1, int(concurrency))
+    if max_pages is not None:
+        PAGINATION_MAX_PAGES = int(max_pages) or None
 
 
 def login_required(func):
@@ -24,8 +82,7 @@ def login_required(func):
        in."""
     @wraps(func)
     def login_wrapper(*args, **kwargs):
-        global LOGGED_IN
-        if not LOGGED_IN:
+        if not get_client().logged_in:
             raise Exception('{} can only be called when logged in'.format(
                 func.__name__))
         return(func(*args, **kwargs))
@@ -55,12 +112,10 @@ def id_for_stock(symbol):
     try:
         symbol = symbol.upper().strip()
     except AttributeError as message:
-        print(message)
+        report_error(InvalidArgumentError(str(message), 'symbol', symbol), message)
         return(None)
 
-    url = 'https://api.robinhood.com/instruments/'
-    payload = {'symbol': symbol}
-    data = request_get(url, 'indexzero', payload)
+    data = instrument_for_symbol(symbol)
 
     return(filter(data, 'id'))
 
@@ -76,13 +131,10 @@ def id_for_chain(symbol):
     try:
         symbol = symbol.upper().strip()
     except AttributeError as message:
-        print(message)
+        report_error(InvalidArgumentError(str(message), 'symbol', symbol), message)
         return(None)
 
-    url = 'https://api.robinhood.com/instruments/'
-
-    payload = {'symbol': symbol}
-    data = request_get(url, 'indexzero', payload)
+    data = instrument_for_symbol(symbol)
 
     if data:
         return(data['tradable_chain_id'])
@@ -101,17 +153,160 @@ def id_for_group(symbol):
     try:
         symbol = symbol.upper().strip()
     except AttributeError as message:
-        print(message)
+        report_error(InvalidArgumentError(str(message), 'symbol', symbol), message)
         return(None)
 
+    group_id = INSTRUMENT_CACHE.get(('group', symbol))
+    if group_id is not MISSING:
+        return(group_id)
+
     url = 'https://api.robinhood.com/options/chains/{0}/'.format(
         id_for_chain(symbol))
     data = request_get(url)
-    return(data['underlying_instruments'][0]['id'])
+    group_id = data['underlying_instruments'][0]['id']
+    INSTRUMENT_CACHE.set(('group', symbol), group_id)
+    return(group_id)
+
+
+def instrument_for_symbol(symbol):
+    """Returns the instrument data for a stock ticker. Results are cached, including tickers that \
+    do not exist, so repeated lookups do not make a request. If the instrument index is open, \
+    it is checked before making a request.
+
+    :param symbol: The upper case stock ticker.
+    :type symbol: str
+    :returns: A dictionary of the instrument data, or None if the ticker does not exist or the request failed.
+
+    """
+    data = INSTRUMENT_CACHE.get(('symbol', symbol))
+    if data is not MISSING:
+        return(data)
+
+    if instruments.INDEX is not None:
+        data = instruments.INDEX.get_by_symbol(symbol)
+        if data:
+            cache_instrument(data, index=False)
+            return(data)
+
+    url = 'https://api.robinhood.com/instruments/'
+    payload = {'symbol': symbol}
+    results = request_get(url, 'results', payload)
+    # A failed request is not cached since the ticker may still be valid.
+    if results == [None]:
+        return(None)
+    if len(results) == 0:
+        INSTRUMENT_CACHE.set(('symbol', symbol), None, INSTRUMENT_NEGATIVE_TTL)
+        return(None)
+
+    cache_instrument(results[0])
+    return(results[0])
+
+
+def instrument_for_url(url):
+    """Returns the instrument data for an instrument url. Uses the same cache and index as instrument_for_symbol.
+
+    :param url: The instrument url, such as ``https://api.robinhood.com/instruments/<id>/``.
+    :type url: str
+    :returns: A dictionary of the instrument data, or None if the request failed.
+
+    """
+    data = INSTRUMENT_CACHE.get(('url', url))
+    if data is not MISSING:
+        return(data)
+
+    if instruments.INDEX is not None:
+        data = instruments.INDEX.get_by_url(url)
+        if data:
+            cache_instrument(data, index=False)
+            return(data)
+
+    data = request_get(url)
+    if data and 'symbol' in data:
+        cache_instrument(data)
+    return(data)
+
+
+def instruments_for_urls(urls):
+    """Returns the instrument data for many instrument urls. Urls that are not cached or in the instrument index \
+    are requested by id in batches instead of one request per url.
+
+    :param urls: A list of instrument urls.
+    :type urls: list
+    :returns: A list of dictionaries of instrument data in the same order as urls. An entry is None if it could not be loaded.
+
+    """
+    data = {}
+    missing = []
+    for url in urls:
+        itemData = INSTRUMENT_CACHE.get(('url', url))
+        if itemData is MISSING and instruments.INDEX is not None:
+            itemData = instruments.INDEX.get_by_url(url) or MISSING
+            if itemData is not MISSING:
+                cache_instrument(itemData, index=False)
+        if itemData is MISSING:
+            missing.append(url)
+        else:
+            data[url] = itemData
+
+    ids = [url.rstrip('/').split('/')[-1] for url in missing]
+    for chunk in chunked(ids, 50):
+        results = request_get('https://api.robinhood.com/instruments/', 'results', {'ids': ','.join(chunk)})
+        results = [item for item in results if item]
+        if instruments.INDEX is not None:
+            instruments.INDEX.add(results)
+        for item in results:
+            cache_instrument(item, index=False)
+            data[item['url']] = item
+
+    # Anything the batch request did not return is requested one at a time.
+    missing = [url for url in missing if url not in data]
+    for url, itemData in zip(missing, map_concurrently(instrument_for_url, missing)):
+        data[url] = itemData
+
+    return([data.get(url) for url in urls])
+
+
+def cache_instrument(data, index=True):
+    """Stores instrument data in the in-memory cache under its symbol and url, and in the instrument index if it is open.
+
+    :param data: The instrument data.
+    :type data: dict
+    :param index: Whether to also write the data to the instrument index.
+    :type index: Optional[bool]
+    :returns: None
+
+    """
+    if data.get('symbol'):
+        INSTRUMENT_CACHE.set(('symbol', data['symbol']), data)
+    if data.get('url'):
+        INSTRUMENT_CACHE.set(('url', data['url']), data)
+    if index and instruments.INDEX is not None:
+        instruments.INDEX.add([data])
+
+
+def clear_instrument_cache():
+    """Removes every cached symbol, instrument, chain id, and option id so the next lookups are requested again.
+    The instrument index on disk is not changed.
+
+    :returns: None
+
+    """
+    INSTRUMENT_CACHE.clear()
+    OPTION_ID_CACHE.clear()
+
+
+def get_instrument_cache_stats():
+    """Returns how often instrument lookups were served from the cache.
+
+    :returns: A dictionary with the keys hits, misses, size, and maxsize.
+
+    """
+    return(INSTRUMENT_CACHE.stats())
 
 
 def id_for_option(symbol, expirationDate, strike, optionType='both'):
-    """Returns the id associated with a specific option order.
+    """Returns the id associated with a specific option order. The request is narrowed to the expiration date \
+    and strike, and ids are cached, so placing several orders for the same option only looks it up once.
 
     :param symbol: The symbol to get the id for.
     :type symbol: str
@@ -125,22 +320,106 @@ def id_for_option(symbol, expirationDate, strike, optionType='both'):
 
     """
     symbol = symbol.upper()
+    key = (symbol, expirationDate, float(strike), optionType)
+    optionID = cached_option_id(symbol, expirationDate, strike, optionType)
+    if optionID is not None:
+        return(optionID)
+
     payload = {'chain_id': id_for_chain(symbol),
+               'expiration_date': expirationDate,
+               'strike_price': strike,
                'state': 'active',
-               'tradability': 'tradable',
-               'type': optionType}
+               'tradability': 'tradable'}
+    if optionType == 'call' or optionType == 'put':
+        payload['type'] = optionType
     url = 'https://api.robinhood.com/options/instruments/'
     data = request_get(url, 'pagination', payload)
+    cache_option_ids(symbol, data)
 
-    listOfOptions = [item for item in data if item["expiration_date"] ==
-                     expirationDate and float(item["strike_price"]) == float(strike)]
+    listOfOptions = [item for item in data if item and item["expiration_date"] ==
+                     expirationDate and float(item["strike_price"]) == float(strike)
+                     and optionType in (item['type'], 'both')]
     if (len(listOfOptions) == 0):
-        print('Getting the option ID failed. Perhaps the expiration date is wrong format, or the strike price is wrong.')
+        report_error(InvalidArgumentError('Getting the option ID failed. Perhaps the expiration date is wrong format, '
+                                          'or the strike price is wrong.'))
         return(None)
 
+    OPTION_ID_CACHE.set(key, listOfOptions[0]['id'])
     return(listOfOptions[0]['id'])
 
 
+def cached_option_id(symbol, expirationDate, strike, optionType='both'):
+    """Returns the id of an option if it is in the cache, without making a request.
+
+    :param symbol: The symbol of the stock.
+    :type symbol: str
+    :param expirationDate: The expiration date as YYYY-MM-DD.
+    :type expirationDate: str
+    :param strike: The strike price.
+    :type strike: str
+    :param optionType: Either call, put, or both.
+    :type optionType: Optional[str]
+    :returns: The option id, or None if it has not been cached.
+
+    """
+    key = (symbol.upper(), expirationDate, float(strike), optionType)
+    if optionType == 'call' or optionType == 'put':
+        keys = [key]
+    else:
+        keys = [key, key[:3] + ('call',), key[:3] + ('put',)]
+    for eachKey in keys:
+        optionID = OPTION_ID_CACHE.get(eachKey)
+        if optionID is not MISSING:
+            return(optionID)
+    return(None)
+
+
+def load_option_ids(symbol, expirationDate, optionType='both'):
+    """Requests every tradable option of a stock that expires on a date and caches their ids, so that \
+    id_for_option can find any of them without making another request. Used to look up all the legs \
+    of a multi-leg order with one request per expiration date.
+
+    :param symbol: The symbol to get the ids for.
+    :type symbol: str
+    :param expirationDate: The expiration date as YYYY-MM-DD
+    :type expirationDate: str
+    :param optionType: Either call, put, or both.
+    :type optionType: Optional[str]
+    :returns: The number of option ids that were cached.
+
+    """
+    symbol = symbol.upper()
+    payload = {'chain_id': id_for_chain(symbol),
+               'expiration_date': expirationDate,
+               'state': 'active',
+               'tradability': 'tradable'}
+    if optionType == 'call' or optionType == 'put':
+        payload['type'] = optionType
+    url = 'https://api.robinhood.com/options/instruments/'
+    data = request_get(url, 'pagination', payload)
+    return(cache_option_ids(symbol, data))
+
+
+def cache_option_ids(symbol, options):
+    """Caches the id of each option instrument by its symbol, expiration date, strike, and type.
+
+    :param symbol: The upper case symbol of the stock.
+    :type symbol: str
+    :param options: A list of option instruments.
+    :type options: list
+    :returns: The number of option ids that were cached.
+
+    """
+    count = 0
+    for item in options:
+        if not item:
+            continue
+        OPTION_ID_CACHE.set((symbol, item['expiration_date'], float(
+            item['strike_price']), item['type']), item['id'])
+        count += 1
+    return(count)
+
+
 def round_price(price):
     """Takes a price and rounds it to an appropriate decimal place that Robinhood will accept.
 
@@ -189,12 +468,70 @@ def filter(data, info):
         elif info in compareDict and type(data) == dict:
             return(data[info])
         else:
-            print(error_argument_not_key_in_dictionary(info))
+            report_error(InvalidArgumentError(error_argument_not_key_in_dictionary(info), 'info', info))
             return(noneType)
     else:
         return(data)
 
 
+def filter_iter(data, info):
+    """Takes an iterable of dictionaries, such as the generator returned by request_get(stream=True), \
+    and lazily extracts the value for the keyword that matches info.
+
+    :param data: The data returned by request_get.
+    :type data: iterable
+    :param info: The keyword to filter from the data.
+    :type info: str
+    :returns:  A generator of the values that correspond to the info keyword, or of the dictionaries if info is None.
+
+    """
+    for item in data:
+        if item is None:
+            continue
+        if info is None:
+            yield item
+        elif info in item:
+            yield item[info]
+        else:
+            report_error(InvalidArgumentError(error_argument_not_key_in_dictionary(info), 'info', info))
+            return
+
+
+def chunked(items, size):
+    """Splits a list into lists of at most size items, keeping the original order.
+
+    :param items: The list to split.
+    :type items: list
+    :param size: The most items in each chunk.
+    :type size: int
+    :returns: A list of lists.
+
+    """
+    return([items[i:i + size] for i in range(0, len(items), size)])
+
+
+def map_concurrently(func, items, max_workers=None):
+    """Calls func on every item using the pool of the current client. Used to send independent requests at the same time.
+
+    :param func: The function to call with each item.
+    :type func: function
+    :param items: The items to pass to func.
+    :type items: list
+    :param max_workers: The most calls that can run at the same time.
+    :type max_workers: Optional[int]
+    :returns: A list of the return values of func, in the same order as items.
+
+    """
+    items = list(items)
+    if max_workers is None:
+        max_workers = FANOUT_CONCURRENCY
+    if len(items) <= 1 or max_workers <= 1:
+        return([func(item) for item in items])
+    with get_client().executor(min(max_workers, len(items))) as executor:
+        futures = [submit(executor, func, item) for item in items]
+        return([future.result() for future in futures])
+
+
 def inputs_to_set(inputSymbols):
     """Takes in the parameters passed to *args and puts them in a set and a list.
     The set will make sure there are no duplicates, and then the list will keep
@@ -234,16 +571,16 @@ def request_document(url, payload=None):
 
     """
     try:
-        res = SESSION.get(url, params=payload)
+        res = transport.send_get(get_client().session, url, 'documents', params=payload)
         res.raise_for_status()
-    except requests.exceptions.HTTPError as message:
-        print(message)
+    except requests.exceptions.RequestException as message:
+        report_error(APIError.from_exception(message, url), message)
         return(None)
 
     return(res)
 
 
-def request_get(url, dataType='regular', payload=None, jsonify_data=True):
+def request_get(url, dataType='regular', payload=None, jsonify_data=True, max_pages=None, concurrency=None, stream=False):
     """For a given url and payload, makes a get request and returns the data.
 
     :param url: The url to send a get request to.
@@ -254,10 +591,20 @@ def request_get(url, dataType='regular', payload=None, jsonify_data=True):
     :type dataType: Optional[str]
     :param payload: Dictionary of parameters to pass to the url. Will append the requests url as url/?key1=value1&key2=value2.
     :type payload: Optional[dict]
-    :param jsonify_data: If this is true, will return requests.post().json(), otherwise will return response from requests.post().
+    :param jsonify_data: If this is true, will return requests.post().json(), otherwise will return response from \
+    requests.post().
     :type jsonify_data: bool
+    :param max_pages: Only used with 'pagination'. The most pages to load. Defaults to the value set by set_pagination_options.
+    :type max_pages: Optional[int]
+    :param concurrency: Only used with 'pagination'. The number of pages that can be loaded at the same time.
+    :type concurrency: Optional[int]
+    :param stream: Only used with 'pagination'. If true, returns a generator that yields each item as its page arrives. \
+    No more pages are requested once the generator is closed or garbage collected. If a page can't be loaded, \
+    the generator stops after logging the error.
+    :type stream: Optional[bool]
     :returns: Returns the data from the get request. If jsonify_data=True and requests returns an http code other than <200> \
-    then either '[None]' or 'None' will be returned based on what the dataType parameter was set as.
+    then either '[None]' or 'None' will be returned based on what the dataType parameter was set as. With 'pagination', \
+    '[None]' is also returned if a later page can't be loaded, instead of a partial list.
 
     """
     if (dataType == 'results' or dataType == 'pagination'):
@@ -267,50 +614,43 @@ def request_get(url, dataType='regular', payload=None, jsonify_data=True):
     res = None
     if jsonify_data:
         try:
-            res = SESSION.get(url, params=payload)
-            res.raise_for_status()
-            data = res.json()
-        except (requests.exceptions.HTTPError, AttributeError) as message:
-            print(message)
+            data = fetch_json(url, payload)
+        except (requests.exceptions.RequestException, AttributeError) as message:
+            report_error(APIError.from_exception(message, url), message)
             return(data)
     else:
-        res = SESSION.get(url, params=payload)
+        res = transport.send_get(get_client().session, url, params=payload)
         return(res)
     # Only continue to filter data if jsonify_data=True, and Session.get returned status code <200>.
     if (dataType == 'results'):
         try:
             data = data['results']
         except KeyError as message:
-            print("{0} is not a key in the dictionary".format(message))
+            report_error(APIError(error_key_not_in_response(message), url), message)
             return([None])
     elif (dataType == 'pagination'):
-        counter = 2
-        nextData = data
         try:
-            data = data['results']
+            data['results']
         except KeyError as message:
-            print("{0} is not a key in the dictionary".format(message))
+            report_error(APIError(error_key_not_in_response(message), url), message)
             return([None])
 
-        if nextData['next']:
-            print('Found Additional pages.')
-        while nextData['next']:
-            try:
-                res = SESSION.get(nextData['next'])
-                res.raise_for_status()
-                nextData = res.json()
-            except:
-                print('Additional pages exist but could not be loaded.')
-                return(data)
-            print('Loading page '+str(counter)+' ...')
-            counter += 1
-            for item in nextData['results']:
-                data.append(item)
+        metrics.count('GET', url, 'paginations')
+        metrics.count('GET', url, 'pages')
+        pages = paginate(data, max_pages, concurrency)
+        if stream:
+            return(item for page in pages if page is not None for item in page)
+        data = []
+        for page in pages:
+            if page is None:
+                # The list would be missing the pages after the one that failed.
+                return([None])
+            data.extend(page)
     elif (dataType == 'indexzero'):
         try:
             data = data['results'][0]
         except KeyError as message:
-            print("{0} is not a key in the dictionary".format(message))
+            report_error(APIError(error_key_not_in_response(message), url), message)
             return(None)
         except IndexError as message:
             return(None)
@@ -318,6 +658,308 @@ def request_get(url, dataType='regular', payload=None, jsonify_data=True):
     return(data)
 
 
+def fetch_json(url, payload=None):
+    """Makes a get request and decodes the json. Identical requests made at the same time by the same client \
+    share one request, and each caller gets its own copy of the data.
+
+    :param url: The url to send a get request to.
+    :type url: str
+    :param payload: Dictionary of parameters to pass to the url.
+    :type payload: Optional[dict]
+    :returns: The decoded json. Raises an HTTPError if the response code is not <200>, and the ConnectionError \
+    or Timeout of the last try if the request could not be sent.
+
+    """
+    client = get_client()
+    session = client.session
+    key = (id(session), url, json.dumps(payload, sort_keys=True, default=str))
+    conditional = CONDITIONAL_REQUESTS and urlparse(url).path.startswith(CONDITIONAL_PATHS)
+
+    sent = []
+
+    def fetch():
+        sent.append(True)
+        headers = VALIDATOR_CACHE.validators(key) if conditional else {}
+        res = transport.send_get(session, url, params=payload, headers=headers)
+        if res.status_code == 304 and headers:
+            data = VALIDATOR_CACHE.revalidated(key)
+            if data is not MISSING:
+                metrics.count('GET', url, 'not_modified')
+                return(data)
+            # The stored body was evicted while the request was sent, so ask for the full body.
+            res = transport.send_get(session, url, params=payload)
+        res.raise_for_status()
+        data = decoding.decode(res, url)
+        if conditional:
+            VALIDATOR_CACHE.store(key, res, data)
+        return(data)
+    ttl = response_cache_ttl(url)
+    if ttl:
+        data = RESPONSE_CACHE.get(key)
+        if data is not MISSING:
+            metrics.count('GET', url, 'response_cache_hits')
+            return(deepcopy(data))
+    if COALESCE_REQUESTS:
+        data = IN_FLIGHT.do(key, fetch, wait=client.wait)
+        if not sent:
+            metrics.count('GET', url, 'coalesced')
+    else:
+        data = fetch()
+    if ttl:
+        RESPONSE_CACHE.set(key, deepcopy(data), ttl)
+    return(data)
+
+
+def response_cache_ttl(url):
+    """Returns the number of seconds a response from a url may be cached.
+
+    :param url: The url of the get request.
+    :type url: str
+    :returns: The ttl of the longest matching path in RESPONSE_CACHE_TTLS, or None if the url should not be cached \
+    or the response cache is off.
+
+    """
+    if not RESPONSE_CACHE_ENABLED:
+        return(None)
+    path = urlparse(url).path
+    matches = [prefix for prefix in RESPONSE_CACHE_TTLS if path.startswith(prefix)]
+    if not matches:
+        return(None)
+    return(RESPONSE_CACHE_TTLS[max(matches, key=len)])
+
+
+def set_response_cache(enabled=None, ttls=None, cache=None):
+    """Sets up the cache of decoded get responses. Every cached response is dropped after a successful post \
+    or delete request, such as placing or cancelling an order.
+
+    :param enabled: Whether responses are cached.
+    :type enabled: Optional[bool]
+    :param ttls: Maps the start of a url path, such as '/quotes/', to the seconds its responses are cached. \
+    Use None as a value to stop caching a path.
+    :type ttls: Optional[dict]
+    :param cache: Replaces the cache. Any object with the get, set, and clear methods of robin_stocks.cache.TTLCache.
+    :type cache: Optional[TTLCache]
+    :returns: None. Updates the response cache settings.
+
+    """
+    global RESPONSE_CACHE_ENABLED, RESPONSE_CACHE
+    if enabled is not None:
+        RESPONSE_CACHE_ENABLED = bool(enabled)
+    if ttls is not None:
+        for prefix, ttl in ttls.items():
+            if ttl is None:
+                RESPONSE_CACHE_TTLS.pop(prefix, None)
+            else:
+                RESPONSE_CACHE_TTLS[prefix] = ttl
+    if cache is not None:
+        RESPONSE_CACHE = cache
+
+
+def clear_response_cache():
+    """Removes every cached response.
+
+    :returns: None
+
+    """
+    RESPONSE_CACHE.clear(reset_stats=False)
+
+
+def set_conditional_requests(enabled=None, paths=None):
+    """Sets which get requests are sent with the ETag and Last-Modified headers of the last response, so that \
+    the server can answer 304 Not Modified and the stored response is used instead of downloading it again.
+
+    :param enabled: Whether conditional requests are sent.
+    :type enabled: Optional[bool]
+    :param paths: The starts of the url paths that are requested conditionally, such as '/instruments/'.
+    :type paths: Optional[list]
+    :returns: None. Updates the conditional request settings.
+
+    """
+    global CONDITIONAL_REQUESTS, CONDITIONAL_PATHS
+    if enabled is not None:
+        CONDITIONAL_REQUESTS = bool(enabled)
+        if not CONDITIONAL_REQUESTS:
+            VALIDATOR_CACHE.clear(reset_stats=False)
+    if paths is not None:
+        CONDITIONAL_PATHS = tuple(paths)
+
+
+def get_conditional_request_stats():
+    """Returns how many conditional requests were sent, how many were answered with 304 Not Modified, and \
+    how many bytes of response bodies that saved.
+
+    :returns: A dictionary with the keys conditional_requests, not_modified, hit_rate, bytes_saved, hits, \
+    misses, size, and maxsize.
+
+    """
+    return(VALIDATOR_CACHE.stats())
+
+
+def get_response_cache_stats():
+    """Returns the hit and miss counters and the size of the response cache.
+
+    :returns: A dictionary with the keys hits, misses, size, and maxsize.
+
+    """
+    return(RESPONSE_CACHE.stats())
+
+
+def request_symbols(url, symbols, payload=None, chunk_size=None):
+    """Makes a get request for the 'results' of a list of symbols. Long lists are split into chunks the server \
+    accepts, the chunks are requested at the same time, and the results are put back together in order.
+
+    :param url: The url to send a get request to.
+    :type url: str
+    :param symbols: The stock tickers to pass as the 'symbols' parameter.
+    :type symbols: list
+    :param payload: Any other parameters to pass to the url.
+    :type payload: Optional[dict]
+    :param chunk_size: The most symbols in one request. Defaults to globals.SYMBOLS_PER_REQUEST.
+    :type chunk_size: Optional[int]
+    :returns: A list with one item for each symbol, in the same order as symbols, where tickers that do not exist are None. \
+    If any chunk could not be loaded, returns [None].
+
+    """
+    if chunk_size is None:
+        chunk_size = SYMBOLS_PER_REQUEST
+
+    def request_chunk(chunk):
+        chunkPayload = dict(payload or {}, symbols=','.join(chunk))
+        try:
+            return(fetch_json(url, chunkPayload)['results'])
+        except (requests.exceptions.RequestException, AttributeError) as message:
+            report_error(APIError.from_exception(message, url), message)
+        except KeyError as message:
+            report_error(APIError(error_key_not_in_response(message), url), message)
+        return(None)
+
+    data = []
+    for chunkData in map_concurrently(request_chunk, chunked(symbols, chunk_size)):
+        if chunkData is None:
+            return([None])
+        data.extend(chunkData)
+    return(data)
+
+
+def set_request_coalescing(enabled):
+    """Turns on or off the sharing of identical get requests that are made at the same time.
+
+    :param enabled: Whether identical requests share one request.
+    :type enabled: bool
+    :returns: None
+
+    """
+    global COALESCE_REQUESTS
+    COALESCE_REQUESTS = bool(enabled)
+
+
+def paginate(data, max_pages=None, concurrency=None):
+    """Takes the first page of a paginated response and yields the 'results' of that page and every page after it.
+    The next page is requested while the current one is being processed. When the next urls use a numeric offset \
+    and the total count is known, several pages are requested at once.
+
+    :param data: The decoded json of the first page. Must contain the 'results' key.
+    :type data: dict
+    :param max_pages: The most pages to yield, including the first one.
+    :type max_pages: Optional[int]
+    :param concurrency: The number of pages that can be loaded at the same time.
+    :type concurrency: Optional[int]
+    :returns: A generator of lists. Pages that are throttled or fail are retried. If a page still fails to load, \
+    a PaginationError with the url to resume from is reported with report_error, which raises it if \
+    set_raise_errors(True) was called. Otherwise it is logged, and the generator yields None and stops.
+
+    """
+    if max_pages is None:
+        max_pages = PAGINATION_MAX_PAGES
+    if concurrency is None:
+        concurrency = PAGINATION_CONCURRENCY
+    concurrency = max(1, concurrency)
+
+    yield data['results']
+    if not data.get('next') or (max_pages and max_pages <= 1):
+        return
+
+    logger.debug('Found additional pages.')
+    offsetUrls = offset_page_urls(data, max_pages)
+    pending = deque()
+    with get_client().executor(concurrency) as executor:
+        try:
+            if offsetUrls:
+                for pageUrl in islice(offsetUrls, concurrency):
+                    pending.append((pageUrl, submit(executor, request_page, pageUrl)))
+            else:
+                pending.append((data['next'], submit(executor, request_page, data['next'])))
+            counter = 2
+            while pending:
+                pageUrl, future = pending.popleft()
+                try:
+                    nextData = future.result()
+                    nextData['results']
+                except Exception as message:
+                    # request_page has already retried the page, so report where to pick up from.
+                    report_error(PaginationError('Additional pages exist but could not be loaded. Resume from '
+                                                 '{0}'.format(pageUrl), pageUrl), message)
+                    yield None
+                    return
+                # Queue up the following page before handing this one back.
+                if offsetUrls:
+                    pageUrl = next(offsetUrls, None)
+                    if pageUrl:
+                        pending.append((pageUrl, submit(executor, request_page, pageUrl)))
+                elif nextData.get('next') and not (max_pages and counter >= max_pages):
+                    pending.append((nextData['next'], submit(
+                        executor, request_page, nextData['next'])))
+                logger.debug('Loading page %d ...', counter)
+                counter += 1
+                yield nextData['results']
+        finally:
+            for pageUrl, future in pending:
+                future.cancel()
+
+
+def offset_page_urls(data, max_pages=None):
+    """Builds the urls for all remaining pages when the 'next' url pages with a numeric offset.
+
+    :param data: The decoded json of the first page.
+    :type data: dict
+    :param max_pages: The most pages to load, including the first one.
+    :type max_pages: Optional[int]
+    :returns: An iterator of urls, or None if the remaining pages can't be known ahead of time.
+
+    """
+    count = data.get('count')
+    pageSize = len(data['results'])
+    parsed = urlparse(data['next'])
+    query = parse_qs(parsed.query)
+    if type(count) is not int or pageSize == 0 or len(query.get('offset', [])) != 1:
+        return(None)
+    try:
+        offset = int(query['offset'][0])
+    except ValueError:
+        return(None)
+
+    urls = []
+    while offset < count and not (max_pages and len(urls) + 1 >= max_pages):
+        query['offset'] = [str(offset)]
+        urls.append(parsed._replace(query=urlencode(query, doseq=True)).geturl())
+        offset += pageSize
+    return(iter(urls))
+
+
+def request_page(url):
+    """Makes a get request for a single page of a paginated response.
+
+    :param url: The 'next' url of the previous page.
+    :type url: str
+    :returns: The decoded json of the page. Raises an exception if the page could not be loaded after retrying.
+
+    """
+    res = transport.send_get(get_client().session, url)
+    res.raise_for_status()
+    metrics.count('GET', url, 'pages')
+    return(decoding.decode(res, url))
+
+
 def request_post(url, payload=None, timeout=16, json=False, jsonify_data=True):
     """For a given url and payload, makes a post request and returns the response. Allows for responses other than 200.
 
@@ -327,9 +969,10 @@ def request_post(url, payload=None, timeout=16, json=False, jsonify_data=True):
     :type payload: Optional[dict]
     :param timeout: The time for the post to wait for a response. Should be slightly greater than multiples of 3.
     :type timeout: Optional[int]
-    :param json: This will set the 'content-type' parameter of the session header to 'application/json'
+    :param json: This will send the payload as json and set the 'content-type' header of the request to 'application/json'
     :type json: bool
-    :param jsonify_data: If this is true, will return requests.post().json(), otherwise will return response from requests.post().
+    :param jsonify_data: If this is true, will return requests.post().json(), otherwise will return response from \
+    requests.post().
     :type jsonify_data: bool
     :returns: Returns the data from the post request.
 
@@ -337,16 +980,20 @@ def request_post(url, payload=None, timeout=16, json=False, jsonify_data=True):
     data = None
     res = None
     try:
+        session = get_client().session
         if json:
-            update_session('Content-Type', 'application/json')
-            res = SESSION.post(url, json=payload, timeout=timeout)
-            update_session(
-                'Content-Type', 'application/x-www-form-urlencoded; charset=utf-8')
+            # Set per request so the session headers shared with other threads are never changed.
+            res = metrics.send_request(session, 'POST', url, json=payload, timeout=timeout,
+                                       headers={'Content-Type': 'application/json'})
         else:
-            res = SESSION.post(url, data=payload, timeout=timeout)
-        data = res.json()
+            res = metrics.send_request(session, 'POST', url, data=payload, timeout=timeout)
+        if res.status_code < 400:
+            # Orders, cancels, and transfers can change any cached account data.
+            clear_response_cache()
+        data = decoding.decode(res, url, 'POST')
     except Exception as message:
-        print("Error in request_post: {0}".format(message))
+        report_error(APIError('Error in request_post: {0}'.format(message), url,
+                              getattr(res, 'status_code', None), res), message)
     # Either return response <200,401,etc.> or the data that is returned from requests.
     if jsonify_data:
         return(data)
@@ -359,15 +1006,17 @@ def request_delete(url):
 
     :param url: The url to send a delete request to.
     :type url: str
-    :returns: Returns the data from the delete request.
+    :returns: Returns the response of the delete request, or None if the request failed.
 
     """
+    data = None
     try:
-        res = SESSION.delete(url)
+        res = metrics.send_request(get_client().session, 'DELETE', url, timeout=transport.timeout_for(url))
         res.raise_for_status()
+        clear_response_cache()
+        data = res
     except Exception as message:
-        data = None
-        print("Error in request_delete: {0}".format(message))
+        report_error(APIError.from_exception(message, url), message)
 
     return(data)
 
@@ -379,18 +1028,51 @@ def update_session(key, value):
     :type key: str
     :param value: The value that corresponds to the key.
     :type value: str
-    :returns: None. Updates the session header with a value.
+    :returns: None. Updates the session header of the current client with a value.
 
     """
-    SESSION.headers[key] = value
+    get_client().session.headers[key] = value
 
 
-def error_argument_not_key_in_dictionary(keyword):
-    return('Error: The keyword "{0}" is not a key in the dictionary.'.format(keyword))
+def set_raise_errors(enabled):
+    """Sets whether errors are raised as exceptions from robin_stocks.exceptions. When off, errors are logged to \
+    the robin_stocks loggers and the function returns None or [None] instead.
 
+    :param enabled: Whether errors are raised.
+    :type enabled: bool
+    :returns: None
 
-def error_ticker_does_not_exist(ticker):
-    return('Warning: "{0}" is not a valid stock ticker. It is being ignored'.format(ticker))
+    """
+    global RAISE_ERRORS
+    RAISE_ERRORS = bool(enabled)
+
+
+def report_error(error, cause=None, log=None):
+    """Raises error if set_raise_errors(True) was called, otherwise logs it as an error. The exception is passed \
+    to log handlers as the 'error' attribute of the record, so they can read its fields.
+
+    :param error: The error to report.
+    :type error: RobinhoodError
+    :param cause: The exception that caused the error, if there was one.
+    :type cause: Optional[Exception]
+    :param log: The logger to log the error with. Defaults to the robin_stocks.http logger.
+    :type log: Optional[logging.Logger]
+    :returns: None
+
+    """
+    if RAISE_ERRORS:
+        if cause is None:
+            raise error
+        raise error from cause
+    (log or logger).error('%s', error, extra={'error': error})
+
+
+def error_key_not_in_response(keyword):
+    return('{0} is not a key in the dictionary'.format(keyword))
+
+
+def error_argument_not_key_in_dictionary(keyword):
+    return('Error: The keyword "{0}" is not a key in the dictionary.'.format(keyword))
 
 
 def error_must_be_nonzero(keyword):
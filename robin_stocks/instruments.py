@@ -0,0 +1,170 @@
+"""Contains a persistent SQLite index of stock instrument data."""
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# The index used by the instrument lookups. None until open_instrument_index is called.
+INDEX = None
+
+
+def default_index_path():
+    """Returns the default location of the index, which is next to the stored login token.
+
+    :returns: The path to the database file.
+
+    """
+    home_dir = os.path.expanduser("~")
+    data_dir = os.path.join(home_dir, ".tokens")
+    return(os.path.join(data_dir, "instruments.sqlite3"))
+
+
+class InstrumentIndex:
+    """A SQLite backed index of instrument data that can be shared by processes on the same machine.
+
+    :param path: The location of the database file. Defaults to ~/.tokens/instruments.sqlite3.
+    :type path: Optional[str]
+    :param max_age: The number of seconds an entry is trusted before it is treated as stale.
+    :type max_age: Optional[float]
+
+    """
+
+    def __init__(self, path=None, max_age=7 * 24 * 60 * 60):
+        if path is None:
+            path = default_index_path()
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self.path = path
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute('''CREATE TABLE IF NOT EXISTS instruments (
+                id TEXT PRIMARY KEY,
+                symbol TEXT,
+                url TEXT,
+                chain_id TEXT,
+                name TEXT,
+                type TEXT,
+                data TEXT NOT NULL,
+                updated_at REAL NOT NULL)''')
+            self._connection.execute(
+                'CREATE INDEX IF NOT EXISTS instruments_symbol ON instruments (symbol)')
+            self._connection.execute(
+                'CREATE INDEX IF NOT EXISTS instruments_url ON instruments (url)')
+
+    def get_by_symbol(self, symbol):
+        """Returns the instrument data for a stock ticker.
+
+        :param symbol: The upper case stock ticker.
+        :type symbol: str
+        :returns: A dictionary of instrument data, or None if the symbol is not indexed or is stale.
+
+        """
+        return(self._get('symbol', symbol))
+
+    def get_by_url(self, url):
+        """Returns the instrument data for an instrument url.
+
+        :param url: The instrument url.
+        :type url: str
+        :returns: A dictionary of instrument data, or None if the url is not indexed or is stale.
+
+        """
+        return(self._get('url', url))
+
+    def get_by_id(self, id):
+        """Returns the instrument data for an instrument id.
+
+        :param id: The instrument id.
+        :type id: str
+        :returns: A dictionary of instrument data, or None if the id is not indexed or is stale.
+
+        """
+        return(self._get('id', id))
+
+    def add(self, instruments):
+        """Adds or refreshes instrument data in the index.
+
+        :param instruments: A list of dictionaries as returned by the instruments url.
+        :type instruments: list
+        :returns: The number of instruments that were written.
+
+        """
+        now = time.time()
+        rows = [(item['id'], item.get('symbol'), item.get('url'), item.get('tradable_chain_id'),
+                 item.get('simple_name') or item.get('name'), item.get('type'), json.dumps(item), now)
+                for item in instruments if item and 'id' in item]
+        with self._lock, self._connection:
+            self._connection.executemany(
+                'INSERT OR REPLACE INTO instruments VALUES (?, ?, ?, ?, ?, ?, ?, ?)', rows)
+        return(len(rows))
+
+    def symbols(self):
+        """Returns every symbol in the index that is not stale.
+
+        :returns: A list of strings.
+
+        """
+        with self._lock:
+            rows = self._connection.execute('SELECT symbol FROM instruments WHERE updated_at > ?',
+                                            (time.time() - self.max_age,)).fetchall()
+        return([row[0] for row in rows])
+
+    def clear(self):
+        """Removes every instrument from the index.
+
+        :returns: None
+
+        """
+        with self._lock, self._connection:
+            self._connection.execute('DELETE FROM instruments')
+
+    def close(self):
+        """Closes the database connection.
+
+        :returns: None
+
+        """
+        with self._lock:
+            self._connection.close()
+
+    def _get(self, column, value):
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT data, updated_at FROM instruments WHERE {0} = ? ORDER BY updated_at DESC LIMIT 1'.format(column),
+                (value,)).fetchone()
+        if row is None or row[1] <= time.time() - self.max_age:
+            return(None)
+        return(json.loads(row[0]))
+
+
+def open_instrument_index(path=None, max_age=7 * 24 * 60 * 60):
+    """Opens the instrument index and makes the instrument lookups read through it.
+
+    :param path: The location of the database file. Defaults to ~/.tokens/instruments.sqlite3.
+    :type path: Optional[str]
+    :param max_age: The number of seconds an entry is trusted before it is requested again.
+    :type max_age: Optional[float]
+    :returns: The InstrumentIndex that was opened.
+
+    """
+    global INDEX
+    if INDEX is not None:
+        INDEX.close()
+    INDEX = InstrumentIndex(path, max_age)
+    return(INDEX)
+
+
+def close_instrument_index():
+    """Closes the instrument index. Instrument lookups will only use the in-memory cache and requests.
+
+    :returns: None
+
+    """
+    global INDEX
+    if INDEX is not None:
+        INDEX.close()
+        INDEX = None
@@ -1,6 +1,11 @@
 """Contains functions for getting market level data."""
+import logging
+
 import robin_stocks.helper as helper
 import robin_stocks.urls as urls
+from robin_stocks.exceptions import InvalidArgumentError
+
+logger = logging.getLogger(__name__)
 
 
 def get_top_movers(direction, info=None):
@@ -17,11 +22,12 @@ def get_top_movers(direction, info=None):
     try:
         direction = direction.lower().strip()
     except AttributeError as message:
-        print(message)
+        helper.report_error(InvalidArgumentError(str(message), 'direction', direction), message, logger)
         return None
 
     if (direction != 'up' and direction != 'down'):
-        print('Error: direction must be "up" or "down"')
+        helper.report_error(InvalidArgumentError('direction must be "up" or "down"',
+                                                 'direction', direction), log=logger)
         return([None])
 
     url = urls.movers()
@@ -0,0 +1,441 @@
+"""Contains the registry that times every request and the hooks that are called around it."""
+import re
+import threading
+import time
+from collections import deque
+from urllib.parse import urlparse
+
+from robin_stocks.globals import (METRICS_BUCKETS, METRICS_ENABLED,
+                                  METRICS_SAMPLES)
+
+# Functions called with the event of each request before it is sent.
+PRE_REQUEST_HOOKS = []
+# Functions called with the event of each request after its response arrives or it fails.
+POST_REQUEST_HOOKS = []
+# Path segments that are ids or tickers, used to group urls that are not built by urls.py.
+_ID_SEGMENT = re.compile(r'[0-9a-fA-F]{8}-[0-9a-fA-F-]{27}|[0-9a-fA-F]{32}|\d+|[A-Z0-9.\-]+')
+# The host and path of each url built in urls.py. Format fields filled by a lookup are named id.
+TEMPLATES = (
+    ('api.robinhood.com', '/accounts/'),
+    ('api.robinhood.com', '/accounts/{account}/recent_day_trades/'),
+    ('api.robinhood.com', '/ach/relationships/'),
+    ('api.robinhood.com', '/ach/relationships/{id}/'),
+    ('api.robinhood.com', '/ach/relationships/{id}/unlink/'),
+    ('api.robinhood.com', '/ach/transfers/'),
+    ('api.robinhood.com', '/cash_journal/margin_interest_charges/'),
+    ('api.robinhood.com', '/challenge/{challenge_id}/respond/'),
+    ('api.robinhood.com', '/dividends/'),
+    ('api.robinhood.com', '/documents/'),
+    ('api.robinhood.com', '/fundamentals/'),
+    ('api.robinhood.com', '/instruments/'),
+    ('api.robinhood.com', '/instruments/{id}/popularity/'),
+    ('api.robinhood.com', '/instruments/{id}/splits/'),
+    ('api.robinhood.com', '/margin/calls/'),
+    ('api.robinhood.com', '/marketdata/earnings/'),
+    ('api.robinhood.com', '/marketdata/forex/historicals/{id}/'),
+    ('api.robinhood.com', '/marketdata/forex/quotes/{id}/'),
+    ('api.robinhood.com', '/marketdata/options/'),
+    ('api.robinhood.com', '/marketdata/options/historicals/{id}/'),
+    ('api.robinhood.com', '/marketdata/options/{id}/'),
+    ('api.robinhood.com', '/marketdata/pricebook/snapshots/{id}/'),
+    ('api.robinhood.com', '/marketdata/quotes/{id}/'),
+    ('api.robinhood.com', '/markets/'),
+    ('api.robinhood.com', '/midlands/movers/sp500/'),
+    ('api.robinhood.com', '/midlands/news/{symbol}/'),
+    ('api.robinhood.com', '/midlands/notifications/notification_tracker/'),
+    ('api.robinhood.com', '/midlands/ratings/{id}/'),
+    ('api.robinhood.com', '/midlands/referral/'),
+    ('api.robinhood.com', '/notifications/devices/'),
+    ('api.robinhood.com', '/oauth2/token/'),
+    ('api.robinhood.com', '/options/aggregate_positions/'),
+    ('api.robinhood.com', '/options/chains/{id}/'),
+    ('api.robinhood.com', '/options/events/'),
+    ('api.robinhood.com', '/options/instruments/'),
+    ('api.robinhood.com', '/options/instruments/{id}/'),
+    ('api.robinhood.com', '/options/orders/'),
+    ('api.robinhood.com', '/options/orders/{id}/'),
+    ('api.robinhood.com', '/options/orders/{id}/cancel/'),
+    ('api.robinhood.com', '/options/positions/'),
+    ('api.robinhood.com', '/orders/'),
+    ('api.robinhood.com', '/orders/{id}/'),
+    ('api.robinhood.com', '/orders/{id}/cancel/'),
+    ('api.robinhood.com', '/portfolios/'),
+    ('api.robinhood.com', '/positions/'),
+    ('api.robinhood.com', '/quotes/'),
+    ('api.robinhood.com', '/quotes/historicals/'),
+    ('api.robinhood.com', '/stock_loan/payments/'),
+    ('api.robinhood.com', '/subscription/subscription_fees/'),
+    ('api.robinhood.com', '/user/'),
+    ('api.robinhood.com', '/user/additional_info/'),
+    ('api.robinhood.com', '/user/basic_info/'),
+    ('api.robinhood.com', '/user/investment_profile/'),
+    ('api.robinhood.com', '/watchlists/'),
+    ('api.robinhood.com', '/watchlists/{name}/'),
+    ('api.robinhood.com', '/watchlists/{name}/bulk_add/'),
+    ('api.robinhood.com', '/wire/transfers'),
+    ('nummus.robinhood.com', '/accounts/'),
+    ('nummus.robinhood.com', '/currency_pairs/'),
+    ('nummus.robinhood.com', '/holdings/'),
+    ('nummus.robinhood.com', '/orders/'),
+    ('nummus.robinhood.com', '/orders/{id}/'),
+    ('nummus.robinhood.com', '/orders/{id}/cancel/')
+)
+# The compiled endpoint templates. Built the first time a url is grouped.
+_templates = None
+_templates_lock = threading.Lock()
+
+
+class Histogram:
+    """Counts observations in cumulative buckets and keeps the most recent ones to find percentiles from.
+
+    :param buckets: The upper bounds of the buckets in ascending order.
+    :type buckets: tuple
+    :param samples: The number of recent observations to keep.
+    :type samples: int
+
+    """
+
+    def __init__(self, buckets, samples):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.recent = deque(maxlen=samples)
+
+    def observe(self, value):
+        """Adds one observation."""
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.count += 1
+        self.sum += value
+        self.recent.append(value)
+
+    def percentile(self, fraction):
+        """Returns the value below which fraction of the recent observations fall, or None if there are none."""
+        if not self.recent:
+            return(None)
+        ordered = sorted(self.recent)
+        return(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))])
+
+    def cumulative(self):
+        """Returns the number of observations at or below each bucket bound."""
+        total = 0
+        counts = []
+        for count in self.counts:
+            total += count
+            counts.append(total)
+        return(counts)
+
+
+class MetricsRegistry:
+    """A thread safe collection of request metrics, grouped by method, host and endpoint template.
+
+    :param buckets: The upper bounds in seconds of the histogram buckets. Defaults to globals.METRICS_BUCKETS.
+    :type buckets: Optional[tuple]
+    :param samples: The number of recent times kept for percentiles. Defaults to globals.METRICS_SAMPLES.
+    :type samples: Optional[int]
+
+    """
+    # The counters every endpoint starts with.
+    COUNTERS = ('requests', 'errors', 'response_bytes', 'pages', 'paginations',
+                'response_cache_hits', 'not_modified', 'coalesced')
+    # The histograms every endpoint starts with.
+    HISTOGRAMS = ('request_seconds', 'decode_seconds')
+
+    def __init__(self, buckets=None, samples=None):
+        self.buckets = tuple(sorted(buckets or METRICS_BUCKETS))
+        self.samples = samples or METRICS_SAMPLES
+        self._endpoints = {}
+        self._lock = threading.Lock()
+
+    def _stats(self, key):
+        stats = self._endpoints.get(key)
+        if stats is None:
+            stats = self._endpoints[key] = {
+                'counters': dict.fromkeys(self.COUNTERS, 0),
+                'histograms': {name: Histogram(self.buckets, self.samples) for name in self.HISTOGRAMS}
+            }
+        return(stats)
+
+    def count(self, method, url, name, amount=1):
+        """Adds amount to a counter of the endpoint of a url.
+
+        :param method: The http method, such as 'GET'.
+        :type method: str
+        :param url: The url of the request.
+        :type url: str
+        :param name: The counter, one of MetricsRegistry.COUNTERS.
+        :type name: str
+        :param amount: The amount to add.
+        :type amount: Optional[int]
+        :returns: None
+
+        """
+        key = (method,) + endpoint_for(url)
+        with self._lock:
+            self._stats(key)['counters'][name] += amount
+
+    def observe(self, method, url, name, seconds):
+        """Adds a time to a histogram of the endpoint of a url.
+
+        :param method: The http method, such as 'GET'.
+        :type method: str
+        :param url: The url of the request.
+        :type url: str
+        :param name: The histogram, one of MetricsRegistry.HISTOGRAMS.
+        :type name: str
+        :param seconds: The time to add.
+        :type seconds: float
+        :returns: None
+
+        """
+        key = (method,) + endpoint_for(url)
+        with self._lock:
+            self._stats(key)['histograms'][name].observe(seconds)
+
+    def record(self, event):
+        """Adds a finished request event to the counters and request time histogram of its endpoint."""
+        key = (event['method'], event['host'], event['endpoint'])
+        with self._lock:
+            stats = self._stats(key)
+            counters = stats['counters']
+            counters['requests'] += 1
+            counters['response_bytes'] += event['bytes']
+            if event['error'] is not None or (event['status'] or 0) >= 400:
+                counters['errors'] += 1
+            stats['histograms']['request_seconds'].observe(event['seconds'])
+
+    def snapshot(self):
+        """Returns the metrics of every endpoint that has been requested.
+
+        :returns: A list of dictionaries with the keys method, host, endpoint, every counter in \
+        MetricsRegistry.COUNTERS, and for each histogram the keys <name>_count, <name>_sum, <name>_p50 and <name>_p99.
+
+        """
+        rows = []
+        with self._lock:
+            for (method, host, endpoint), stats in sorted(self._endpoints.items()):
+                row = {'method': method, 'host': host, 'endpoint': endpoint}
+                row.update(stats['counters'])
+                for name, histogram in stats['histograms'].items():
+                    row[name + '_count'] = histogram.count
+                    row[name + '_sum'] = histogram.sum
+                    row[name + '_p50'] = histogram.percentile(0.5)
+                    row[name + '_p99'] = histogram.percentile(0.99)
+                rows.append(row)
+        return(rows)
+
+    def to_prometheus(self, prefix='robin_stocks'):
+        """Returns the metrics in the Prometheus text exposition format.
+
+        :param prefix: The start of every metric name.
+        :type prefix: Optional[str]
+        :returns: A string ending in a newline.
+
+        """
+        lines = []
+        with self._lock:
+            items = sorted(self._endpoints.items())
+            for name in self.COUNTERS:
+                metric = '{0}_{1}_total'.format(prefix, name)
+                lines.append('# TYPE {0} counter'.format(metric))
+                for key, stats in items:
+                    lines.append('{0}{{{1}}} {2}'.format(metric, _labels(key), stats['counters'][name]))
+            for name in self.HISTOGRAMS:
+                metric = '{0}_{1}'.format(prefix, name)
+                lines.append('# TYPE {0} histogram'.format(metric))
+                for key, stats in items:
+                    histogram = stats['histograms'][name]
+                    labels = _labels(key)
+                    for bound, count in zip(self.buckets, histogram.cumulative()):
+                        lines.append('{0}_bucket{{{1},le="{2}"}} {3}'.format(metric, labels, bound, count))
+                    lines.append('{0}_bucket{{{1},le="+Inf"}} {2}'.format(metric, labels, histogram.count))
+                    lines.append('{0}_sum{{{1}}} {2}'.format(metric, labels, histogram.sum))
+                    lines.append('{0}_count{{{1}}} {2}'.format(metric, labels, histogram.count))
+        return('\n'.join(lines) + '\n')
+
+    def reset(self):
+        """Removes every recorded metric.
+
+        :returns: None
+
+        """
+        with self._lock:
+            self._endpoints.clear()
+
+
+def _escape(value):
+    return(value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+
+
+def _labels(key):
+    method, host, endpoint = key
+    return('method="{0}",host="{1}",endpoint="{2}"'.format(_escape(method), _escape(host), _escape(endpoint)))
+
+
+# The registry requests are recorded in.
+REGISTRY = MetricsRegistry()
+
+
+def compile_templates(templates):
+    """Builds one regular expression that matches host + path against every template, trying the templates with
+    the most fixed text first so that /orders/{id}/cancel/ wins over a looser match.
+
+    :param templates: A list of (host, path template) tuples.
+    :type templates: list
+    :returns: A tuple of the compiled pattern and the list of templates indexed by group number.
+
+    """
+    ordered = sorted(templates, key=lambda item: -len(re.sub(r'\{[^}]*\}', '', item[1])))
+    groups = []
+    for i, (host, template) in enumerate(ordered):
+        pattern = re.sub(r'\\\{[^}]*\\\}', '[^/]+', re.escape(host + template))
+        groups.append('(?P<t{0}>{1})'.format(i, pattern))
+    return(re.compile('|'.join(groups)), ordered)
+
+
+def endpoint_for(url):
+    """Returns the host and endpoint template of a url. Urls that don't match one of TEMPLATES are grouped by \
+    replacing each path segment that looks like an id or ticker with {id}.
+
+    :param url: The url of a request.
+    :type url: str
+    :returns: A tuple of the host and the path template, such as ('api.robinhood.com', '/marketdata/options/{id}/').
+
+    """
+    global _templates
+    if _templates is None:
+        with _templates_lock:
+            if _templates is None:
+                _templates = compile_templates(TEMPLATES)
+    parsed = urlparse(url)
+    pattern, ordered = _templates
+    match = pattern.fullmatch(parsed.netloc + parsed.path)
+    if match:
+        return(ordered[int(match.lastgroup[1:])])
+    segments = ['{id}' if _ID_SEGMENT.fullmatch(segment) else segment for segment in parsed.path.split('/')]
+    return((parsed.netloc, '/'.join(segments)))
+
+
+def set_metrics(enabled=None, buckets=None, samples=None):
+    """Turns on or off the recording of request metrics.
+
+    :param enabled: Whether requests are recorded.
+    :type enabled: Optional[bool]
+    :param buckets: The upper bounds in seconds of the histogram buckets. Starts a new registry.
+    :type buckets: Optional[tuple]
+    :param samples: The number of recent times kept for each endpoint. Starts a new registry.
+    :type samples: Optional[int]
+    :returns: None
+
+    """
+    global METRICS_ENABLED, REGISTRY
+    if enabled is not None:
+        METRICS_ENABLED = bool(enabled)
+    if buckets is not None or samples is not None:
+        REGISTRY = MetricsRegistry(buckets or REGISTRY.buckets, samples or REGISTRY.samples)
+
+
+def get_metrics():
+    """Returns the metrics of every endpoint that has been requested since metrics were turned on.
+
+    :returns: A list of dictionaries with the keys method, host, endpoint, requests, errors, response_bytes, \
+    pages, paginations, response_cache_hits, not_modified, coalesced, and the count, sum, p50 and p99 of \
+    request_seconds and decode_seconds.
+
+    """
+    return(REGISTRY.snapshot())
+
+
+def get_prometheus_metrics(prefix='robin_stocks'):
+    """Returns the metrics in the Prometheus text format, ready to be served from a /metrics page.
+
+    :param prefix: The start of every metric name.
+    :type prefix: Optional[str]
+    :returns: A string.
+
+    """
+    return(REGISTRY.to_prometheus(prefix))
+
+
+def reset_metrics():
+    """Removes every recorded metric.
+
+    :returns: None
+
+    """
+    REGISTRY.reset()
+
+
+def add_request_hook(pre=None, post=None):
+    """Adds functions that are called around every request, even when metrics are off. Both are called with \
+    the same event dictionary, which has the keys method, url, host and endpoint. Before post is called the keys \
+    status, seconds, bytes and error are added. Use post to pass requests on to another metrics library.
+
+    :param pre: Called just before the request is sent.
+    :type pre: Optional[function]
+    :param post: Called after the response is read or the request fails.
+    :type post: Optional[function]
+    :returns: None
+
+    """
+    if pre is not None:
+        PRE_REQUEST_HOOKS.append(pre)
+    if post is not None:
+        POST_REQUEST_HOOKS.append(post)
+
+
+def remove_request_hook(hook):
+    """Removes a function added with add_request_hook.
+
+    :param hook: The pre or post function to remove.
+    :type hook: function
+    :returns: None
+
+    """
+    for hooks in (PRE_REQUEST_HOOKS, POST_REQUEST_HOOKS):
+        while hook in hooks:
+            hooks.remove(hook)
+
+
+def count(method, url, name, amount=1):
+    """Adds amount to a counter of the endpoint of a url when metrics are on."""
+    if METRICS_ENABLED:
+        REGISTRY.count(method, url, name, amount)
+
+
+def send_request(session, method, url, **kwargs):
+    """Sends a request with session.get, session.post or session.delete, timing it and calling the request hooks.
+
+    :param session: The session to send the request with.
+    :type session: requests.Session
+    :param method: The http method, one of 'GET', 'POST' or 'DELETE'.
+    :type method: str
+    :param url: The url to request.
+    :type url: str
+    :returns: The response. Exceptions raised by the session are raised again after the post hooks are called.
+
+    """
+    send = getattr(session, method.lower())
+    if not (METRICS_ENABLED or PRE_REQUEST_HOOKS or POST_REQUEST_HOOKS):
+        return(send(url, **kwargs))
+    host, endpoint = endpoint_for(url)
+    event = {'method': method, 'url': url, 'host': host, 'endpoint': endpoint}
+    for hook in PRE_REQUEST_HOOKS:
+        hook(event)
+    start = time.perf_counter()
+    try:
+        res = send(url, **kwargs)
+        event.update(status=res.status_code, bytes=len(res.content or b''), error=None)
+        return(res)
+    except Exception as error:
+        event.update(status=None, bytes=0, error=error)
+        raise
+    finally:
+        event['seconds'] = time.perf_counter() - start
+        if METRICS_ENABLED:
+            REGISTRY.record(event)
+        for hook in POST_REQUEST_HOOKS:
+            hook(event)
@@ -1,6 +1,238 @@
 """Contains functions for getting information about options."""
+import logging
+import time
+from bisect import bisect_left, bisect_right
+
 import robin_stocks.helper as helper
 import robin_stocks.urls as urls
+from robin_stocks.cache import MISSING, TTLCache
+from robin_stocks.exceptions import InvalidArgumentError, InvalidTickerError
+from robin_stocks.globals import (OPTION_CHAIN_SNAPSHOT_TTL,
+                                  OPTION_MARKET_DATA_BATCH_SIZE)
+
+logger = logging.getLogger(__name__)
+
+# Option chain snapshots of calls and puts keyed by symbol. How long each one is reused is checked against its age.
+CHAIN_SNAPSHOTS = TTLCache(maxsize=256, ttl=24 * 60 * 60)
+
+
+class OptionChainSnapshot:
+    """The tradable options of a stock at one point in time, indexed so that lookups do not make requests.
+    Options can be looked up by id or by expiration date, strike, and type, and ranges of strikes or
+    expiration dates are found by binary search.
+
+    :param symbol: The ticker of the stock.
+    :type symbol: str
+    :param options: The option instruments, as returned by find_tradable_options_for_stock.
+    :type options: list
+    :param optionType: The option type that was requested, either 'call', 'put', or 'both'.
+    :type optionType: Optional[str]
+
+    """
+
+    def __init__(self, symbol, options, optionType='both'):
+        self.symbol = symbol
+        self.option_type = optionType
+        self.created_at = time.monotonic()
+        self.options = [item for item in options if item]
+        self.by_id = {}
+        self.by_key = {}
+        for item in self.options:
+            self.by_id[item['id']] = item
+            key = (item['expiration_date'], float(item['strike_price']), item['type'])
+            self.by_key[key] = item
+        # Sorted once so that range queries can use bisect.
+        self._by_strike = sorted(self.options, key=lambda item: float(item['strike_price']))
+        self._strikes = [float(item['strike_price']) for item in self._by_strike]
+        self._by_expiration = sorted(self.options, key=lambda item: item['expiration_date'])
+        self._expirations = [item['expiration_date'] for item in self._by_expiration]
+        # The calls or puts of the chain, built by of_type the first time they are asked for.
+        self._types = {}
+
+    @classmethod
+    def load(cls, symbol, optionType='both'):
+        """Requests every tradable option for a stock and builds a snapshot from them.
+
+        :param symbol: The ticker of the stock.
+        :type symbol: str
+        :param optionType: Can be either 'call' or 'put' or left blank to get both.
+        :type optionType: Optional[str]
+        :returns: An OptionChainSnapshot, or None if the options could not be loaded.
+
+        """
+        symbol = symbol.upper().strip()
+        optionType = optionType.lower().strip()
+        url = urls.option_instruments()
+        payload = tradable_options_payload(symbol, optionType)
+        data = helper.request_get(url, 'pagination', payload)
+        if data == [None]:
+            return(None)
+        return(cls(symbol, data, optionType))
+
+    def age(self):
+        """Returns the number of seconds since the snapshot was built.
+
+        :returns: A float.
+
+        """
+        return(time.monotonic() - self.created_at)
+
+    def of_type(self, optionType):
+        """Returns only the calls or only the puts of the snapshot, as a snapshot of their own. It is built from \
+        the options already loaded, once for each type, and has the same age as this snapshot.
+
+        :param optionType: Either 'call' or 'put'. Anything else returns this snapshot.
+        :type optionType: str
+        :returns: An OptionChainSnapshot.
+
+        """
+        if optionType not in ('call', 'put') or optionType == self.option_type:
+            return(self)
+        snapshot = self._types.get(optionType)
+        if snapshot is None:
+            snapshot = OptionChainSnapshot(self.symbol, [item for item in self.options if item['type'] == optionType],
+                                           optionType)
+            snapshot.created_at = self.created_at
+            self._types[optionType] = snapshot
+        return(snapshot)
+
+    def expiration_dates(self):
+        """Returns every expiration date in the chain.
+
+        :returns: A sorted list of dates in the format YYYY-MM-DD.
+
+        """
+        return(sorted(set(self._expirations)))
+
+    def get(self, expirationDate, strike, optionType):
+        """Returns a single option.
+
+        :param expirationDate: Represents the expiration date in the format YYYY-MM-DD.
+        :type expirationDate: str
+        :param strike: Represents the price of the option.
+        :type strike: str or float
+        :param optionType: Either 'call' or 'put'.
+        :type optionType: str
+        :returns: The option instrument dictionary, or None if it is not in the chain.
+
+        """
+        return(self.by_key.get((expirationDate, float(strike), optionType)))
+
+    def get_by_id(self, id):
+        """Returns the option with the given id, or None if it is not in the chain.
+
+        :param id: The option id.
+        :type id: str
+        :returns: The option instrument dictionary.
+
+        """
+        return(self.by_id.get(id))
+
+    def find(self, expirationDate=None, strike=None, optionType=None):
+        """Returns the options that match every parameter that is given.
+
+        :param expirationDate: Represents the expiration date in the format YYYY-MM-DD.
+        :type expirationDate: Optional[str]
+        :param strike: Represents the price of the option.
+        :type strike: Optional[str or float]
+        :param optionType: Either 'call' or 'put'. Anything else matches both.
+        :type optionType: Optional[str]
+        :returns: A list of option instrument dictionaries.
+
+        """
+        if strike is not None:
+            options = self.between_strikes(strike, strike)
+        elif expirationDate is not None:
+            options = self.between_expirations(expirationDate, expirationDate)
+        else:
+            options = self.options
+        return([item for item in options
+                if (expirationDate is None or item['expiration_date'] == expirationDate)
+                and (optionType not in ('call', 'put') or item['type'] == optionType)])
+
+    def between_strikes(self, low, high, expirationDate=None, optionType=None):
+        """Returns the options with a strike price from low to high, inclusive, ordered by strike.
+
+        :param low: The lowest strike price.
+        :type low: str or float
+        :param high: The highest strike price.
+        :type high: str or float
+        :param expirationDate: Only include options that expire on this date.
+        :type expirationDate: Optional[str]
+        :param optionType: Either 'call' or 'put'. Anything else matches both.
+        :type optionType: Optional[str]
+        :returns: A list of option instrument dictionaries.
+
+        """
+        start = bisect_left(self._strikes, float(low))
+        end = bisect_right(self._strikes, float(high))
+        return([item for item in self._by_strike[start:end]
+                if (expirationDate is None or item['expiration_date'] == expirationDate)
+                and (optionType not in ('call', 'put') or item['type'] == optionType)])
+
+    def between_expirations(self, start, end, optionType=None):
+        """Returns the options that expire from start to end, inclusive, ordered by expiration date.
+
+        :param start: The earliest expiration date in the format YYYY-MM-DD.
+        :type start: str
+        :param end: The latest expiration date in the format YYYY-MM-DD.
+        :type end: str
+        :param optionType: Either 'call' or 'put'. Anything else matches both.
+        :type optionType: Optional[str]
+        :returns: A list of option instrument dictionaries.
+
+        """
+        first = bisect_left(self._expirations, start)
+        last = bisect_right(self._expirations, end)
+        return([item for item in self._by_expiration[first:last]
+                if optionType not in ('call', 'put') or item['type'] == optionType])
+
+    def __len__(self):
+        return(len(self.options))
+
+
+def get_option_chain_snapshot(symbol, optionType='both', ttl=None):
+    """Returns a snapshot of the tradable options for a stock. The snapshot is reused until it is older than ttl, \
+    so repeated lookups inside a trading loop do not make requests. Calls and puts are loaded together, and a \
+    snapshot of only one type is filtered from them.
+
+    :param symbol: The ticker of the stock.
+    :type symbol: str
+    :param optionType: Can be either 'call' or 'put' or left blank to get both.
+    :type optionType: Optional[str]
+    :param ttl: The most seconds an existing snapshot can be reused. Defaults to globals.OPTION_CHAIN_SNAPSHOT_TTL. \
+    Use 0 to always load a new snapshot.
+    :type ttl: Optional[float]
+    :returns: An OptionChainSnapshot, or None if the options could not be loaded.
+
+    """
+    try:
+        symbol = symbol.upper().strip()
+        optionType = optionType.lower().strip()
+    except AttributeError as message:
+        helper.report_error(InvalidArgumentError(str(message)), message, logger)
+        return None
+    if optionType not in ('call', 'put'):
+        optionType = 'both'
+
+    if ttl is None:
+        ttl = OPTION_CHAIN_SNAPSHOT_TTL
+    snapshot = CHAIN_SNAPSHOTS.get(symbol)
+    if snapshot is MISSING or snapshot.age() > ttl:
+        snapshot = OptionChainSnapshot.load(symbol)
+        if snapshot is None:
+            return(None)
+        CHAIN_SNAPSHOTS.set(symbol, snapshot)
+    return(snapshot.of_type(optionType))
+
+
+def clear_option_chain_snapshots():
+    """Removes every cached option chain snapshot.
+
+    :returns: None
+
+    """
+    CHAIN_SNAPSHOTS.clear()
 
 
 @helper.login_required
@@ -80,7 +312,7 @@ def get_chains(symbol, info=None):
     try:
         symbol = symbol.upper().strip()
     except AttributeError as message:
-        print(message)
+        helper.report_error(InvalidArgumentError(str(message), 'symbol', symbol), message, logger)
         return None
 
     url = urls.chains(symbol)
@@ -106,29 +338,65 @@ def find_tradable_options_for_stock(symbol, optionType='both', info=None):
         symbol = symbol.upper().strip()
         optionType = optionType.lower().strip()
     except AttributeError as message:
-        print(message)
+        helper.report_error(InvalidArgumentError(str(message)), message, logger)
         return [None]
 
     url = urls.option_instruments()
-    if not helper.id_for_chain(symbol):
-        print("Symbol {} is not valid for finding options.".format(symbol))
-
-    if (optionType == 'call' or optionType == 'put'):
-        payload = {'chain_id': helper.id_for_chain(symbol),
-                   'chain_symbol': symbol,
-                   'state': 'active',
-                   'tradability': 'tradable',
-                   'type': optionType}
-    else:
-        payload = {'chain_id': helper.id_for_chain(symbol),
-                   'chain_symbol': symbol,
-                   'state': 'active',
-                   'tradability': 'tradable'}
-
+    payload = tradable_options_payload(symbol, optionType)
     data = helper.request_get(url, 'pagination', payload)
     return(helper.filter(data, info))
 
 
+def iter_tradable_options_for_stock(symbol, optionType='both', info=None):
+    """Same as find_tradable_options_for_stock, but yields the options one at a time as each page is loaded.
+    No more pages are loaded once you stop iterating.
+
+    :param symbol: The ticker of the stock.
+    :type symbol: str
+    :param optionType: Can be either 'call' or 'put' or left blank to get both.
+    :type optionType: Optional[str]
+    :param info: Will filter the results to get a specific value.
+    :type info: Optional[str]
+    :returns: Returns a generator of dictionaries of key/value pairs for the options of the stock. If info parameter is \
+    provided, a generator of strings is returned where the strings are the value of the key that matches info.
+
+    """
+    try:
+        symbol = symbol.upper().strip()
+        optionType = optionType.lower().strip()
+    except AttributeError as message:
+        helper.report_error(InvalidArgumentError(str(message)), message, logger)
+        return iter([])
+
+    url = urls.option_instruments()
+    payload = tradable_options_payload(symbol, optionType)
+    data = helper.request_get(url, 'pagination', payload, stream=True)
+    return(helper.filter_iter(data, info))
+
+
+def tradable_options_payload(symbol, optionType):
+    """Builds the payload for requesting the active, tradable option instruments of a stock.
+
+    :param symbol: The ticker of the stock. Should already be upper case.
+    :type symbol: str
+    :param optionType: Can be either 'call' or 'put' or anything else to get both.
+    :type optionType: str
+    :returns: A dictionary of parameters for the option instruments url.
+
+    """
+    chain_id = helper.id_for_chain(symbol)
+    if not chain_id:
+        helper.report_error(InvalidTickerError(symbol), log=logger)
+
+    payload = {'chain_id': chain_id,
+               'chain_symbol': symbol,
+               'state': 'active',
+               'tradability': 'tradable'}
+    if (optionType == 'call' or optionType == 'put'):
+        payload['type'] = optionType
+    return(payload)
+
+
 def find_options_for_stock_by_expiration(symbol, expirationDate, optionType='both', info=None):
     """Returns a list of all the option orders that match the seach parameters
 
@@ -140,24 +408,29 @@ def find_options_for_stock_by_expiration(symbol, expirationDate, optionType='bot
     :type optionType: Optional[str]
     :param info: Will filter the results to get a specific value.
     :type info: Optional[str]
-    :returns: Returns a list of dictionaries of key/value pairs for all options of the stock that match the search parameters. \
-    If info parameter is provided, a list of strings is returned where the strings are the value of the key that matches info.
+    :returns: Returns a list of dictionaries of key/value pairs for all options of the stock that match the search \
+    parameters. If info parameter is provided, a list of strings is returned where the strings are the value of the key \
+    that matches info.
 
     """
     try:
         symbol = symbol.upper().strip()
         optionType = optionType.lower().strip()
     except AttributeError as message:
-        print(message)
+        helper.report_error(InvalidArgumentError(str(message)), message, logger)
         return [None]
 
-    allOptions = find_tradable_options_for_stock(symbol, optionType)
-    filteredOptions = [item for item in allOptions if item.get("expiration_date") == expirationDate
-                       and item.get('tradability') == 'tradable']
+    snapshot = get_option_chain_snapshot(symbol, optionType)
+    if snapshot is None:
+        return [None]
+    # Copy the options since the market data is merged into them.
+    filteredOptions = [dict(item) for item in snapshot.find(expirationDate=expirationDate)
+                       if item.get('tradability') == 'tradable']
 
-    for item in filteredOptions:
-        marketData = get_option_market_data_by_id(item['id'])
-        item.update(marketData)
+    marketData = get_option_market_data_by_ids([item['id'] for item in filteredOptions])
+    for item, itemData in zip(filteredOptions, marketData):
+        if itemData:
+            item.update(itemData)
 
     return(helper.filter(filteredOptions, info))
 
@@ -173,24 +446,29 @@ def find_options_for_stock_by_strike(symbol, strike, optionType='both', info=Non
     :type optionType: Optional[str]
     :param info: Will filter the results to get a specific value.
     :type info: Optional[str]
-    :returns: Returns a list of dictionaries of key/value pairs for all options of the stock that match the search parameters. \
-    If info parameter is provided, a list of strings is returned where the strings are the value of the key that matches info.
+    :returns: Returns a list of dictionaries of key/value pairs for all options of the stock that match the search \
+    parameters. If info parameter is provided, a list of strings is returned where the strings are the value of the key \
+    that matches info.
 
     """
     try:
         symbol = symbol.upper().strip()
         optionType = optionType.lower().strip()
     except AttributeError as message:
-        print(message)
+        helper.report_error(InvalidArgumentError(str(message)), message, logger)
         return [None]
 
-    allOptions = find_tradable_options_for_stock(symbol, optionType)
-    filteredOptions = [item for item in allOptions if float(item.get("strike_price")) == float(strike)
-                       and item.get('tradability') == 'tradable']
+    snapshot = get_option_chain_snapshot(symbol, optionType)
+    if snapshot is None:
+        return [None]
+    # Copy the options since the market data is merged into them.
+    filteredOptions = [dict(item) for item in snapshot.find(strike=strike)
+                       if item.get('tradability') == 'tradable']
 
-    for item in filteredOptions:
-        marketData = get_option_market_data_by_id(item['id'])
-        item.update(marketData)
+    marketData = get_option_market_data_by_ids([item['id'] for item in filteredOptions])
+    for item, itemData in zip(filteredOptions, marketData):
+        if itemData:
+            item.update(itemData)
 
     return(helper.filter(filteredOptions, info))
 
@@ -208,15 +486,16 @@ def find_options_for_stock_by_expiration_and_strike(symbol, expirationDate, stri
     :type optionType: Optional[str]
     :param info: Will filter the results to get a specific value.
     :type info: Optional[str]
-    :returns: Returns a list of dictionaries of key/value pairs for all options of the stock that match the search parameters. \
-    If info parameter is provided, a list of strings is returned where the strings are the value of the key that matches info.
+    :returns: Returns a list of dictionaries of key/value pairs for all options of the stock that match the search \
+    parameters. If info parameter is provided, a list of strings is returned where the strings are the value of the key \
+    that matches info.
 
     """
     try:
         symbol = symbol.upper().strip()
         option_type = optionType.lower().strip()
     except AttributeError as message:
-        print(message)
+        helper.report_error(InvalidArgumentError(str(message)), message, logger)
         return [None]
 
     url = urls.option_instruments()
@@ -232,9 +511,10 @@ def find_options_for_stock_by_expiration_and_strike(symbol, expirationDate, stri
     data = helper.request_get(url, 'pagination', payload)
     data = [item for item in data if item['expiration_date'] ==
             expirationDate and item['tradability'] == 'tradable']
-    for item in data:
-        market_data = get_option_market_data_by_id(item['id'])
-        item.update(market_data)
+    market_data = get_option_market_data_by_ids([item['id'] for item in data])
+    for item, item_data in zip(data, market_data):
+        if item_data:
+            item.update(item_data)
 
     return helper.filter(data, info)
 
@@ -250,15 +530,16 @@ def find_options_for_list_of_stocks_by_expiration_date(inputSymbols, expirationD
     :type optionType: Optional[str]
     :param info: Will filter the results to get a specific value.
     :type info: Optional[str]
-    :returns: Returns a list of dictionaries of key/value pairs for all options of the stock that match the search parameters. \
-    If info parameter is provided, a list of strings is returned where the strings are the value of the key that matches info.
+    :returns: Returns a list of dictionaries of key/value pairs for all options of the stock that match the search \
+    parameters. If info parameter is provided, a list of strings is returned where the strings are the value of the key \
+    that matches info.
 
     """
     symbols = helper.inputs_to_set(inputSymbols)
     try:
         optionType = optionType.lower().strip()
     except AttributeError as message:
-        print(message)
+        helper.report_error(InvalidArgumentError(str(message), 'optionType', optionType), message, logger)
         return [None]
 
     data = []
@@ -282,9 +563,10 @@ def find_options_for_list_of_stocks_by_expiration_date(inputSymbols, expirationD
             if (item['expiration_date'] == expirationDate and item['tradability'] == 'tradable'):
                 data.append(item)
 
-    for item in data:
-        marketData = get_option_market_data_by_id(item['id'])
-        item.update(marketData)
+    marketData = get_option_market_data_by_ids([item['id'] for item in data])
+    for item, itemData in zip(data, marketData):
+        if itemData:
+            item.update(itemData)
 
     return(helper.filter(data, info))
 
@@ -304,7 +586,6 @@ def get_list_market_data(inputSymbols, expirationDate, info=None):
     """
     symbols = helper.inputs_to_set(inputSymbols)
     ids = []
-    data = []
     url = urls.option_instruments()
     for symbol in symbols:
         payload = {'chain_id': helper.id_for_chain(symbol),
@@ -317,15 +598,13 @@ def get_list_market_data(inputSymbols, expirationDate, info=None):
             if (item['expiration_date'] == expirationDate and item['tradability'] == 'tradable'):
                 ids.append(item['id'])
 
-    for id in ids:
-        url = urls.marketdata_options(id)
-        otherData = helper.request_get(url)
-        data.append(otherData)
+    data = get_option_market_data_by_ids(ids)
 
     return(helper.filter(data, info))
 
 
-def get_list_options_of_specific_profitability(inputSymbols, expirationDate, typeProfit="chance_of_profit_short", profitFloor=0.0, profitCeiling=1.0, info=None):
+def get_list_options_of_specific_profitability(inputSymbols, expirationDate, typeProfit="chance_of_profit_short",
+                                               profitFloor=0.0, profitCeiling=1.0, info=None):
     """Returns a list of option market data for several stock tickers that match a range of profitability.
 
     :param inputSymbols: May be a single stock ticker or a list of stock tickers.
@@ -346,12 +625,11 @@ def get_list_options_of_specific_profitability(inputSymbols, expirationDate, typ
     """
     symbols = helper.inputs_to_set(inputSymbols)
     ids = []
-    data = []
     returnData = []
     url = urls.option_instruments()
 
     if (typeProfit != "chance_of_profit_short" and typeProfit != "chance_of_profit_long"):
-        print("Invalid string for 'typeProfit'. Defaulting to 'chance_of_profit_short'.")
+        logger.warning("Invalid string for 'typeProfit'. Defaulting to 'chance_of_profit_short'.")
         typeProfit = "chance_of_profit_short"
 
     for symbol in symbols:
@@ -365,10 +643,7 @@ def get_list_options_of_specific_profitability(inputSymbols, expirationDate, typ
             if (item['tradability'] == 'tradable'):
                 ids.append(item['id'])
 
-    for id in ids:
-        url = urls.marketdata_options(id)
-        otherData = helper.request_get(url)
-        data.append(otherData)
+    data = get_option_market_data_by_ids(ids)
 
     for item in data:
         try:
@@ -399,6 +674,42 @@ def get_option_market_data_by_id(id, info=None):
     return(helper.filter(data, info))
 
 
+def get_option_market_data_by_ids(ids, info=None):
+    """Returns the option market data for many options at once. The options are requested in batches \
+    instead of one request per option. If a batch can't be loaded, its options are requested one at a time \
+    using several requests at once.
+
+    :param ids: A list of option ids.
+    :type ids: list
+    :param info: Will filter the results to get a specific value.
+    :type info: Optional[str]
+    :returns: Returns a list of dictionaries of key/value pairs, one for each id and in the same order. \
+    The entry is None if there is no market data for that id. If info parameter is provided, \
+    a list of strings is returned where the strings are the value of the key that matches info.
+
+    """
+    ids = list(ids)
+    data = []
+    url = urls.marketdata_options()
+    for chunk in helper.chunked(ids, OPTION_MARKET_DATA_BATCH_SIZE):
+        payload = {'instruments': ','.join(urls.option_instruments(id) for id in chunk)}
+        results = helper.request_get(url, 'results', payload)
+        # Match the results to the ids by their instrument url, since entries can be None.
+        byID = {}
+        for item in results:
+            if item and item.get('instrument'):
+                byID[item['instrument'].rstrip('/').split('/')[-1]] = item
+        # Anything the batch request did not return is requested one at a time.
+        missing = [id for id in chunk if id not in byID]
+        for id, item in zip(missing, helper.map_concurrently(get_option_market_data_by_id, missing)):
+            byID[id] = item
+        data.extend(byID[id] for id in chunk)
+
+    if info is None:
+        return(data)
+    return([helper.filter(item, info) for item in data])
+
+
 def get_option_market_data(symbol, expirationDate, strike, optionType, info=None):
     """Returns the option market data for the stock option, including the greeks,
     open interest, change of profit, and adjusted mark price.
@@ -421,7 +732,7 @@ def get_option_market_data(symbol, expirationDate, strike, optionType, info=None
         symbol = symbol.upper().strip()
         optionType = optionType.lower().strip()
     except AttributeError as message:
-        print(message)
+        helper.report_error(InvalidArgumentError(str(message)), message, logger)
         return [None]
 
     optionID = helper.id_for_option(symbol, expirationDate, strike, optionType)
@@ -468,7 +779,7 @@ def get_option_instrument_data(symbol, expirationDate, strike, optionType, info=
         symbol = symbol.upper().strip()
         optionType = optionType.lower().strip()
     except AttributeError as message:
-        print(message)
+        helper.report_error(InvalidArgumentError(str(message)), message, logger)
         return [None]
 
     optionID = helper.id_for_option(symbol, expirationDate, strike, optionType)
@@ -499,12 +810,13 @@ def get_option_historicals(symbol, expirationDate, strike, optionType, span='wee
         symbol = symbol.upper().strip()
         optionType = optionType.lower().strip()
     except AttributeError as message:
-        print(message)
+        helper.report_error(InvalidArgumentError(str(message)), message, logger)
         return [None]
 
     span_check = ['day', 'week', 'year', '5year']
     if span not in span_check:
-        print('ERROR: Span must be "day", "week", "year", or "5year"')
+        helper.report_error(InvalidArgumentError('Span must be "day", "week", "year", or "5year"',
+                                                 'span', span), log=logger)
         return([None])
 
     if span == 'day':
@@ -1,4 +1,6 @@
 """Contains all functions for placing orders for stocks, options, and crypto."""
+import logging
+from collections import Counter
 from uuid import uuid4
 
 import robin_stocks.crypto as crypto
@@ -6,6 +8,9 @@ import robin_stocks.helper as helper
 import robin_stocks.profiles as profiles
 import robin_stocks.stocks as stocks
 import robin_stocks.urls as urls
+from robin_stocks.exceptions import InvalidArgumentError
+
+logger = logging.getLogger(__name__)
 
 
 @helper.login_required
@@ -53,6 +58,54 @@ def get_all_crypto_orders(info=None):
     return(helper.filter(data, info))
 
 
+@helper.login_required
+def iter_all_stock_orders(info=None):
+    """Same as get_all_stock_orders, but yields the orders one at a time as each page is loaded.
+    No more pages are loaded once you stop iterating.
+
+    :param info: Will filter the results to get a specific value.
+    :type info: Optional[str]
+    :returns: Returns a generator of dictionaries of key/value pairs for each order. If info parameter is provided, \
+    a generator of strings is returned where the strings are the value of the key that matches info.
+
+    """
+    url = urls.orders()
+    data = helper.request_get(url, 'pagination', stream=True)
+    return(helper.filter_iter(data, info))
+
+
+@helper.login_required
+def iter_all_option_orders(info=None):
+    """Same as get_all_option_orders, but yields the option orders one at a time as each page is loaded.
+    No more pages are loaded once you stop iterating.
+
+    :param info: Will filter the results to get a specific value.
+    :type info: Optional[str]
+    :returns: Returns a generator of dictionaries of key/value pairs for each option order. If info parameter is provided, \
+    a generator of strings is returned where the strings are the value of the key that matches info.
+
+    """
+    url = urls.option_orders()
+    data = helper.request_get(url, 'pagination', stream=True)
+    return(helper.filter_iter(data, info))
+
+
+@helper.login_required
+def iter_all_crypto_orders(info=None):
+    """Same as get_all_crypto_orders, but yields the crypto orders one at a time as each page is loaded.
+    No more pages are loaded once you stop iterating.
+
+    :param info: Will filter the results to get a specific value.
+    :type info: Optional[str]
+    :returns: Returns a generator of dictionaries of key/value pairs for each crypto order. If info parameter is provided, \
+    a generator of strings is returned where the strings are the value of the key that matches info.
+
+    """
+    url = urls.crypto_orders()
+    data = helper.request_get(url, 'pagination', stream=True)
+    return(helper.filter_iter(data, info))
+
+
 @helper.login_required
 def get_all_open_stock_orders(info=None):
     """Returns a list of all the orders that are currently open.
@@ -111,7 +164,8 @@ def get_all_open_crypto_orders(info=None):
 def get_stock_order_info(orderID):
     """Returns the information for a single order.
 
-    :param orderID: The ID associated with the order. Can be found using get_all_orders(info=None) or get_all_orders(info=None).
+    :param orderID: The ID associated with the order. Can be found using get_all_orders(info=None) or \
+    get_all_orders(info=None).
     :type orderID: str
     :returns: Returns a list of dictionaries of key/value pairs for the order.
 
@@ -180,7 +234,8 @@ def find_stock_orders(**arguments):
     for item in data:
         for i, (key, value) in enumerate(arguments.items()):
             if key not in item:
-                print(helper.error_argument_not_key_in_dictionary(key))
+                helper.report_error(InvalidArgumentError(helper.error_argument_not_key_in_dictionary(key),
+                                                         key), log=logger)
                 return([None])
             if value != item[key]:
                 break
@@ -203,7 +258,7 @@ def cancel_stock_order(orderID):
     data = helper.request_post(url)
 
     if data:
-        print('Order '+orderID+' cancelled')
+        logger.info('Order %s cancelled', orderID)
     return(data)
 
 
@@ -220,7 +275,7 @@ def cancel_option_order(orderID):
     data = helper.request_post(url)
 
     if data:
-        print('Order '+orderID+' cancelled')
+        logger.info('Order %s cancelled', orderID)
     return(data)
 
 
@@ -237,7 +292,7 @@ def cancel_crypto_order(orderID):
     data = helper.request_post(url)
 
     if data:
-        print('Order '+orderID+' cancelled')
+        logger.info('Order %s cancelled', orderID)
     return(data)
 
 
@@ -256,7 +311,7 @@ def cancel_all_stock_orders():
     for item in data:
         helper.request_post(item['cancel'])
 
-    print('All Stock Orders Cancelled')
+    logger.info('All stock orders cancelled')
     return(data)
 
 
@@ -275,7 +330,7 @@ def cancel_all_option_orders():
     for item in data:
         helper.request_post(item['cancel_url'])
 
-    print('All Option Orders Cancelled')
+    logger.info('All option orders cancelled')
     return(data)
 
 
@@ -294,7 +349,7 @@ def cancel_all_crypto_orders():
     for item in data:
         helper.request_post(item['cancel_url'])
 
-    print('All Crypto Orders Cancelled')
+    logger.info('All crypto orders cancelled')
     return(data)
 
 
@@ -319,7 +374,7 @@ def order_buy_market(symbol, quantity, timeInForce='gtc', extendedHours=False):
     try:
         symbol = symbol.upper().strip()
     except AttributeError as message:
-        print(message)
+        helper.report_error(InvalidArgumentError(str(message), 'symbol', symbol), message, logger)
         return None
 
     payload = {
@@ -368,7 +423,7 @@ def order_buy_fractional_by_quantity(symbol, quantity, timeInForce='gfd', extend
     try:
         symbol = symbol.upper().strip()
     except AttributeError as message:
-        print(message)
+        helper.report_error(InvalidArgumentError(str(message), 'symbol', symbol), message, logger)
         return None
 
     stock_price = stocks.get_latest_price(symbol, extendedHours)[0]
@@ -395,7 +450,8 @@ def order_buy_fractional_by_quantity(symbol, quantity, timeInForce='gfd', extend
 
 @helper.login_required
 def order_buy_fractional_by_price(symbol, amountInDollars, timeInForce='gfd', extendedHours=False):
-    """Submits a market order to be executed immediately for fractional shares by specifying the amount in dollars that you want to trade.
+    """Submits a market order to be executed immediately for fractional shares by specifying the amount in dollars that \
+    you want to trade.
     Good for share fractions up to 6 decimal places.
 
     :param symbol: The stock ticker of the stock to purchase.
@@ -418,11 +474,12 @@ def order_buy_fractional_by_price(symbol, amountInDollars, timeInForce='gfd', ex
     try:
         symbol = symbol.upper().strip()
     except AttributeError as message:
-        print(message)
+        helper.report_error(InvalidArgumentError(str(message), 'symbol', symbol), message, logger)
         return None
 
     if amountInDollars < 1:
-        print("ERROR: Fractional share price should meet minimum 1.00.")
+        helper.report_error(InvalidArgumentError('Fractional share price should meet minimum 1.00.',
+                                                 'amountInDollars', amountInDollars), log=logger)
         return None
 
     stock_price = stocks.get_latest_price(symbol, extendedHours)[0]
@@ -478,7 +535,7 @@ def order_buy_limit(symbol, quantity, limitPrice, timeInForce='gtc', extendedHou
         symbol = symbol.upper().strip()
         limitPrice = helper.round_price(limitPrice)
     except AttributeError as message:
-        print(message)
+        helper.report_error(InvalidArgumentError(str(message)), message, logger)
         return None
 
     payload = {
@@ -526,7 +583,7 @@ def order_buy_stop_loss(symbol, quantity, stopPrice, timeInForce='gtc', extended
         symbol = symbol.upper().strip()
         stopPrice = helper.round_price(stopPrice)
     except AttributeError as message:
-        print(message)
+        helper.report_error(InvalidArgumentError(str(message)), message, logger)
         return None
 
     payload = {
@@ -577,7 +634,7 @@ def order_buy_stop_limit(symbol, quantity, limitPrice, stopPrice, timeInForce='g
         stopPrice = helper.round_price(stopPrice)
         limitPrice = helper.round_price(limitPrice)
     except AttributeError as message:
-        print(message)
+        helper.report_error(InvalidArgumentError(str(message)), message, logger)
         return None
 
     payload = {
@@ -685,7 +742,7 @@ def order_sell_market(symbol, quantity, timeInForce='gtc', extendedHours=False):
     try:
         symbol = symbol.upper().strip()
     except AttributeError as message:
-        print(message)
+        helper.report_error(InvalidArgumentError(str(message), 'symbol', symbol), message, logger)
         return None
 
     payload = {
@@ -734,7 +791,7 @@ def order_sell_fractional_by_quantity(symbol, quantity, timeInForce='gfd', exten
     try:
         symbol = symbol.upper().strip()
     except AttributeError as message:
-        print(message)
+        helper.report_error(InvalidArgumentError(str(message), 'symbol', symbol), message, logger)
         return None
 
     stock_price = stocks.get_latest_price(symbol, extendedHours)[0]
@@ -761,7 +818,8 @@ def order_sell_fractional_by_quantity(symbol, quantity, timeInForce='gfd', exten
 
 @helper.login_required
 def order_sell_fractional_by_price(symbol, amountInDollars, timeInForce='gfd', extendedHours=False):
-    """Submits a market order to be executed immediately for fractional shares by specifying the amount in dollars that you want to trade.
+    """Submits a market order to be executed immediately for fractional shares by specifying the amount in dollars that \
+    you want to trade.
     Good for share fractions up to 6 decimal places.
 
     :param symbol: The stock ticker of the stock to purchase.
@@ -784,11 +842,12 @@ def order_sell_fractional_by_price(symbol, amountInDollars, timeInForce='gfd', e
     try:
         symbol = symbol.upper().strip()
     except AttributeError as message:
-        print(message)
+        helper.report_error(InvalidArgumentError(str(message), 'symbol', symbol), message, logger)
         return None
 
     if amountInDollars < 1:
-        print("ERROR: Fractional share price should meet minimum 1.00.")
+        helper.report_error(InvalidArgumentError('Fractional share price should meet minimum 1.00.',
+                                                 'amountInDollars', amountInDollars), log=logger)
         return None
 
     stock_price = stocks.get_latest_price(symbol, extendedHours)[0]
@@ -844,7 +903,7 @@ def order_sell_limit(symbol, quantity, limitPrice, timeInForce='gtc', extendedHo
         symbol = symbol.upper().strip()
         limitPrice = helper.round_price(limitPrice)
     except AttributeError as message:
-        print(message)
+        helper.report_error(InvalidArgumentError(str(message)), message, logger)
         return None
 
     payload = {
@@ -892,7 +951,7 @@ def order_sell_stop_loss(symbol, quantity, stopPrice, timeInForce='gtc', extende
         symbol = symbol.upper().strip()
         stopPrice = helper.round_price(stopPrice)
     except AttributeError as message:
-        print(message)
+        helper.report_error(InvalidArgumentError(str(message)), message, logger)
         return None
 
     payload = {
@@ -942,7 +1001,7 @@ def order_sell_stop_limit(symbol, quantity, limitPrice, stopPrice, timeInForce='
         stopPrice = helper.round_price(stopPrice)
         limitPrice = helper.round_price(limitPrice)
     except AttributeError as message:
-        print(message)
+        helper.report_error(InvalidArgumentError(str(message)), message, logger)
         return None
 
     payload = {
@@ -997,7 +1056,7 @@ def order(symbol, quantity, orderType, trigger, side, limitPrice=None, stopPrice
     try:
         symbol = symbol.upper().strip()
     except AttributeError as message:
-        print(message)
+        helper.report_error(InvalidArgumentError(str(message), 'symbol', symbol), message, logger)
         return None
 
     if stopPrice:
@@ -1108,8 +1167,15 @@ def order_option_spread(direction, price, symbol, quantity, spread, timeInForce=
     try:
         symbol = symbol.upper().strip()
     except AttributeError as message:
-        print(message)
+        helper.report_error(InvalidArgumentError(str(message), 'symbol', symbol), message, logger)
         return None
+    # Legs that are not cached yet are looked up with one request per expiration date, unless only one
+    # leg of that date is missing, in which case the narrower request made by id_for_option is cheaper.
+    missing = Counter(each['expirationDate'] for each in spread if helper.cached_option_id(
+        symbol, each['expirationDate'], each['strike'], each['optionType']) is None)
+    for expirationDate, count in missing.items():
+        if count > 1:
+            helper.load_option_ids(symbol, expirationDate)
     legs = []
     for each in spread:
         optionID = helper.id_for_option(symbol,
@@ -1142,7 +1208,8 @@ def order_option_spread(direction, price, symbol, quantity, spread, timeInForce=
 
 
 @helper.login_required
-def order_buy_option_limit(positionEffect, creditOrDebit, price, symbol, quantity, expirationDate, strike, optionType='both', timeInForce='gfd'):
+def order_buy_option_limit(positionEffect, creditOrDebit, price, symbol, quantity, expirationDate, strike,
+                           optionType='both', timeInForce='gfd'):
     """Submits a limit order for an option. i.e. place a long call or a long put.
 
     :param positionEffect: Either 'open' for a buy to open effect or 'close' for a buy to close effect.
@@ -1172,7 +1239,7 @@ def order_buy_option_limit(positionEffect, creditOrDebit, price, symbol, quantit
     try:
         symbol = symbol.upper().strip()
     except AttributeError as message:
-        print(message)
+        helper.report_error(InvalidArgumentError(str(message), 'symbol', symbol), message, logger)
         return None
 
     optionID = helper.id_for_option(symbol, expirationDate, strike, optionType)
@@ -1201,7 +1268,8 @@ def order_buy_option_limit(positionEffect, creditOrDebit, price, symbol, quantit
 
 
 @helper.login_required
-def order_buy_option_stop_limit(positionEffect, creditOrDebit, limitPrice, stopPrice, symbol, quantity, expirationDate, strike, optionType='both', timeInForce='gfd'):
+def order_buy_option_stop_limit(positionEffect, creditOrDebit, limitPrice, stopPrice, symbol, quantity, expirationDate,
+                                strike, optionType='both', timeInForce='gfd'):
     """Submits a stop order to be turned into a limit order once a certain stop price is reached.
 
     :param positionEffect: Either 'open' for a buy to open effect or 'close' for a buy to close effect.
@@ -1233,7 +1301,7 @@ def order_buy_option_stop_limit(positionEffect, creditOrDebit, limitPrice, stopP
     try:
         symbol = symbol.upper().strip()
     except AttributeError as message:
-        print(message)
+        helper.report_error(InvalidArgumentError(str(message), 'symbol', symbol), message, logger)
         return None
 
     optionID = helper.id_for_option(symbol, expirationDate, strike, optionType)
@@ -1262,7 +1330,8 @@ def order_buy_option_stop_limit(positionEffect, creditOrDebit, limitPrice, stopP
     return(data)
 
 
-def order_sell_option_stop_limit(positionEffect, creditOrDebit, limitPrice, stopPrice, symbol, quantity, expirationDate, strike, optionType='both', timeInForce='gfd'):
+def order_sell_option_stop_limit(positionEffect, creditOrDebit, limitPrice, stopPrice, symbol, quantity, expirationDate,
+                                 strike, optionType='both', timeInForce='gfd'):
     """Submits a stop order to be turned into a limit order once a certain stop price is reached.
 
     :param positionEffect: Either 'open' for a buy to open effect or 'close' for a buy to close effect.
@@ -1294,7 +1363,7 @@ def order_sell_option_stop_limit(positionEffect, creditOrDebit, limitPrice, stop
     try:
         symbol = symbol.upper().strip()
     except AttributeError as message:
-        print(message)
+        helper.report_error(InvalidArgumentError(str(message), 'symbol', symbol), message, logger)
         return None
 
     optionID = helper.id_for_option(symbol, expirationDate, strike, optionType)
@@ -1324,7 +1393,8 @@ def order_sell_option_stop_limit(positionEffect, creditOrDebit, limitPrice, stop
 
 
 @helper.login_required
-def order_sell_option_limit(positionEffect, creditOrDebit, price, symbol, quantity, expirationDate, strike, optionType='both', timeInForce='gfd'):
+def order_sell_option_limit(positionEffect, creditOrDebit, price, symbol, quantity, expirationDate, strike,
+                            optionType='both', timeInForce='gfd'):
     """Submits a limit order for an option. i.e. place a short call or a short put.
 
     :param positionEffect: Either 'open' for a sell to open effect or 'close' for a sell to close effect.
@@ -1354,7 +1424,7 @@ def order_sell_option_limit(positionEffect, creditOrDebit, price, symbol, quanti
     try:
         symbol = symbol.upper().strip()
     except AttributeError as message:
-        print(message)
+        helper.report_error(InvalidArgumentError(str(message), 'symbol', symbol), message, logger)
         return None
 
     optionID = helper.id_for_option(symbol, expirationDate, strike, optionType)
@@ -1404,7 +1474,7 @@ def order_buy_crypto_by_price(symbol, amountInDollars, priceType='ask_price', ti
     try:
         symbol = symbol.upper().strip()
     except AttributeError as message:
-        print(message)
+        helper.report_error(InvalidArgumentError(str(message), 'symbol', symbol), message, logger)
         return None
 
     crypto_info = crypto.get_crypto_info(symbol)
@@ -1456,7 +1526,7 @@ def order_buy_crypto_by_quantity(symbol, quantity, priceType='ask_price', timeIn
     try:
         symbol = symbol.upper().strip()
     except AttributeError as message:
-        print(message)
+        helper.report_error(InvalidArgumentError(str(message), 'symbol', symbol), message, logger)
         return None
 
     crypto_info = crypto.get_crypto_info(symbol)
@@ -1502,13 +1572,14 @@ def order_buy_crypto_limit(symbol, quantity, price, timeInForce='gtc'):
     try:
         symbol = symbol.upper().strip()
     except AttributeError as message:
-        print(message)
+        helper.report_error(InvalidArgumentError(str(message), 'symbol', symbol), message, logger)
         return None
 
     crypto_info = crypto.get_crypto_info(symbol)
 
     if crypto_info['display_only']:
-        print("WARNING: The dictionary returned by crypto.get_crypto_info() for this crypto has key 'display_only' set to True. May not be able to trade this crypto.")
+        logger.warning("The dictionary returned by crypto.get_crypto_info() for %s has key 'display_only' set to True. "
+                       "May not be able to trade this crypto.", symbol)
 
     payload = {
         'account_id': crypto.load_crypto_profile(info="id"),
@@ -1549,7 +1620,7 @@ def order_sell_crypto_by_price(symbol, amountInDollars, priceType='ask_price', t
     try:
         symbol = symbol.upper().strip()
     except AttributeError as message:
-        print(message)
+        helper.report_error(InvalidArgumentError(str(message), 'symbol', symbol), message, logger)
         return None
 
     crypto_info = crypto.get_crypto_info(symbol)
@@ -1600,7 +1671,7 @@ def order_sell_crypto_by_quantity(symbol, quantity, priceType='ask_price', timeI
     try:
         symbol = symbol.upper().strip()
     except AttributeError as message:
-        print(message)
+        helper.report_error(InvalidArgumentError(str(message), 'symbol', symbol), message, logger)
         return None
 
     crypto_info = crypto.get_crypto_info(symbol)
@@ -1646,13 +1717,14 @@ def order_sell_crypto_limit(symbol, quantity, price, timeInForce='gtc'):
     try:
         symbol = symbol.upper().strip()
     except AttributeError as message:
-        print(message)
+        helper.report_error(InvalidArgumentError(str(message), 'symbol', symbol), message, logger)
         return None
 
     crypto_info = crypto.get_crypto_info(symbol)
 
     if crypto_info['display_only']:
-        print("WARNING: The dictionary returned by crypto.get_crypto_info() for this crypto has key 'display_only' set to True. May not be able to trade this crypto.")
+        logger.warning("The dictionary returned by crypto.get_crypto_info() for %s has key 'display_only' set to True. "
+                       "May not be able to trade this crypto.", symbol)
 
     payload = {
         'account_id': crypto.load_crypto_profile(info="id"),
@@ -0,0 +1,349 @@
+"""Contains the record and replay modes of the transport, for running robin_stocks offline."""
+import base64
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+import zlib
+
+from requests import Response
+from requests.structures import CaseInsensitiveDict
+from robin_stocks.client import get_client
+from robin_stocks.transport import TransportAdapter, configure_session
+
+# The response headers kept in a recording.
+RECORDED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Retry-After')
+
+
+def request_keys(method, url, body=None):
+    """Returns the keys a request is looked up by.
+
+    :param method: The http method.
+    :type method: str
+    :param url: The full url, including the query string.
+    :type url: str
+    :param body: The body of the request.
+    :type body: Optional[str or bytes]
+    :returns: A tuple of the key for the method, url, and body, and the key for the method and url alone.
+
+    """
+    if isinstance(body, str):
+        body = body.encode()
+    partial = hashlib.sha1('{0} {1}'.format(method, url).encode()).hexdigest()
+    full = hashlib.sha1(partial.encode() + b' ' + (body or b'')).hexdigest()
+    return(full, partial)
+
+
+class Recording:
+    """An append-only file of request and response pairs, with an index of where each pair starts.
+
+    :param path: The location of the recording. The index is written to path + '.idx'.
+    :type path: str
+
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+        self._file = open(path, 'ab')
+        self._index = open(path + '.idx', 'a')
+
+    def add(self, method, url, body, response, elapsed):
+        """Appends a request and its response.
+
+        :param method: The http method.
+        :type method: str
+        :param url: The full url, including the query string.
+        :type url: str
+        :param body: The body of the request.
+        :type body: Optional[str or bytes]
+        :param response: The response that was received.
+        :type response: requests.Response
+        :param elapsed: The seconds the request took.
+        :type elapsed: float
+        :returns: None
+
+        """
+        content = response.content or b''
+        try:
+            text, encoding = content.decode('utf-8'), 'utf-8'
+        except UnicodeDecodeError:
+            text, encoding = base64.b64encode(content).decode('ascii'), 'base64'
+        full, partial = request_keys(method, url, body)
+        record = {'method': method, 'url': url, 'keys': [full, partial],
+                  'time': time.time() - self.started_at, 'elapsed': elapsed,
+                  'status': response.status_code, 'reason': response.reason,
+                  'headers': {key: response.headers[key] for key in RECORDED_HEADERS if key in response.headers},
+                  'content': text, 'encoding': encoding}
+        data = gzip.compress(json.dumps(record).encode() + b'\n')
+        with self._lock:
+            offset = self._file.tell()
+            self._file.write(data)
+            self._file.flush()
+            self._index.write('{0} {1} {2} {3}\n'.format(full, partial, offset, len(data)))
+            self._index.flush()
+
+    def close(self):
+        """Closes the recording.
+
+        :returns: None
+
+        """
+        with self._lock:
+            self._file.close()
+            self._index.close()
+
+
+class Replay:
+    """Serves the responses of a recording.
+
+    :param path: The location of the recording. The index is rebuilt from the recording if it is missing.
+    :type path: str
+
+    """
+
+    def __init__(self, path):
+        self.path = path
+        if not os.path.exists(path + '.idx'):
+            build_index(path)
+        self._positions = {}
+        with open(path + '.idx') as f:
+            for line in f:
+                full, partial, offset, length = line.split()
+                entry = (int(offset), int(length))
+                self._positions.setdefault(full, []).append(entry)
+                self._positions.setdefault(partial, []).append(entry)
+        self._served = {}
+        self._lock = threading.Lock()
+        self._file = open(path, 'rb')
+
+    def get(self, method, url, body=None):
+        """Returns the next recorded response for a request. Once every response for the request has been \
+        served, the last one is served again.
+
+        :param method: The http method.
+        :type method: str
+        :param url: The full url, including the query string.
+        :type url: str
+        :param body: The body of the request.
+        :type body: Optional[str or bytes]
+        :returns: The recorded dictionary, or None if the request was never recorded.
+
+        """
+        for key in request_keys(method, url, body):
+            entries = self._positions.get(key)
+            if entries:
+                break
+        else:
+            return(None)
+        with self._lock:
+            count = self._served.get(key, 0)
+            self._served[key] = count + 1
+            offset, length = entries[min(count, len(entries) - 1)]
+            self._file.seek(offset)
+            data = self._file.read(length)
+        return(json.loads(gzip.decompress(data)))
+
+    def close(self):
+        """Closes the recording.
+
+        :returns: None
+
+        """
+        with self._lock:
+            self._file.close()
+
+
+def build_index(path):
+    """Writes the index of a recording by reading through it, for recordings whose index was lost.
+
+    :param path: The location of the recording.
+    :type path: str
+    :returns: The number of records that were indexed.
+
+    """
+    count = 0
+    offset = 0
+    buffer = b''
+    with open(path, 'rb') as f, open(path + '.idx', 'w') as index:
+        while True:
+            # Every record is a complete gzip member, so decompress one member at a time to find where each starts.
+            decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            parts = []
+            length = 0
+            while not decompressor.eof:
+                if not buffer:
+                    buffer = f.read(1 << 20)
+                    if not buffer:
+                        break
+                parts.append(decompressor.decompress(buffer))
+                length += len(buffer) - len(decompressor.unused_data)
+                buffer = decompressor.unused_data
+            if not decompressor.eof:
+                # The end of the file, or a record that was cut off while being written.
+                break
+            record = json.loads(b''.join(parts))
+            index.write('{0} {1} {2} {3}\n'.format(record['keys'][0], record['keys'][1], offset, length))
+            offset += length
+            count += 1
+    return(count)
+
+
+class RecordingAdapter(TransportAdapter):
+    """Sends requests as usual and writes each request and response to a Recording.
+
+    :param recording: The recording to write to.
+    :type recording: Recording
+
+    """
+
+    def __init__(self, recording, **kwargs):
+        self.recording = recording
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        start = time.monotonic()
+        response = super().send(request, **kwargs)
+        self.recording.add(request.method, request.url, request.body, response, time.monotonic() - start)
+        return(response)
+
+
+class ReplayAdapter(TransportAdapter):
+    """Answers requests from a Replay instead of the network.
+
+    :param replay: The recording to serve.
+    :type replay: Replay
+    :param speed: How many times faster than recorded to replay. Each response is held back until the time it \
+    was recorded at, divided by speed, has passed since the first request. None serves every response right away.
+    :type speed: Optional[float]
+
+    """
+
+    def __init__(self, replay, speed=None, **kwargs):
+        self.replay = replay
+        self.speed = speed
+        self.started_at = None
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        if self.started_at is None:
+            self.started_at = time.monotonic()
+        record = self.replay.get(request.method, request.url, request.body)
+        response = Response()
+        response.request = request
+        response.url = request.url
+        response.encoding = 'utf-8'
+        if record is None:
+            response.status_code = 404
+            response.reason = 'Not Recorded'
+            response._content = json.dumps({'detail': 'No recorded response for {0} {1}'.format(
+                request.method, request.url)}).encode()
+            return(response)
+        if self.speed:
+            wait = self.started_at + record['time'] / self.speed - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+        response.status_code = record['status']
+        response.reason = record['reason']
+        response.headers = CaseInsensitiveDict(record['headers'])
+        if record['encoding'] == 'base64':
+            response._content = base64.b64decode(record['content'])
+        else:
+            response._content = record['content'].encode('utf-8')
+        return(response)
+
+
+def pool_options(session=None):
+    """Returns the pool settings of the adapter a session sends https requests with, so that a recording keeps them."""
+    if session is None:
+        session = get_client().session
+    adapter = session.get_adapter('https://')
+    return({'pool_connections': getattr(adapter, '_pool_connections', None),
+            'pool_maxsize': getattr(adapter, '_pool_maxsize', None),
+            'keepalive': getattr(adapter, 'keepalive', None)})
+
+
+def mount(adapter, session=None):
+    """Mounts an adapter on a session for both http and https urls. The adapters it replaces are kept on it so that \
+    stop_transport_mode can mount them again."""
+    if session is None:
+        session = get_client().session
+    replaced = getattr(session.adapters.get('https://'), 'replaced', None)
+    adapter.replaced = replaced or {prefix: session.adapters.get(prefix) for prefix in ('https://', 'http://')}
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return(adapter)
+
+
+def start_recording(path, session=None):
+    """Starts writing every request sent by a session, and its response, to a recording.
+
+    :param path: The location of the recording. An existing recording is appended to.
+    :type path: str
+    :param session: The session to record. Defaults to the session of the current client.
+    :type session: Optional[requests.Session]
+    :returns: The Recording.
+
+    """
+    recording = Recording(path)
+    mount(RecordingAdapter(recording, **pool_options(session)), session)
+    return(recording)
+
+
+def stop_recording(session=None):
+    """Stops recording a session and closes the recording.
+
+    :param session: The session being recorded. Defaults to the session of the current client.
+    :type session: Optional[requests.Session]
+    :returns: None
+
+    """
+    stop_transport_mode(session)
+
+
+def start_replay(path, speed=None, session=None):
+    """Makes a session answer every request from a recording instead of the network.
+
+    :param path: The location of the recording.
+    :type path: str
+    :param speed: How many times faster than recorded to replay. None serves every response right away.
+    :type speed: Optional[float]
+    :param session: The session to replay into. Defaults to the session of the current client.
+    :type session: Optional[requests.Session]
+    :returns: The Replay.
+
+    """
+    replay = Replay(path)
+    mount(ReplayAdapter(replay, speed), session)
+    return(replay)
+
+
+def stop_replay(session=None):
+    """Makes a session send requests over the network again.
+
+    :param session: The session being replayed into. Defaults to the session of the current client.
+    :type session: Optional[requests.Session]
+    :returns: None
+
+    """
+    stop_transport_mode(session)
+
+
+def stop_transport_mode(session=None):
+    """Closes the recording or replay mounted on a session and mounts the adapters it replaced again."""
+    if session is None:
+        session = get_client().session
+    adapter = session.get_adapter('https://')
+    if isinstance(adapter, RecordingAdapter):
+        adapter.recording.close()
+    elif isinstance(adapter, ReplayAdapter):
+        adapter.replay.close()
+    replaced = getattr(adapter, 'replaced', None)
+    if not replaced or None in replaced.values():
+        configure_session(session)
+        return
+    for prefix, original in replaced.items():
+        session.mount(prefix, original)
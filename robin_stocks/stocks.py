@@ -1,6 +1,57 @@
 """Contains information in regards to stocks."""
+import logging
+
 import robin_stocks.helper as helper
+import robin_stocks.instruments as instruments
 import robin_stocks.urls as urls
+from robin_stocks.cache import MicroBatcher
+from robin_stocks.exceptions import InvalidArgumentError, InvalidTickerError
+from robin_stocks.globals import QUOTE_BATCH_SIZE, QUOTE_BATCH_WINDOW
+
+logger = logging.getLogger(__name__)
+
+
+def request_quote_batch(symbols):
+    """Requests the quotes for a batch of symbols collected by QUOTE_BATCHER.
+
+    :param symbols: A list of stock tickers.
+    :type symbols: list
+    :returns: A dictionary that maps each symbol to its quote, or to None if the ticker does not exist. \
+    None if the request failed.
+
+    """
+    data = helper.request_get(urls.quotes(), 'results', {'symbols': ','.join(symbols)})
+    if (data == None or data == [None]):
+        return(None)
+    return(dict(zip(symbols, data)))
+
+
+# Merges single symbol get_quotes calls made at the same time into one request.
+QUOTE_BATCHER = MicroBatcher(request_quote_batch, QUOTE_BATCH_WINDOW, QUOTE_BATCH_SIZE)
+
+
+def set_quote_batching(window=None, max_batch=None):
+    """Sets how get_quotes batches single symbol requests made at the same time by different threads, \
+    such as many strategies each calling get_latest_price.
+
+    :param window: The seconds to wait for other requests to join a batch. 0.005 is a good choice. Use 0 to turn off batching.
+    :type window: Optional[float]
+    :param max_batch: The most symbols in one batch. A full batch is sent without waiting.
+    :type max_batch: Optional[int]
+    :returns: None. Updates the batching settings.
+
+    """
+    if window is not None:
+        QUOTE_BATCHER.window = max(0, window)
+    if max_batch is not None:
+        QUOTE_BATCHER.maxsize = max(1, int(max_batch))
+
+
+def _warn_invalid_ticker(symbol):
+    """Logs that a symbol is not a valid stock ticker and is skipped. The InvalidTickerError is passed to log \
+    handlers as the 'error' attribute of the record."""
+    error = InvalidTickerError(symbol)
+    logger.warning('%s. It is being ignored', error, extra={'error': error})
 
 
 def get_quotes(inputSymbols, info=None):
@@ -15,16 +66,24 @@ def get_quotes(inputSymbols, info=None):
 
     """
     symbols = helper.inputs_to_set(inputSymbols)
-    url = urls.quotes()
-    payload = {'symbols': ','.join(symbols)}
-    data = helper.request_get(url, 'results', payload)
+    if QUOTE_BATCHER.window and len(symbols) == 1:
+        # Batches are grouped by session so that each client only sees its own requests.
+        client = helper.get_client()
+        quotes = QUOTE_BATCHER.get(symbols[0], id(client.session), client.wait)
+        if quotes is None:
+            data = [None]
+        else:
+            item = quotes.get(symbols[0])
+            data = [dict(item) if item else None]
+    else:
+        data = helper.request_symbols(urls.quotes(), symbols)
 
     if (data == None or data == [None]):
         return data
 
     for count, item in enumerate(data):
         if item is None:
-            print(helper.error_ticker_does_not_exist(symbols[count]))
+            _warn_invalid_ticker(symbols[count])
 
     data = [item for item in data if item is not None]
 
@@ -44,16 +103,14 @@ def get_fundamentals(inputSymbols, info=None):
 
     """
     symbols = helper.inputs_to_set(inputSymbols)
-    url = urls.fundamentals()
-    payload = {'symbols': ','.join(symbols)}
-    data = helper.request_get(url, 'results', payload)
+    data = helper.request_symbols(urls.fundamentals(), symbols)
 
     if (data == None or data == [None]):
         return data
 
     for count, item in enumerate(data):
         if item is None:
-            print(helper.error_ticker_does_not_exist(symbols[count]))
+            _warn_invalid_ticker(symbols[count])
         else:
             item['symbol'] = symbols[count]
 
@@ -75,16 +132,14 @@ def get_instruments_by_symbols(inputSymbols, info=None):
 
     """
     symbols = helper.inputs_to_set(inputSymbols)
-    url = urls.instruments()
     data = []
     for item in symbols:
-        payload = {'symbol': item}
-        itemData = helper.request_get(url, 'indexzero', payload)
+        itemData = helper.instrument_for_symbol(item)
 
         if itemData:
-            data.append(itemData)
+            data.append(dict(itemData))
         else:
-            print(helper.error_ticker_does_not_exist(item))
+            _warn_invalid_ticker(item)
 
     return(helper.filter(data, info))
 
@@ -102,11 +157,57 @@ def get_instrument_by_url(url, info=None):
     Otherwise, it will be a list of strings where the strings are the values of the key that corresponds to info.
 
     """
-    data = helper.request_get(url, 'regular')
+    data = helper.instrument_for_url(url)
+    if data:
+        data = dict(data)
 
     return(helper.filter(data, info))
 
 
+def warm_instrument_index(inputSymbols, path=None):
+    """Loads the instrument data for many stock tickers into the instrument index in bulk, opening the index if needed.
+    Quotes are requested for many symbols at once to find the instrument ids, and then the instruments are requested by id \
+    in batches, instead of one request per symbol. Symbols that are already in the index and not stale are skipped.
+
+    :param inputSymbols: May be a single stock ticker or a list of stock tickers.
+    :type inputSymbols: str or list
+    :param path: The location of the index file if it is not open yet. Defaults to ~/.tokens/instruments.sqlite3.
+    :type path: Optional[str]
+    :returns: A list of dictionaries of instrument data for every symbol that was found.
+
+    """
+    if instruments.INDEX is None:
+        instruments.open_instrument_index(path)
+    index = instruments.INDEX
+
+    symbols = helper.inputs_to_set(inputSymbols)
+    data = {}
+    missing = []
+    for symbol in symbols:
+        itemData = index.get_by_symbol(symbol)
+        if itemData:
+            data[symbol] = itemData
+        else:
+            missing.append(symbol)
+
+    ids = []
+    for chunk in helper.chunked(missing, 50):
+        quotes = get_quotes(chunk)
+        if quotes and quotes != [None]:
+            ids.extend(item['instrument'].rstrip('/').split('/')[-1] for item in quotes)
+
+    url = urls.instruments()
+    for chunk in helper.chunked(ids, 50):
+        results = helper.request_get(url, 'results', {'ids': ','.join(chunk)})
+        results = [item for item in results if item]
+        index.add(results)
+        for item in results:
+            helper.cache_instrument(item, index=False)
+            data[item['symbol']] = item
+
+    return([data[symbol] for symbol in symbols if symbol in data])
+
+
 def get_latest_price(inputSymbols, includeExtendedHours=True):
     """Takes any number of stock tickers and returns the latest price of each one as a string.
 
@@ -142,12 +243,10 @@ def get_name_by_symbol(symbol):
     try:
         symbol = symbol.upper().strip()
     except AttributeError as message:
-        print(message)
+        helper.report_error(InvalidArgumentError(str(message), 'symbol', symbol), message, logger)
         return None
 
-    url = urls.instruments()
-    payload = {'symbol': symbol}
-    data = helper.request_get(url, 'indexzero', payload)
+    data = helper.instrument_for_symbol(symbol)
     if not data:
         return(None)
     # If stock doesn't have a simple name attribute then get the full name.
@@ -167,7 +266,7 @@ def get_name_by_url(url):
     :returns: Returns the simple name of the stock. If the simple name does not exist then returns the full name.
 
     """
-    data = helper.request_get(url)
+    data = helper.instrument_for_url(url)
     if not data:
         return(None)
     # If stock doesn't have a simple name attribute then get the full name.
@@ -187,7 +286,7 @@ def get_symbol_by_url(url):
     :returns: Returns the ticker symbol of the stock.
 
     """
-    data = helper.request_get(url)
+    data = helper.instrument_for_url(url)
     return helper.filter(data, info='symbol')
 
 @helper.convert_none_to_string
@@ -207,7 +306,7 @@ def get_ratings(symbol, info=None):
     try:
         symbol = symbol.upper().strip()
     except AttributeError as message:
-        print(message)
+        helper.report_error(InvalidArgumentError(str(message), 'symbol', symbol), message, logger)
         return None
 
     url = urls.ratings(symbol)
@@ -239,7 +338,7 @@ def get_popularity(symbol, info=None):
     try:
         symbol = symbol.upper().strip()
     except AttributeError as message:
-        print(message)
+        helper.report_error(InvalidArgumentError(str(message), 'symbol', symbol), message, logger)
         return None
 
     url = urls.popularity(symbol)
@@ -262,7 +361,7 @@ def get_events(symbol, info=None):
     try:
         symbol = symbol.upper().strip()
     except AttributeError as message:
-        print(message)
+        helper.report_error(InvalidArgumentError(str(message), 'symbol', symbol), message, logger)
         return None
 
     payload = {'equity_instrument_id': helper.id_for_stock(symbol)}
@@ -287,7 +386,7 @@ def get_earnings(symbol, info=None):
     try:
         symbol = symbol.upper().strip()
     except AttributeError as message:
-        print(message)
+        helper.report_error(InvalidArgumentError(str(message), 'symbol', symbol), message, logger)
         return None
 
     url = urls.earnings()
@@ -312,7 +411,7 @@ def get_news(symbol, info=None):
     try:
         symbol = symbol.upper().strip()
     except AttributeError as message:
-        print(message)
+        helper.report_error(InvalidArgumentError(str(message), 'symbol', symbol), message, logger)
         return None
 
     url = urls.news(symbol)
@@ -337,7 +436,7 @@ def get_splits(symbol, info=None):
     try:
         symbol = symbol.upper().strip()
     except AttributeError as message:
-        print(message)
+        helper.report_error(InvalidArgumentError(str(message), 'symbol', symbol), message, logger)
         return None
 
     url = urls.splits(symbol)
@@ -359,10 +458,10 @@ def find_instrument_data(query):
     data = helper.request_get(url, 'pagination', payload)
 
     if len(data) == 0:
-        print('No results found for that keyword')
+        logger.info('No results found for %s', query)
         return([None])
     else:
-        print('Found ' + str(len(data)) + ' results')
+        logger.debug('Found %d results', len(data))
         return(data)
 
 
@@ -382,13 +481,16 @@ def get_historicals(inputSymbols, span='week', bounds='regular'):
     span_check = ['day', 'week', 'month', '3month', 'year', '5year']
     bounds_check = ['extended', 'regular', 'trading']
     if span not in span_check:
-        print('ERROR: Span must be "day","week","month","3month","year",or "5year"')
+        helper.report_error(InvalidArgumentError('Span must be "day","week","month","3month","year",or "5year"',
+                                                 'span', span), log=logger)
         return([None])
     if bounds not in bounds_check:
-        print('ERROR: Bounds must be "extended","regular",or "trading"')
+        helper.report_error(InvalidArgumentError('Bounds must be "extended","regular",or "trading"',
+                                                 'bounds', bounds), log=logger)
         return([None])
     if (bounds == 'extended' or bounds == 'trading') and span != 'day':
-        print('ERROR: extended and trading bounds can only be used with a span of "day"')
+        helper.report_error(InvalidArgumentError('extended and trading bounds can only be used with a span of "day"',
+                                                 'bounds', bounds), log=logger)
         return([None])
 
     if span == 'day':
@@ -406,19 +508,18 @@ def get_historicals(inputSymbols, span='week', bounds='regular'):
 
     symbols = helper.inputs_to_set(inputSymbols)
     url = urls.historicals()
-    payload = {'symbols': ','.join(symbols),
-               'interval': interval,
+    payload = {'interval': interval,
                'span': span,
                'bounds': bounds}
 
-    data = helper.request_get(url, 'results', payload)
+    data = helper.request_symbols(url, symbols, payload)
     if (data == None or data == [None]):
         return data
 
     histData = []
     for count, item in enumerate(data):
         if (len(item['historicals']) == 0):
-            print(helper.error_ticker_does_not_exist(symbols[count]))
+            _warn_invalid_ticker(symbols[count])
             continue
         stockSymbol = item['symbol']
         for subitem in item['historicals']:
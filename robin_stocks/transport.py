@@ -0,0 +1,394 @@
+"""Contains the connection settings, timeouts, rate limits and retries shared by every session."""
+import logging
+import random
+import socket
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+import requests
+import robin_stocks.metrics as metrics
+import urllib3.util.connection as connection
+from requests.adapters import HTTPAdapter
+from robin_stocks.cache import TTLCache
+from robin_stocks.globals import (DNS_CACHE_TTL, POOL_CONNECTIONS,
+                                  POOL_MAXSIZE, RATE_LIMITS, RETRY_ATTEMPTS,
+                                  RETRY_BACKOFF, RETRY_MAX_BACKOFF,
+                                  RETRY_STATUSES, SESSION, TCP_KEEPALIVE,
+                                  TIMEOUTS)
+from urllib3.connection import HTTPConnection
+
+logger = logging.getLogger('robin_stocks.http')
+
+# Addresses returned by getaddrinfo, keyed by host and port.
+DNS_CACHE = TTLCache(maxsize=256, ttl=60)
+# The function urllib3 uses to open sockets when the dns cache is off.
+_create_connection = connection.create_connection
+
+
+class TransportAdapter(HTTPAdapter):
+    """An HTTPAdapter that turns on TCP keep-alive for the connections it opens.
+
+    :param pool_connections: The number of hosts to keep a connection pool for.
+    :type pool_connections: Optional[int]
+    :param pool_maxsize: The number of connections to keep open to each host.
+    :type pool_maxsize: Optional[int]
+    :param keepalive: Whether to send TCP keep-alive probes.
+    :type keepalive: Optional[bool]
+
+    """
+    __attrs__ = HTTPAdapter.__attrs__ + ['keepalive']
+
+    def __init__(self, pool_connections=None, pool_maxsize=None, keepalive=None, **kwargs):
+        # Set before calling HTTPAdapter.__init__, which builds the pool manager.
+        self.keepalive = TCP_KEEPALIVE if keepalive is None else keepalive
+        super().__init__(pool_connections=pool_connections or POOL_CONNECTIONS,
+                         pool_maxsize=pool_maxsize or POOL_MAXSIZE, **kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        if self.keepalive:
+            kwargs['socket_options'] = HTTPConnection.default_socket_options + keepalive_socket_options()
+        super().init_poolmanager(*args, **kwargs)
+
+
+def keepalive_socket_options():
+    """Returns the socket options that turn on TCP keep-alive, using the tuning options the platform supports.
+
+    :returns: A list of (level, option, value) tuples.
+
+    """
+    options = [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+    for name, value in (('TCP_KEEPIDLE', 60), ('TCP_KEEPINTVL', 15), ('TCP_KEEPCNT', 4)):
+        if hasattr(socket, name):
+            options.append((socket.IPPROTO_TCP, getattr(socket, name), value))
+    return(options)
+
+
+def configure_session(session, pool_connections=None, pool_maxsize=None, keepalive=None):
+    """Mounts a TransportAdapter on a session for both http and https urls.
+
+    :param session: The session to configure.
+    :type session: requests.Session
+    :param pool_connections: The number of hosts to keep a connection pool for. Defaults to globals.POOL_CONNECTIONS.
+    :type pool_connections: Optional[int]
+    :param pool_maxsize: The number of connections to keep open to each host. Defaults to globals.POOL_MAXSIZE.
+    :type pool_maxsize: Optional[int]
+    :param keepalive: Whether to send TCP keep-alive probes. Defaults to globals.TCP_KEEPALIVE.
+    :type keepalive: Optional[bool]
+    :returns: The session.
+
+    """
+    adapter = TransportAdapter(pool_connections, pool_maxsize, keepalive)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return(session)
+
+
+def call_class(url):
+    """Returns the kind of request a url is, which decides its timeout.
+
+    :param url: The url being requested.
+    :type url: str
+    :returns: One of 'quotes', 'orders', 'documents', or 'default'.
+
+    """
+    path = urlparse(url).path
+    if path.startswith(('/quotes/', '/marketdata/', '/fundamentals/')):
+        return('quotes')
+    elif '/orders/' in path:
+        return('orders')
+    elif path.startswith('/documents/'):
+        return('documents')
+    else:
+        return('default')
+
+
+def timeout_for(url, kind=None):
+    """Returns the timeout to send a request with.
+
+    :param url: The url being requested.
+    :type url: str
+    :param kind: The kind of request. Found from the url if not provided.
+    :type kind: Optional[str]
+    :returns: A (connect, read) tuple of seconds.
+
+    """
+    if kind is None:
+        kind = call_class(url)
+    return(TIMEOUTS.get(kind, TIMEOUTS['default']))
+
+
+def set_transport_options(pool_connections=None, pool_maxsize=None, keepalive=None, timeouts=None, dns_cache_ttl=None):
+    """Sets the connection settings. The global session is reconfigured right away, and every RobinhoodClient \
+    created afterwards uses the new settings.
+
+    :param pool_connections: The number of hosts to keep a connection pool for.
+    :type pool_connections: Optional[int]
+    :param pool_maxsize: The number of connections to keep open to each host.
+    :type pool_maxsize: Optional[int]
+    :param keepalive: Whether to send TCP keep-alive probes.
+    :type keepalive: Optional[bool]
+    :param timeouts: Maps 'quotes', 'orders', 'documents', or 'default' to a (connect, read) tuple or a single number of seconds.
+    :type timeouts: Optional[dict]
+    :param dns_cache_ttl: The number of seconds to reuse resolved host names. Use 0 to turn off the dns cache. \
+    The cache is shared by every connection urllib3 opens in the process.
+    :type dns_cache_ttl: Optional[float]
+    :returns: None. Updates the transport settings.
+
+    """
+    global POOL_CONNECTIONS, POOL_MAXSIZE, TCP_KEEPALIVE, DNS_CACHE_TTL
+    if pool_connections is not None:
+        POOL_CONNECTIONS = max(1, int(pool_connections))
+    if pool_maxsize is not None:
+        POOL_MAXSIZE = max(1, int(pool_maxsize))
+    if keepalive is not None:
+        TCP_KEEPALIVE = bool(keepalive)
+    if timeouts is not None:
+        TIMEOUTS.update(timeouts)
+    if dns_cache_ttl is not None:
+        DNS_CACHE_TTL = dns_cache_ttl or None
+        DNS_CACHE.clear()
+        if DNS_CACHE_TTL:
+            connection.create_connection = cached_create_connection
+        else:
+            connection.create_connection = _create_connection
+    if pool_connections is not None or pool_maxsize is not None or keepalive is not None:
+        configure_session(SESSION)
+
+
+def cached_create_connection(address, *args, **kwargs):
+    """Opens a socket like urllib3.util.connection.create_connection, but resolves the host through the dns cache.
+    Only the socket is opened with the address, so TLS still verifies the original host name.
+
+    :param address: A (host, port) tuple.
+    :type address: tuple
+    :returns: A connected socket.
+
+    """
+    host, port = address
+    addresses = DNS_CACHE.get((host, port), None)
+    if addresses is None:
+        addresses = socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM)
+        DNS_CACHE.set((host, port), addresses, DNS_CACHE_TTL)
+    error = None
+    for family, socktype, proto, canonname, sockaddr in addresses:
+        try:
+            return(_create_connection((sockaddr[0], port), *args, **kwargs))
+        except OSError as message:
+            error = message
+    # The cached addresses may be stale, so resolve the host again next time.
+    DNS_CACHE.invalidate((host, port))
+    raise error
+
+
+class TokenBucket:
+    """A thread safe token bucket. Tokens are added at a steady rate up to the size of the burst, and every request
+    takes one token, waiting for it if the bucket is empty.
+
+    :param rate: The number of tokens added each second.
+    :type rate: float
+    :param burst: The most tokens the bucket holds. Defaults to one second worth of tokens.
+    :type burst: Optional[float]
+
+    """
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.burst = float(burst or max(1, rate))
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, sleep=None):
+        """Takes a token, sleeping until one is available.
+
+        :param sleep: The function to sleep with. Defaults to time.sleep.
+        :type sleep: Optional[function]
+        :returns: The number of seconds spent waiting.
+
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # Tokens may go below zero. Each waiting caller has reserved its own token, so they leave in order.
+            self._tokens -= 1
+            wait = max(-self._tokens / self.rate, self._paused_until - now, 0)
+        if wait:
+            (sleep or time.sleep)(wait)
+        return(wait)
+
+    def pause(self, seconds):
+        """Stops handing out tokens for a number of seconds, such as after the server asks to slow down.
+
+        :param seconds: The number of seconds to pause for.
+        :type seconds: float
+        :returns: None
+
+        """
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+# The token bucket for each class of request, built from globals.RATE_LIMITS.
+LIMITERS = {kind: TokenBucket(*limit) for kind, limit in RATE_LIMITS.items()}
+# Counters kept for each class of request.
+STATS = {}
+_STATS_LOCK = threading.Lock()
+
+
+def set_rate_limit(kind, rate, burst=None):
+    """Limits how many requests of one class are sent each second.
+
+    :param kind: One of 'quotes', 'orders', 'documents', or 'default'.
+    :type kind: str
+    :param rate: The number of requests allowed each second. Use None to remove the limit.
+    :type rate: Optional[float]
+    :param burst: The number of requests that can be sent at once after a quiet period. Defaults to rate.
+    :type burst: Optional[float]
+    :returns: None. Updates the rate limits.
+
+    """
+    if rate is None:
+        RATE_LIMITS.pop(kind, None)
+        LIMITERS.pop(kind, None)
+    else:
+        RATE_LIMITS[kind] = (rate, burst)
+        LIMITERS[kind] = TokenBucket(rate, burst)
+
+
+def set_retry_options(attempts=None, backoff=None, max_backoff=None, statuses=None):
+    """Sets how get requests are retried.
+
+    :param attempts: The number of retries after the first try. Use 0 to turn off retries.
+    :type attempts: Optional[int]
+    :param backoff: The seconds waited before the first retry.
+    :type backoff: Optional[float]
+    :param max_backoff: The most seconds waited before a retry.
+    :type max_backoff: Optional[float]
+    :param statuses: The response codes that are retried.
+    :type statuses: Optional[list]
+    :returns: None. Updates the retry settings.
+
+    """
+    global RETRY_ATTEMPTS, RETRY_BACKOFF, RETRY_MAX_BACKOFF, RETRY_STATUSES
+    if attempts is not None:
+        RETRY_ATTEMPTS = max(0, int(attempts))
+    if backoff is not None:
+        RETRY_BACKOFF = backoff
+    if max_backoff is not None:
+        RETRY_MAX_BACKOFF = max_backoff
+    if statuses is not None:
+        RETRY_STATUSES = tuple(statuses)
+
+
+def get_transport_stats():
+    """Returns the request counters for each class of request.
+
+    :returns: A dictionary that maps each class of request to a dictionary with the keys requests, retries, \
+    throttled (responses with code 429), failures (requests that still failed after every retry), and \
+    limiter_wait (total seconds spent waiting for the rate limit).
+
+    """
+    with _STATS_LOCK:
+        return({kind: dict(counters) for kind, counters in STATS.items()})
+
+
+def reset_transport_stats():
+    """Sets every request counter back to zero.
+
+    :returns: None
+
+    """
+    with _STATS_LOCK:
+        STATS.clear()
+
+
+def record(kind, name, amount=1):
+    """Adds amount to one of the counters of a class of request."""
+    with _STATS_LOCK:
+        counters = STATS.setdefault(kind, {'requests': 0, 'retries': 0, 'throttled': 0,
+                                           'failures': 0, 'limiter_wait': 0.0})
+        counters[name] += amount
+
+
+def retry_delay(attempt, response=None):
+    """Returns how long to wait before a retry. A Retry-After header on the response is honored, otherwise \
+    the wait is a random time up to RETRY_BACKOFF * 2 ** attempt.
+
+    :param attempt: The number of retries already made.
+    :type attempt: int
+    :param response: The response that failed, if there was one.
+    :type response: Optional[requests.Response]
+    :returns: The number of seconds to wait.
+
+    """
+    retryAfter = None if response is None else response.headers.get('Retry-After')
+    if retryAfter:
+        try:
+            delay = float(retryAfter)
+        except ValueError:
+            try:
+                delay = parsedate_to_datetime(retryAfter).timestamp() - time.time()
+            except (TypeError, ValueError):
+                delay = None
+        if delay is not None:
+            return(min(max(delay, 0), RETRY_MAX_BACKOFF))
+    return(random.uniform(0, min(RETRY_MAX_BACKOFF, RETRY_BACKOFF * 2 ** attempt)))
+
+
+def send_get(session, url, kind=None, **kwargs):
+    """Sends a get request, waiting for the rate limit of its class and retrying it when it is throttled, \
+    when the server fails with a code in RETRY_STATUSES, or when the connection drops or times out.
+
+    :param session: The session to send the request with. If it has a sleep method, as the sessions used by \
+    robin_stocks.aio do, waits between tries use it instead of time.sleep.
+    :type session: requests.Session
+    :param url: The url to request.
+    :type url: str
+    :param kind: The class of request. Found from the url if not provided.
+    :type kind: Optional[str]
+    :returns: The last response. Raises the connection error if the last try could not connect.
+
+    """
+    if kind is None:
+        kind = call_class(url)
+    sleep = getattr(session, 'sleep', None) or time.sleep
+    kwargs.setdefault('timeout', timeout_for(url, kind))
+    attempt = 0
+    while True:
+        res = None
+        limiter = LIMITERS.get(kind)
+        if limiter is not None:
+            record(kind, 'limiter_wait', limiter.acquire(sleep))
+        record(kind, 'requests')
+        try:
+            res = metrics.send_request(session, 'GET', url, **kwargs)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            if attempt >= RETRY_ATTEMPTS:
+                record(kind, 'failures')
+                raise
+            delay = retry_delay(attempt)
+        else:
+            if res.status_code == 429:
+                record(kind, 'throttled')
+            if res.status_code not in RETRY_STATUSES:
+                return(res)
+            if attempt >= RETRY_ATTEMPTS:
+                record(kind, 'failures')
+                return(res)
+            delay = retry_delay(attempt, res)
+            if res.status_code == 429 and limiter is not None:
+                # Hold back every request of this class, not just this one.
+                limiter.pause(delay)
+        record(kind, 'retries')
+        logger.debug('Retrying %s in %.2f seconds after %s', url, delay,
+                     res.status_code if res is not None else 'a connection error')
+        attempt += 1
+        sleep(delay)
+
+
+if DNS_CACHE_TTL:
+    connection.create_connection = cached_create_connection
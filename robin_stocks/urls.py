@@ -198,8 +198,11 @@ def option_positions():
     return('https://api.robinhood.com/options/positions/')
 
 
-def marketdata_options(id):
-    return('https://api.robinhood.com/marketdata/options/{0}/'.format(id))
+def marketdata_options(id=None):
+    if id:
+        return('https://api.robinhood.com/marketdata/options/{0}/'.format(id))
+    else:
+        return('https://api.robinhood.com/marketdata/options/')
 
 # pricebook
 
@@ -16,10 +16,14 @@ setup(name='robin_stocks',
       author_email='joshfernandes@mac.com',
       keywords=['robinhood','robin stocks','finance app','stocks','options','trading','investing'],
       license='MIT',
-      python_requires='>=3',
+      python_requires='>=3.7',
       packages=find_packages(),
       requires=['requests'],
       install_requires=[
           'requests',
       ],
+      extras_require={
+          'fast': ['orjson'],
+          'aio': ['aiohttp', 'greenlet'],
+      },
       zip_safe=False)
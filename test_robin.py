@@ -1,5 +1,46 @@
+import asyncio
+import inspect
+import json
 import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
 import robin_stocks as r
+import robin_stocks.aio as aio
+import robin_stocks.helper as helper
+
+
+class FakeResponse:
+    def __init__(self, data, status_code=200, headers=None):
+        self.data = data
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.content = json.dumps(data).encode()
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise helper.requests.exceptions.HTTPError(str(self.status_code), response=self)
+
+    def json(self):
+        return self.data
+
+
+def fake_pages(count, page_size=2, base='https://api.robinhood.com/orders/'):
+    """Returns a fake session get function serving count pages linked by cursor."""
+    calls = []
+
+    def get(url, params=None, **kwargs):
+        calls.append(url)
+        page = int(url.split('cursor=')[1]) if 'cursor=' in url else 0
+        next_url = '{0}?cursor={1}'.format(base, page + 1) if page + 1 < count else None
+        results = [{'id': page * page_size + i} for i in range(page_size)]
+        return FakeResponse({'results': results, 'next': next_url})
+    get.calls = calls
+    return get
 
 class TestStocks:
     def test_quotes(self):
@@ -11,6 +52,869 @@ class TestStocks:
         name = r.get_name_by_symbol('aapl')
         assert name == "Apple"
 
+
+class TestPagination:
+    def test_loads_every_page_in_order(self, monkeypatch):
+        monkeypatch.setattr(helper.SESSION, 'get', fake_pages(5))
+        data = helper.request_get('https://api.robinhood.com/orders/', 'pagination')
+        assert [item['id'] for item in data] == list(range(10))
+
+    def test_max_pages(self, monkeypatch):
+        get = fake_pages(5)
+        monkeypatch.setattr(helper.SESSION, 'get', get)
+        data = helper.request_get('https://api.robinhood.com/orders/', 'pagination', max_pages=2)
+        assert len(data) == 4
+        assert len(get.calls) == 2
+
+    def test_offset_pages_load_concurrently(self, monkeypatch):
+        def get(url, params=None, **kwargs):
+            offset = int(url.split('offset=')[1]) if 'offset=' in url else 0
+            next_url = 'https://api.robinhood.com/orders/?offset={0}'.format(offset + 2) if offset + 2 < 7 else None
+            results = [{'id': i} for i in range(offset, min(offset + 2, 7))]
+            return FakeResponse({'results': results, 'next': next_url, 'count': 7})
+        monkeypatch.setattr(helper.SESSION, 'get', get)
+        data = helper.request_get('https://api.robinhood.com/orders/', 'pagination', concurrency=3)
+        assert [item['id'] for item in data] == list(range(7))
+
+    def test_failed_page_marks_the_result_incomplete(self, monkeypatch):
+        get = fake_pages(5)
+
+        def failing_get(url, params=None, **kwargs):
+            if url.endswith('cursor=2'):
+                return FakeResponse(None, 500)
+            return get(url, params)
+        monkeypatch.setattr(helper.SESSION, 'get', failing_get)
+        monkeypatch.setattr(r.transport.time, 'sleep', lambda seconds: None)
+        assert helper.request_get('https://api.robinhood.com/orders/', 'pagination') == [None]
+        stream = helper.request_get('https://api.robinhood.com/orders/', 'pagination', stream=True)
+        assert [item['id'] for item in stream] == [0, 1, 2, 3]
+
+    def test_stream_stops_loading_pages_early(self, monkeypatch):
+        get = fake_pages(50)
+        monkeypatch.setattr(helper.SESSION, 'get', get)
+        stream = helper.request_get('https://api.robinhood.com/orders/', 'pagination', stream=True)
+        ids = helper.filter_iter(stream, 'id')
+        assert next(item for item in ids if item == 3) == 3
+        ids.close()
+        assert len(get.calls) <= 4
+
+
+class TestInstrumentCache:
+    def setup_method(self):
+        helper.clear_instrument_cache()
+
+    def teardown_method(self):
+        helper.clear_instrument_cache()
+
+    def test_lookups_are_cached(self, monkeypatch):
+        calls = []
+
+        def get(url, params=None, **kwargs):
+            calls.append(params)
+            if params['symbol'] == 'AAPL':
+                return FakeResponse({'results': [{'id': 'abc', 'symbol': 'AAPL', 'tradable_chain_id': 'chain'}], 'next': None})
+            return FakeResponse({'results': [], 'next': None})
+        monkeypatch.setattr(helper.SESSION, 'get', get)
+
+        assert helper.id_for_stock('aapl') == 'abc'
+        assert helper.id_for_chain('AAPL ') == 'chain'
+        assert helper.id_for_stock('nope') is None
+        assert helper.id_for_stock('NOPE') is None
+        assert len(calls) == 2
+        assert helper.get_instrument_cache_stats()['hits'] == 2
+
+        helper.clear_instrument_cache()
+        helper.id_for_stock('AAPL')
+        assert len(calls) == 3
+
+    def test_index_is_read_after_restart(self, monkeypatch, tmp_path):
+        instrument = {'id': 'abc', 'symbol': 'AAPL', 'url': 'https://api.robinhood.com/instruments/abc/',
+                      'tradable_chain_id': 'chain', 'simple_name': 'Apple', 'name': 'Apple Inc.', 'type': 'stock'}
+        calls = []
+
+        def get(url, params=None, **kwargs):
+            calls.append(url)
+            if url.endswith('/quotes/'):
+                return FakeResponse({'results': [{'symbol': 'AAPL', 'instrument': instrument['url']}, None]})
+            return FakeResponse({'results': [instrument], 'next': None})
+        monkeypatch.setattr(helper.SESSION, 'get', get)
+        try:
+            data = r.warm_instrument_index(['AAPL', 'NOPE'], path=str(tmp_path / 'index.sqlite3'))
+            assert [item['id'] for item in data] == ['abc']
+            assert len(calls) == 2
+
+            helper.clear_instrument_cache()
+            assert helper.id_for_chain('AAPL') == 'chain'
+            assert r.get_symbol_by_url(instrument['url']) == 'AAPL'
+            assert r.get_name_by_symbol('AAPL') == 'Apple'
+            assert len(calls) == 2
+        finally:
+            r.close_instrument_index()
+
+
+class TestOptionMarketData:
+    def test_batches_and_falls_back_for_missing_ids(self, monkeypatch):
+        calls = []
+
+        def get(url, params=None, **kwargs):
+            calls.append(url)
+            if params and 'instruments' in params:
+                # The batch endpoint leaves out the last option.
+                ids = [item.rstrip('/').split('/')[-1] for item in params['instruments'].split(',')][:-1]
+                return FakeResponse({'results': [
+                    {'instrument': 'https://api.robinhood.com/options/instruments/{0}/'.format(id), 'mark': id}
+                    for id in ids]})
+            return FakeResponse({'mark': url.rstrip('/').split('/')[-1]})
+        monkeypatch.setattr(helper.SESSION, 'get', get)
+        monkeypatch.setattr(r.options, 'OPTION_MARKET_DATA_BATCH_SIZE', 3)
+
+        ids = ['a', 'b', 'c', 'd', 'e']
+        assert r.get_option_market_data_by_ids(ids, info='mark') == ids
+        assert len(calls) == 4
+
+
+class TestOptionChainSnapshot:
+    options = [{'id': '{0}{1}{2}'.format(date, strike, kind), 'expiration_date': date, 'strike_price': '{0}.0000'.format(strike),
+                'type': kind, 'tradability': 'tradable'}
+               for date in ['2020-06-19', '2020-05-15', '2020-07-17'] for strike in [100, 90, 110] for kind in ['call', 'put']]
+
+    def test_lookups(self):
+        snapshot = r.OptionChainSnapshot('SPY', self.options)
+        assert snapshot.get('2020-06-19', '100', 'put')['id'] == '2020-06-19100put'
+        assert snapshot.get_by_id('2020-05-1590call')['strike_price'] == '90.0000'
+        assert snapshot.get('2020-06-19', 95, 'put') is None
+        assert len(snapshot.find(expirationDate='2020-05-15', optionType='call')) == 3
+        assert [item['strike_price'] for item in snapshot.between_strikes(95, 110, '2020-07-17', 'call')] == \
+            ['100.0000', '110.0000']
+        assert len(snapshot.between_expirations('2020-05-01', '2020-06-30')) == 12
+        assert snapshot.expiration_dates() == ['2020-05-15', '2020-06-19', '2020-07-17']
+
+    def test_snapshot_is_reused(self, monkeypatch):
+        calls = []
+
+        def load(symbol, optionType='both'):
+            calls.append(symbol)
+            return r.OptionChainSnapshot(symbol, self.options, optionType)
+        monkeypatch.setattr(r.OptionChainSnapshot, 'load', load)
+        r.clear_option_chain_snapshots()
+        try:
+            assert r.get_option_chain_snapshot('spy') is r.get_option_chain_snapshot('SPY')
+            assert len(calls) == 1
+            r.get_option_chain_snapshot('SPY', ttl=0)
+            assert len(calls) == 2
+        finally:
+            r.clear_option_chain_snapshots()
+
+    def test_both_types_are_reused_for_calls_and_puts(self, monkeypatch):
+        calls = []
+
+        def load(symbol, optionType='both'):
+            calls.append(optionType)
+            return r.OptionChainSnapshot(symbol, self.options, optionType)
+        monkeypatch.setattr(r.OptionChainSnapshot, 'load', load)
+        r.clear_option_chain_snapshots()
+        try:
+            snapshot = r.get_option_chain_snapshot('SPY')
+            puts = r.get_option_chain_snapshot('SPY', 'put')
+            assert r.get_option_chain_snapshot('SPY', 'call') is snapshot.of_type('call')
+            assert calls == ['both']
+            assert len(puts) == 9 and all(item['type'] == 'put' for item in puts.options)
+            assert puts.get('2020-06-19', '100', 'call') is None
+            assert puts.created_at == snapshot.created_at
+        finally:
+            r.clear_option_chain_snapshots()
+
+    def test_option_ids_are_narrowed_and_shared(self, monkeypatch):
+        calls = []
+
+        def get(url, params=None, **kwargs):
+            calls.append(params)
+            if url.endswith('/instruments/') and 'symbol' in params:
+                return FakeResponse({'results': [{'id': 'spy', 'symbol': 'SPY', 'tradable_chain_id': 'chain'}]})
+            options = [item for item in self.options if item['expiration_date'] == params['expiration_date']
+                       and ('strike_price' not in params or float(item['strike_price']) == float(params['strike_price']))]
+            return FakeResponse({'results': options, 'next': None})
+        monkeypatch.setattr(helper.SESSION, 'get', get)
+        helper.clear_instrument_cache()
+        try:
+            assert helper.id_for_option('spy', '2020-06-19', 100, 'call') == '2020-06-19100call'
+            assert calls[-1]['strike_price'] == 100
+            assert helper.id_for_option('SPY', '2020-06-19', '100.00', 'call') == '2020-06-19100call'
+            assert len(calls) == 2
+
+            helper.load_option_ids('SPY', '2020-07-17')
+            assert helper.id_for_option('SPY', '2020-07-17', 90, 'put') == '2020-07-1790put'
+            assert helper.id_for_option('SPY', '2020-07-17', 110, 'call') == '2020-07-17110call'
+            assert len(calls) == 3
+        finally:
+            helper.clear_instrument_cache()
+
+    def test_spread_only_loads_expirations_with_several_missing_legs(self, monkeypatch):
+        calls = []
+
+        def get(url, params=None, **kwargs):
+            if url.endswith('/accounts/'):
+                return FakeResponse({'results': [{'url': 'account'}]})
+            if url.endswith('/instruments/') and 'symbol' in params:
+                return FakeResponse({'results': [{'id': 'spy', 'symbol': 'SPY', 'tradable_chain_id': 'chain'}]})
+            calls.append(params)
+            options = [item for item in self.options if item['expiration_date'] == params['expiration_date']
+                       and ('strike_price' not in params or float(item['strike_price']) == float(params['strike_price']))]
+            return FakeResponse({'results': options, 'next': None})
+        monkeypatch.setattr(helper.SESSION, 'get', get)
+        monkeypatch.setattr(helper.SESSION, 'post', lambda url, **kwargs: FakeResponse(kwargs['json']))
+        monkeypatch.setattr(r.client.DEFAULT_CLIENT, 'logged_in', True)
+        helper.clear_instrument_cache()
+        try:
+            helper.id_for_option('SPY', '2020-06-19', 100, 'call')
+            del calls[:]
+            spread = [{'expirationDate': '2020-06-19', 'strike': 100, 'optionType': 'call', 'effect': 'open', 'action': 'buy'},
+                      {'expirationDate': '2020-06-19', 'strike': 110, 'optionType': 'call', 'effect': 'open', 'action': 'sell'},
+                      {'expirationDate': '2020-07-17', 'strike': 90, 'optionType': 'put', 'effect': 'open', 'action': 'buy'},
+                      {'expirationDate': '2020-07-17', 'strike': 110, 'optionType': 'put', 'effect': 'open', 'action': 'sell'}]
+            order = r.order_option_spread('debit', 1.0, 'spy', 1, spread)
+            assert [leg['option'].split('/')[-2] for leg in order['legs']] == \
+                ['2020-06-19100call', '2020-06-19110call', '2020-07-1790put', '2020-07-17110put']
+            assert sorted((params['expiration_date'], params.get('strike_price')) for params in calls) == \
+                [('2020-06-19', 110), ('2020-07-17', None)]
+        finally:
+            helper.clear_instrument_cache()
+
+
+class TestHoldings:
+    def test_build_holdings_batches_requests(self, monkeypatch):
+        base = 'https://api.robinhood.com/'
+        instruments = {id: {'id': id, 'symbol': id.upper(), 'url': base + 'instruments/' + id + '/', 'type': 'stock',
+                            'simple_name': None, 'name': id.upper() + ' Inc.'} for id in ['aaa', 'bbb']}
+        responses = {
+            base + 'positions/': {'results': [{'instrument': base + 'instruments/aaa/', 'quantity': '2.0000', 'average_buy_price': '10.0000'},
+                                              {'instrument': base + 'instruments/bbb/', 'quantity': '1.0000', 'average_buy_price': '0.0000'}],
+                                  'next': None},
+            base + 'portfolios/': {'results': [{'equity': '100.00', 'extended_hours_equity': None}]},
+            base + 'accounts/': {'results': [{'cash': '10.00', 'uncleared_deposits': '0.00'}]},
+            base + 'instruments/': {'results': list(instruments.values())},
+            base + 'quotes/': {'results': [{'symbol': 'AAA', 'last_trade_price': '12.00', 'last_extended_hours_trade_price': None},
+                                           {'symbol': 'BBB', 'last_trade_price': '5.00', 'last_extended_hours_trade_price': '6.00'}]},
+            base + 'fundamentals/': {'results': [{'pe_ratio': '20.0'}, {'pe_ratio': None}]},
+        }
+        calls = []
+
+        def get(url, params=None, **kwargs):
+            calls.append(url)
+            return FakeResponse(responses[url])
+        monkeypatch.setattr(helper.SESSION, 'get', get)
+        monkeypatch.setattr(r.client.DEFAULT_CLIENT, 'logged_in', True)
+        helper.clear_instrument_cache()
+        try:
+            holdings = r.build_holdings()
+        finally:
+            helper.clear_instrument_cache()
+
+        assert len(calls) == 6
+        assert holdings['AAA'] == {'price': '12.00', 'quantity': '2.0000', 'average_buy_price': '10.0000', 'equity': '24.00',
+                                   'percent_change': '20.00', 'equity_change': '4.000000', 'type': 'stock', 'name': 'AAA Inc.',
+                                   'id': 'aaa', 'pe_ratio': '20.0', 'percentage': '26.67'}
+        assert holdings['BBB']['price'] == '6.00'
+        assert holdings['BBB']['percent_change'] == '0.00'
+
+    def test_dividend_index_matches_scan(self, monkeypatch):
+        monkeypatch.setattr(r.client.DEFAULT_CLIENT, 'logged_in', True)
+        dividends = [{'instrument': 'a', 'rate': '0.50', 'amount': '5.00'},
+                     {'instrument': 'b', 'rate': '1.25', 'amount': '2.50'},
+                     {'instrument': 'a', 'rate': '0.40', 'amount': '4.10'}]
+        index = r.DividendIndex(dividends[:2])
+        index.add(dividends[2:])
+        expected = {'dividend_rate': '0.50', 'total_dividend': '5.00', 'amount_paid_to_date': '9.10'}
+        assert r.get_dividends_by_instrument('a', index) == expected
+        assert r.get_dividends_by_instrument('a', dividends) == expected
+        assert r.get_dividends_by_instrument('c', index) is None
+        assert index.total == 11.6
+
+
+class TestAio:
+    def run_gather_and_iterate(self):
+        async def main():
+            quotes = await asyncio.gather(aio.get_quotes('AAPL', info='symbol'), aio.stocks.get_quotes(['msft', 'fb'], 'symbol'))
+            ids = []
+            async for id in aio.iter_all_stock_orders(info='id'):
+                ids.append(id)
+            await aio.close()
+            return quotes, ids
+
+        quotes, ids = asyncio.run(main())
+        assert quotes == [['AAPL'], ['MSFT', 'FB']]
+        assert ids == list(range(6))
+
+    def test_gather_and_iterate_on_the_event_loop(self, monkeypatch):
+        transport = pytest.importorskip('robin_stocks.aio.transport')
+        get = fake_pages(3)
+        sent = []
+
+        async def send(method, url, params=None, data=None, json=None, headers=None, timeout=None, allow_redirects=True):
+            sent.append((method, threading.current_thread() is threading.main_thread(), headers.get('X-Test')))
+            await asyncio.sleep(0.01)
+            if url.endswith('/quotes/'):
+                return FakeResponse({'results': [{'symbol': symbol} for symbol in params['symbols'].split(',')]})
+            return get(url, params)
+        monkeypatch.setattr(transport, 'send', send)
+        monkeypatch.setattr(r.client.DEFAULT_CLIENT, 'logged_in', True)
+        monkeypatch.setitem(helper.SESSION.headers, 'X-Test', 'yes')
+        threads = threading.active_count()
+        self.run_gather_and_iterate()
+        assert threading.active_count() == threads
+        assert sent and all(item == ('GET', True, 'yes') for item in sent)
+
+    def test_quote_batching_on_the_event_loop(self, monkeypatch):
+        transport = pytest.importorskip('robin_stocks.aio.transport')
+        requested = []
+
+        async def send(method, url, params=None, **kwargs):
+            requested.append(params['symbols'])
+            return FakeResponse({'results': [{'symbol': symbol} for symbol in params['symbols'].split(',')]})
+        monkeypatch.setattr(transport, 'send', send)
+
+        async def main():
+            quotes = await asyncio.gather(*[aio.get_quotes(symbol, 'symbol') for symbol in ['AAPL', 'MSFT', 'FB']])
+            await aio.close()
+            return quotes
+        r.set_quote_batching(0.05)
+        try:
+            assert asyncio.run(main()) == [['AAPL'], ['MSFT'], ['FB']]
+        finally:
+            r.set_quote_batching(0)
+        assert len(requested) == 1 and sorted(requested[0].split(',')) == ['AAPL', 'FB', 'MSFT']
+
+    def test_send_with_aiohttp(self):
+        transport = pytest.importorskip('robin_stocks.aio.transport')
+        from aiohttp import web
+
+        async def echo(request):
+            return web.json_response({'query': sorted(request.query.items()), 'form': sorted((await request.post()).items()),
+                                      'header': request.headers.get('X-Test')}, status=201)
+
+        async def main():
+            app = web.Application()
+            app.router.add_route('*', '/echo/', echo)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, '127.0.0.1', 0)
+            await site.start()
+            port = site._server.sockets[0].getsockname()[1]
+            try:
+                res = await transport.send('POST', 'http://127.0.0.1:{0}/echo/'.format(port),
+                                           params={'a': 1, 'b': None, 'c': True}, data={'d': 'x', 'e': None},
+                                           headers={'X-Test': 'yes'}, timeout=(2, 5))
+                with pytest.raises(helper.requests.exceptions.ConnectionError):
+                    await transport.send('GET', 'http://127.0.0.1:1/', timeout=(2, 5))
+                return res
+            finally:
+                await transport.close()
+                await runner.cleanup()
+
+        res = asyncio.run(main())
+        assert isinstance(res, helper.requests.Response) and res.status_code == 201
+        assert res.json() == {'query': [['a', '1'], ['c', 'True']], 'form': [['d', 'x']], 'header': 'yes'}
+        assert res.headers['content-type'].startswith('application/json')
+
+    def test_threads_are_used_without_the_aio_extra(self, monkeypatch):
+        get = fake_pages(3)
+
+        def quotes_or_pages(url, params=None, **kwargs):
+            if url.endswith('/quotes/'):
+                return FakeResponse({'results': [{'symbol': symbol} for symbol in params['symbols'].split(',')]})
+            return get(url, params)
+        monkeypatch.setattr(helper.SESSION, 'get', quotes_or_pages)
+        monkeypatch.setattr(r.client.DEFAULT_CLIENT, 'logged_in', True)
+        monkeypatch.setattr(aio.base, 'transport', None)
+        self.run_gather_and_iterate()
+
+
+class TestClient:
+    def test_clients_are_isolated(self, monkeypatch):
+        first = r.RobinhoodClient()
+        second = r.RobinhoodClient()
+        seen = []
+
+        def get_for(name):
+            def get(url, params=None, **kwargs):
+                seen.append((name, threading.current_thread().name != 'MainThread'))
+                return FakeResponse({'results': [{'symbol': name}]})
+            return get
+        monkeypatch.setattr(first.session, 'get', get_for('first'))
+        monkeypatch.setattr(second.session, 'get', get_for('second'))
+
+        with first.activate():
+            helper.set_login_state(True)
+        assert first.logged_in and not second.logged_in and not r.client.DEFAULT_CLIENT.logged_in
+        assert first.get_quotes('AAPL', info='symbol') == ['first']
+        assert second.stocks.get_quotes('AAPL', info='symbol') == ['second']
+        # Requests sent from robin_stocks worker threads use the client of the caller.
+        assert first.call(helper.map_concurrently, lambda symbol: r.get_quotes(symbol, 'symbol'), ['A', 'B']) == [['first'], ['first']]
+        assert ('first', True) in seen
+        try:
+            second.load_account_profile()
+            assert False
+        except Exception as message:
+            assert 'logged in' in str(message)
+
+    def test_json_post_does_not_change_session_headers(self, monkeypatch):
+        client = r.RobinhoodClient()
+        sent = []
+
+        def post(url, **kwargs):
+            sent.append(kwargs.get('headers'))
+            return FakeResponse({})
+        monkeypatch.setattr(client.session, 'post', post)
+        client.call(helper.request_post, 'https://api.robinhood.com/options/orders/', {}, json=True)
+        assert sent == [{'Content-Type': 'application/json'}]
+        assert client.session.headers['Content-Type'].startswith('application/x-www-form-urlencoded')
+
+    def test_session_pool_maps_across_accounts(self, monkeypatch):
+        pool = r.SessionPool(pool_size=2)
+        for account in ('first', 'second', 'broken'):
+            client = pool.client(account)
+            client.logged_in = True
+            if account == 'broken':
+                monkeypatch.setattr(client.session, 'get', lambda url, **kwargs: FakeResponse({}, 404))
+            else:
+                monkeypatch.setattr(client.session, 'get',
+                                    lambda url, params=None, name=account, **kwargs: FakeResponse({'results': [{'username': name}]}))
+        assert pool.client('first').session.get_adapter('https://api.robinhood.com')._pool_maxsize == 2
+        assert pool.map('load_account_profile', info='username') == {'first': 'first', 'second': 'second', 'broken': None}
+        assert pool.map(r.load_account_profile, 'username', accounts=['second']) == {'second': 'second'}
+
+
+class TestTransport:
+    def test_requests_use_timeouts_for_their_call_class(self, monkeypatch):
+        timeouts = []
+
+        def get(url, params=None, timeout=None, **kwargs):
+            timeouts.append(timeout)
+            return FakeResponse({'results': []})
+        monkeypatch.setattr(r.client.DEFAULT_CLIENT.session, 'get', get)
+        helper.request_get('https://api.robinhood.com/quotes/', 'results')
+        helper.request_get('https://api.robinhood.com/options/orders/', 'results')
+        helper.request_document('https://api.robinhood.com/documents/1/download/')
+        helper.request_get('https://api.robinhood.com/accounts/', 'results')
+        assert timeouts == [r.globals.TIMEOUTS['quotes'], r.globals.TIMEOUTS['orders'],
+                            r.globals.TIMEOUTS['documents'], r.globals.TIMEOUTS['default']]
+
+    def test_sessions_get_keepalive_adapter(self):
+        adapter = r.RobinhoodClient(pool_size=64).session.get_adapter('https://api.robinhood.com/')
+        assert isinstance(adapter, r.transport.TransportAdapter)
+        assert adapter._pool_maxsize == 64
+        assert (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1) in adapter.poolmanager.connection_pool_kw['socket_options']
+        assert isinstance(r.globals.SESSION.get_adapter('https://api.robinhood.com/'), r.transport.TransportAdapter)
+
+    def test_dns_cache_resolves_each_host_once(self, monkeypatch):
+        lookups = []
+        opened = []
+
+        def getaddrinfo(host, port, *args):
+            lookups.append(host)
+            return [(socket.AF_INET, socket.SOCK_STREAM, 6, '', ('10.0.0.1', port))]
+        monkeypatch.setattr(r.transport.socket, 'getaddrinfo', getaddrinfo)
+        original = r.transport._create_connection
+        monkeypatch.setattr(r.transport, '_create_connection', lambda address, *args, **kwargs: opened.append(address))
+        try:
+            r.transport.set_transport_options(dns_cache_ttl=30)
+            for i in range(3):
+                r.transport.connection.create_connection(('api.robinhood.com', 443))
+        finally:
+            monkeypatch.undo()
+            r.transport.set_transport_options(dns_cache_ttl=0)
+        assert lookups == ['api.robinhood.com']
+        assert opened == [('10.0.0.1', 443)] * 3
+        assert r.transport.connection.create_connection is original
+
+
+class TestRetries:
+    def test_throttled_get_honors_retry_after(self, monkeypatch):
+        responses = [FakeResponse({}, 429, {'Retry-After': '2'}), FakeResponse({}, 503), FakeResponse({'results': [1]})]
+        sleeps = []
+        monkeypatch.setattr(helper.SESSION, 'get', lambda url, **kwargs: responses.pop(0))
+        monkeypatch.setattr(r.transport.time, 'sleep', sleeps.append)
+        monkeypatch.setattr(r.transport, 'RETRY_BACKOFF', 0.5)
+        r.transport.reset_transport_stats()
+        assert helper.request_get('https://api.robinhood.com/quotes/', 'results') == [1]
+        assert sleeps[0] == 2 and 0 <= sleeps[1] <= 1
+        stats = r.transport.get_transport_stats()['quotes']
+        assert (stats['requests'], stats['retries'], stats['throttled'], stats['failures']) == (3, 2, 1, 0)
+
+    def test_pagination_retries_failed_page_instead_of_truncating(self, monkeypatch):
+        get = fake_pages(4)
+        failed = []
+
+        def flaky_get(url, **kwargs):
+            if 'cursor=2' in url and not failed:
+                failed.append(url)
+                raise helper.requests.exceptions.ConnectionError('reset')
+            return get(url, **kwargs)
+        monkeypatch.setattr(helper.SESSION, 'get', flaky_get)
+        monkeypatch.setattr(r.transport.time, 'sleep', lambda seconds: None)
+        data = helper.request_get('https://api.robinhood.com/orders/', 'pagination')
+        assert [item['id'] for item in data] == list(range(8))
+        assert failed
+
+    def test_timeouts_are_reported_not_raised(self, monkeypatch):
+        def get(url, **kwargs):
+            raise helper.requests.exceptions.ReadTimeout('stalled')
+        monkeypatch.setattr(helper.SESSION, 'get', get)
+        monkeypatch.setattr(r.transport.time, 'sleep', lambda seconds: None)
+        assert r.stocks.get_quotes('AAPL') == [None]
+        assert helper.request_get('https://api.robinhood.com/accounts/', 'indexzero') is None
+        assert helper.request_document('https://api.robinhood.com/documents/1/download/') is None
+
+    def test_token_bucket_spaces_out_requests(self, monkeypatch):
+        sleeps = []
+        monkeypatch.setattr(r.transport.time, 'sleep', sleeps.append)
+        bucket = r.transport.TokenBucket(rate=10, burst=2)
+        waits = [bucket.acquire() for i in range(4)]
+        assert waits[:2] == [0, 0]
+        assert 0.05 < waits[2] <= 0.1 and 0.15 < waits[3] <= 0.2
+        assert sleeps == waits[2:]
+
+
+class TestCoalescing:
+    def test_identical_gets_share_one_request(self, monkeypatch):
+        calls = []
+        release = threading.Event()
+
+        def get(url, params=None, **kwargs):
+            calls.append(url)
+            release.wait(5)
+            return FakeResponse({'results': [{'symbol': 'SPY', 'tags': []}]})
+        monkeypatch.setattr(helper.SESSION, 'get', get)
+        results = []
+
+        def load():
+            results.append(helper.request_get('https://api.robinhood.com/quotes/', 'results', {'symbols': 'SPY'}))
+        threads = [threading.Thread(target=load) for i in range(5)]
+        for thread in threads:
+            thread.start()
+        while len(helper.IN_FLIGHT) == 0 or helper.IN_FLIGHT.shared < 4:
+            pass
+        release.set()
+        for thread in threads:
+            thread.join()
+        assert len(calls) == 1
+        assert results == [[{'symbol': 'SPY', 'tags': []}]] * 5
+        # Every caller gets its own copy.
+        results[0][0]['tags'].append('changed')
+        assert all(result[0]['tags'] == [] for result in results[1:])
+
+    def test_failed_request_is_raised_for_every_caller(self):
+        flight = r.cache.SingleFlight()
+        started = threading.Event()
+        errors = []
+
+        def fail():
+            started.set()
+            time.sleep(0.05)
+            raise ValueError('down')
+
+        def call():
+            try:
+                flight.do('key', fail)
+            except ValueError as error:
+                errors.append(str(error))
+        leader = threading.Thread(target=call)
+        leader.start()
+        started.wait()
+        call()
+        leader.join()
+        assert errors == ['down', 'down'] and len(flight) == 0
+
+
+class TestQuoteBatching:
+    def test_single_symbol_quotes_share_a_request(self, monkeypatch):
+        calls = []
+
+        def get(url, params=None, **kwargs):
+            calls.append(params['symbols'])
+            return FakeResponse({'results': [None if symbol == 'BAD' else
+                                             {'symbol': symbol, 'last_trade_price': symbol.lower(),
+                                              'last_extended_hours_trade_price': None}
+                                             for symbol in params['symbols'].split(',')]})
+        monkeypatch.setattr(helper.SESSION, 'get', get)
+        monkeypatch.setattr(r.stocks.QUOTE_BATCHER, 'window', 0.2)
+        monkeypatch.setattr(r.stocks.QUOTE_BATCHER, 'maxsize', 3)
+        symbols = ['AAA', 'BBB', 'BAD', 'CCC', 'AAA']
+        results = helper.map_concurrently(lambda symbol: r.get_quotes(symbol, 'last_trade_price'), symbols, max_workers=5)
+        assert results == [['aaa'], ['bbb'], [None], ['ccc'], ['aaa']]
+        # A full batch of three is sent at once and the rest wait for the window.
+        assert len(calls) == 2
+        assert set(symbol for call in calls for symbol in call.split(',')) == {'AAA', 'BAD', 'BBB', 'CCC'}
+
+
+class TestSymbolChunking:
+    def test_long_symbol_lists_are_split_and_kept_in_order(self, monkeypatch):
+        calls = []
+
+        def get(url, params=None, **kwargs):
+            symbols = params['symbols'].split(',')
+            calls.append(symbols)
+            return FakeResponse({'results': [None if symbol.startswith('BAD') else {'sector': symbol}
+                                             for symbol in symbols]})
+        monkeypatch.setattr(helper.SESSION, 'get', get)
+        monkeypatch.setattr(helper, 'SYMBOLS_PER_REQUEST', 3)
+        symbols = ['S{0}'.format(i) for i in range(8)]
+        symbols[4] = 'BAD4'
+        data = r.get_fundamentals(symbols)
+        assert [len(call) for call in calls] == [3, 3, 2]
+        # Symbols are matched to their results across chunks, skipping tickers that don't exist.
+        assert [(item['symbol'], item['sector']) for item in data] == [(s, s) for s in symbols if s != 'BAD4']
+
+    def test_failed_chunk_fails_the_call(self, monkeypatch):
+        def get(url, params=None, **kwargs):
+            return FakeResponse({}, 404 if 'S4' in params['symbols'] else 200)
+        monkeypatch.setattr(helper.SESSION, 'get', get)
+        monkeypatch.setattr(helper, 'SYMBOLS_PER_REQUEST', 3)
+        assert r.get_quotes(['S{0}'.format(i) for i in range(8)]) == [None]
+
+
+class TestResponseCache:
+    def test_cached_until_ttl_or_post(self, monkeypatch):
+        calls = []
+
+        def get(url, params=None, **kwargs):
+            calls.append(url)
+            return FakeResponse({'results': [{'url': url, 'count': len(calls)}]})
+        monkeypatch.setattr(helper.SESSION, 'get', get)
+        monkeypatch.setattr(helper.SESSION, 'post', lambda url, **kwargs: FakeResponse({'id': '1'}, 201))
+        monkeypatch.setattr(helper, 'RESPONSE_CACHE', r.cache.TTLCache(16))
+        monkeypatch.setattr(helper, 'RESPONSE_CACHE_TTLS', {'/accounts/': 100, '/positions/': 0})
+        helper.set_response_cache(enabled=True)
+        try:
+            first = helper.request_get('https://api.robinhood.com/accounts/', 'indexzero')
+            first['count'] = 'changed'
+            assert helper.request_get('https://api.robinhood.com/accounts/', 'indexzero')['count'] == 1
+            helper.request_get('https://api.robinhood.com/positions/', 'results')
+            helper.request_get('https://api.robinhood.com/positions/', 'results')
+            assert len(calls) == 3
+            helper.request_post('https://api.robinhood.com/orders/', {})
+            assert helper.request_get('https://api.robinhood.com/accounts/', 'indexzero')['count'] == 4
+            assert helper.get_response_cache_stats()['hits'] == 1
+        finally:
+            helper.set_response_cache(enabled=False)
+
+
+class TestConditionalRequests:
+    def test_not_modified_is_served_from_stored_body(self, monkeypatch):
+        sent = []
+        body = {'results': [{'id': 'i1', 'symbol': 'AAPL'}]}
+
+        def get(url, params=None, headers=None, **kwargs):
+            sent.append(headers)
+            if headers and headers.get('If-None-Match') == '"v1"':
+                return FakeResponse(None, 304)
+            return FakeResponse(dict(body, results=[dict(body['results'][0])]), 200, {'ETag': '"v1"', 'Last-Modified': 'Wed, 21 Oct 2015 07:28:00 GMT'})
+        monkeypatch.setattr(helper.SESSION, 'get', get)
+        monkeypatch.setattr(helper, 'VALIDATOR_CACHE', r.cache.ValidatorCache(16))
+        url = 'https://api.robinhood.com/markets/'
+        first = helper.request_get(url, 'results')
+        first[0]['symbol'] = 'changed'
+        assert helper.request_get(url, 'results') == [{'id': 'i1', 'symbol': 'AAPL'}]
+        assert sent == [{}, {'If-None-Match': '"v1"', 'If-Modified-Since': 'Wed, 21 Oct 2015 07:28:00 GMT'}]
+        stats = helper.get_conditional_request_stats()
+        assert (stats['conditional_requests'], stats['not_modified'], stats['hit_rate']) == (1, 1, 1.0)
+        assert stats['bytes_saved'] == len(json.dumps(body).encode())
+        # Urls outside CONDITIONAL_PATHS are never sent with validators.
+        helper.request_get('https://api.robinhood.com/positions/', 'results')
+        helper.request_get('https://api.robinhood.com/positions/', 'results')
+        assert sent[2:] == [{}, {}]
+
+
+class TestDecoding:
+    def test_backends_decode_raw_bytes(self):
+        content = json.dumps({'results': [{'price': '1.50', 'count': 3, 'tags': None}]}).encode()
+        for backend in ('json', 'orjson'):
+            try:
+                assert r.decoding.load_backend(backend)(content) == {'results': [{'price': '1.50', 'count': 3, 'tags': None}]}
+            except ImportError:
+                pass
+
+    def test_set_json_backend(self):
+        current = r.decoding.JSON_BACKEND
+        try:
+            assert r.decoding.set_json_backend('json') == 'json'
+            assert r.decoding.decode(FakeResponse({'a': 1})) == {'a': 1}
+            assert r.decoding.set_json_backend('auto') in r.decoding.BACKENDS
+        finally:
+            r.decoding.set_json_backend(current)
+
+
+class TestReplay:
+    def test_record_then_replay_offline(self, monkeypatch, tmp_path):
+        prices = ['1.00', '2.00']
+
+        def send(adapter, request, **kwargs):
+            response = helper.requests.Response()
+            response.status_code = 200
+            response.headers['Content-Type'] = 'application/json'
+            price = prices.pop(0) if 'quotes' in request.url else None
+            response._content = json.dumps({'results': [{'price': price, 'body': request.body}]}).encode()
+            return response
+        monkeypatch.setattr(r.transport.TransportAdapter, 'send', send)
+        client = r.RobinhoodClient()
+        path = str(tmp_path / 'day.rec')
+        url = 'https://api.robinhood.com/quotes/'
+
+        r.replay.start_recording(path, client.session)
+        client.call(helper.request_get, url, 'results', {'symbols': 'AAPL'})
+        client.call(helper.request_get, url, 'results', {'symbols': 'AAPL'})
+        client.call(helper.request_post, 'https://api.robinhood.com/orders/', {'symbol': 'AAPL'})
+        r.replay.stop_recording(client.session)
+        monkeypatch.undo()
+
+        # Losing the index only costs a scan of the recording.
+        os.remove(path + '.idx')
+        r.replay.start_replay(path, session=client.session)
+        try:
+            replayed = [client.call(helper.request_get, url, 'results', {'symbols': 'AAPL'})[0]['price'] for i in range(3)]
+            assert replayed == ['1.00', '2.00', '2.00']
+            assert client.call(helper.request_post, 'https://api.robinhood.com/orders/', {'symbol': 'AAPL'}) == \
+                {'results': [{'price': None, 'body': 'symbol=AAPL'}]}
+            assert client.call(helper.request_get, 'https://api.robinhood.com/positions/', 'results') == [None]
+        finally:
+            r.replay.stop_replay(client.session)
+        assert isinstance(client.session.get_adapter('https://'), r.transport.TransportAdapter)
+        assert not isinstance(client.session.get_adapter('https://'), r.replay.ReplayAdapter)
+
+    def test_replay_holds_responses_until_their_time(self, monkeypatch, tmp_path):
+        path = str(tmp_path / 'day.rec')
+        recording = r.replay.Recording(path)
+        response = helper.requests.Response()
+        response.status_code = 200
+        response._content = b'{}'
+        monkeypatch.setattr(r.replay.time, 'time', lambda: recording.started_at + 30)
+        recording.add('GET', 'https://api.robinhood.com/markets/', None, response, 0.1)
+        recording.close()
+        monkeypatch.undo()
+        sleeps = []
+        monkeypatch.setattr(r.replay.time, 'sleep', sleeps.append)
+        session = helper.requests.Session()
+        r.replay.start_replay(path, speed=100, session=session)
+        assert session.get('https://api.robinhood.com/markets/').json() == {}
+        assert len(sleeps) == 1 and 0.25 < sleeps[0] <= 0.3
+
+    def test_stop_mounts_the_original_adapter(self, tmp_path):
+        client = r.RobinhoodClient(pool_size=64)
+        original = client.session.get_adapter('https://')
+        r.replay.start_recording(str(tmp_path / 'session.jsonl'), session=client.session)
+        assert client.session.get_adapter('https://')._pool_maxsize == 64
+        r.replay.stop_recording(session=client.session)
+        r.replay.start_replay(str(tmp_path / 'session.jsonl'), session=client.session)
+        r.replay.stop_replay(session=client.session)
+        assert client.session.get_adapter('https://') is original
+        assert client.session.get_adapter('http://') is original and original._pool_maxsize == 64
+
+
+class TestMetrics:
+    def test_requests_are_grouped_by_endpoint_template(self, monkeypatch):
+        pages = fake_pages(3)
+
+        def get(url, **kwargs):
+            if 'marketdata' in url:
+                return FakeResponse({}, 404)
+            return pages(url, **kwargs)
+        monkeypatch.setattr(helper.SESSION, 'get', get)
+        events = []
+        r.set_metrics(True)
+        r.add_request_hook(pre=events.append, post=events.append)
+        try:
+            helper.request_get('https://api.robinhood.com/orders/', 'pagination')
+            for optionId in ('a1', 'b2'):
+                helper.request_get('https://api.robinhood.com/marketdata/options/{0}/'.format(optionId))
+            rows = {(row['method'], row['endpoint']): row for row in r.get_metrics()}
+            text = r.get_prometheus_metrics()
+        finally:
+            r.remove_request_hook(events.append)
+            r.set_metrics(False)
+            r.reset_metrics()
+        orders = rows[('GET', '/orders/')]
+        assert (orders['requests'], orders['pages'], orders['paginations'], orders['errors']) == (3, 3, 1, 0)
+        assert orders['decode_seconds_count'] == 3 and orders['request_seconds_p99'] >= orders['request_seconds_p50']
+        options = rows[('GET', '/marketdata/options/{id}/')]
+        assert (options['requests'], options['errors']) == (2, 2)
+        assert 'robin_stocks_requests_total{method="GET",host="api.robinhood.com",endpoint="/orders/"} 3' in text
+        assert 'robin_stocks_request_seconds_bucket{method="GET",host="api.robinhood.com",endpoint="/orders/",le="+Inf"} 3' in text
+        assert len(events) == 10 and events[-1]['status'] == 404 and events[-1]['seconds'] >= 0
+
+    def test_templates_cover_urls(self):
+        metrics, urls = r.metrics, r.urls
+        built = [func() for func in vars(urls).values() if inspect.isfunction(func) and func.__module__ == urls.__name__
+                 and all(p.default is not p.empty for p in inspect.signature(func).parameters.values())]
+        built += [urls.orders('a1'), urls.option_orders('a1'), urls.marketdata_options('a1'),
+                  urls.news('AAPL'), urls.watchlists('Default', add=True)]
+        assert len(built) > 40
+        for url in built:
+            assert metrics.endpoint_for(url) in metrics.TEMPLATES, url
+
+
+class TestErrors:
+    def test_errors_are_logged_not_printed(self, monkeypatch, capsys, caplog):
+        get = fake_pages(3)
+        monkeypatch.setattr(helper.SESSION, 'get', lambda url, **kwargs: FakeResponse({}, 404) if 'cursor=2' in url else get(url))
+        with caplog.at_level('DEBUG', logger='robin_stocks'):
+            data = helper.request_get('https://api.robinhood.com/orders/', 'pagination')
+            assert r.stocks.get_historicals('AAPL', span='decade') == [None]
+        assert data == [None]
+        assert capsys.readouterr().out == ''
+        errors = [record.error for record in caplog.records if record.levelname == 'ERROR']
+        assert isinstance(errors[0], r.PaginationError) and errors[0].resume_url.endswith('cursor=2')
+        assert isinstance(errors[1], r.InvalidArgumentError) and errors[1].argument == 'span'
+        assert any(record.name == 'robin_stocks.http' and record.levelname == 'DEBUG' for record in caplog.records)
+
+    def test_unknown_tickers_are_skipped_with_a_warning(self, monkeypatch, caplog):
+        monkeypatch.setattr(helper.SESSION, 'get', lambda url, **kwargs: FakeResponse(
+            {'results': [{'symbol': 'AAPL'}, None]}))
+        r.set_raise_errors(True)
+        try:
+            with caplog.at_level('WARNING', logger='robin_stocks'):
+                assert r.stocks.get_quotes(['aapl', 'nope'], 'symbol') == ['AAPL']
+        finally:
+            r.set_raise_errors(False)
+        warnings = [record for record in caplog.records if record.levelname == 'WARNING']
+        assert isinstance(warnings[0].error, r.InvalidTickerError) and warnings[0].error.symbol == 'NOPE'
+
+    def test_raise_errors(self, monkeypatch):
+        monkeypatch.setattr(helper.SESSION, 'get', lambda url, **kwargs: FakeResponse({}, 404))
+        r.set_raise_errors(True)
+        try:
+            with pytest.raises(r.APIError) as error:
+                helper.request_get('https://api.robinhood.com/positions/', 'results')
+            assert error.value.status_code == 404 and error.value.url == 'https://api.robinhood.com/positions/'
+            with pytest.raises(ValueError):
+                r.markets.get_top_movers('sideways')
+        finally:
+            r.set_raise_errors(False)
+        assert r.markets.get_top_movers('sideways') == [None]
+
+    def test_request_delete_returns_response(self, monkeypatch):
+        monkeypatch.setattr(helper.SESSION, 'delete', lambda url, **kwargs: FakeResponse({}))
+        res = helper.request_delete('https://api.robinhood.com/watchlists/Default/x/')
+        assert res.status_code == 200
+        monkeypatch.setattr(helper.SESSION, 'delete', lambda url, **kwargs: FakeResponse({}, 404))
+        assert helper.request_delete('https://api.robinhood.com/watchlists/Default/x/') is None
+
+
+class TestLazyImport:
+    def test_import_does_not_load_submodules(self):
+        code = ('import sys, robin_stocks; '
+                'print(sorted(m for m in sys.modules if m.startswith("robin_stocks")), "requests" in sys.modules); '
+                'from robin_stocks import get_quotes; '
+                'print("robin_stocks.stocks" in sys.modules, "requests" in sys.modules)')
+        out = subprocess.run([sys.executable, '-c', code], check=True, capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__))).stdout.splitlines()
+        assert out == ["['robin_stocks'] False", 'True True']
+
+    def test_every_export_resolves(self):
+        for module, names in r.EXPORTS.items():
+            for name in names:
+                assert getattr(r, name) is getattr(getattr(r, module), name)
+        assert sorted(r.__all__) == sorted(name for names in r.EXPORTS.values() for name in names)
+
         
 # class TestLogin:
 #     @classmethod